@@ -0,0 +1,140 @@
+"""Micro-benchmarks for the Powermix numeric core.
+
+Reports the best-of-N cost in nanoseconds per call and its ratio to the
+straightforward version in ``reference.py``, timed in the same run.
+``--check`` compares the ratios against the pinned ``baseline.json`` and fails
+when an operation lost ground on its reference past ``tolerance``; ``--write``
+re-pins the baseline. Ratios, unlike absolute timings, carry over between
+machines.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import timeit
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT / "src", ROOT, Path(__file__).resolve().parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from powermix.calculator import (  # noqa: E402
+    calculate_other,
+    coerce_float,
+    milliwatts,
+    other_milliwatts,
+)
+import reference  # noqa: E402
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+FLOAT_PARTS = [float(value) for value in range(10)]
+TEXT_PARTS = [f"{value}.25" for value in range(10)]
+MILLIWATT_PARTS = [value * 1000 for value in range(10)]
+
+Case = tuple[Callable[[], object], Callable[[], object]]
+
+
+def _cases() -> dict[str, Case]:
+    """Return ``name -> (operation, reference)``."""
+
+    ref = reference
+    cases: dict[str, Case] = {
+        "coerce_float[float]": (lambda: coerce_float(1234.5), lambda: ref.coerce_float(1234.5)),
+        "coerce_float[int]": (lambda: coerce_float(1234), lambda: ref.coerce_float(1234)),
+        "coerce_float[decimal str]": (
+            lambda: coerce_float("1234.5"),
+            lambda: ref.coerce_float("1234.5"),
+        ),
+        "coerce_float[unavailable]": (
+            lambda: coerce_float("unavailable"),
+            lambda: ref.coerce_float("unavailable"),
+        ),
+        "coerce_float[None]": (lambda: coerce_float(None), lambda: ref.coerce_float(None)),
+        "calculate_other[10 floats]": (
+            lambda: calculate_other(5000.0, FLOAT_PARTS),
+            lambda: ref.calculate_other(5000.0, FLOAT_PARTS),
+        ),
+        "calculate_other[10 strings]": (
+            lambda: calculate_other("5000", TEXT_PARTS),
+            lambda: ref.calculate_other("5000", TEXT_PARTS),
+        ),
+        "milliwatts[decimal str]": (
+            lambda: milliwatts("1234.5", "W"),
+            lambda: ref.milliwatts("1234.5", "W"),
+        ),
+        "milliwatts[kW str]": (
+            lambda: milliwatts("1.5", "kW"),
+            lambda: ref.milliwatts("1.5", "kW"),
+        ),
+        "milliwatts[float]": (
+            lambda: milliwatts(1234.5, "W"),
+            lambda: ref.milliwatts(1234.5, "W"),
+        ),
+        "other_milliwatts[10 ints]": (
+            lambda: other_milliwatts(5_000_000, MILLIWATT_PARTS),
+            lambda: ref.other_milliwatts(5_000_000, MILLIWATT_PARTS),
+        ),
+    }
+    try:
+        from homeassistant.core import State
+
+        from custom_components.powermix.lib import state_milliwatts
+    except ImportError:  # pragma: no cover - Home Assistant not installed
+        return cases
+    state = State("sensor.main", "1.5", {"unit_of_measurement": "kW"})
+    cases["state_milliwatts[State]"] = (
+        lambda: state_milliwatts(state),
+        lambda: ref.milliwatts(state.state, state.attributes.get("unit_of_measurement")),
+    )
+    return cases
+
+
+def measure(number: int, repeat: int) -> dict[str, tuple[float, float]]:
+    """Return ``name -> (ns per call, ratio to the reference)``."""
+
+    results = {}
+    for name, (func, ref) in _cases().items():
+        # Alternate the two so drift during the run hits both alike.
+        best = best_ref = float("inf")
+        for _ in range(repeat):
+            best = min(best, timeit.timeit(func, number=number))
+            best_ref = min(best_ref, timeit.timeit(ref, number=number))
+        results[name] = (round(best / number * 1e9, 1), round(best / best_ref, 3))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="compare with baseline.json")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--write", action="store_true", help="pin results as the baseline")
+    args = parser.parse_args(argv)
+
+    results = measure(args.number, args.repeat)
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    failed = False
+    for name, (ns, ratio) in results.items():
+        pinned = baseline.get(name)
+        note = ""
+        if pinned is not None:
+            note = f"  (baseline {pinned:.3f}, x{ratio / pinned:.2f})"
+            if args.check and ratio > pinned * args.tolerance:
+                note += "  REGRESSION"
+                failed = True
+        print(f"{name:<30} {ns:>8.1f} ns/op {ratio:>6.3f} of reference{note}")
+
+    if args.write:
+        ratios = {name: ratio for name, (_, ratio) in results.items()}
+        BASELINE.write_text(json.dumps(ratios, indent=2) + "\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
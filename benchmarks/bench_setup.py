@@ -0,0 +1,149 @@
+"""Startup benchmark for the Powermix integration.
+
+Reports how long importing the integration takes on top of the Home Assistant
+modules it builds on, and the wall time of setting up 1, 10 and 100 config
+entries (``async_setup_entry`` of the integration and its sensor platform,
+until every entity wrote its first state). Each entry has a main sensor, five
+consumers and a producer. Results are the best of ``--repeat`` runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# What Home Assistant has imported anyway by the time it loads an integration.
+_PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.components.sensor",
+    "homeassistant.components.websocket_api",
+    "homeassistant.components.http",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.restore_state",
+)
+
+_IMPORT_PROBE = f"""
+import importlib, sys, time
+for name in {_PRELOADED!r}:
+    importlib.import_module(name)
+started = time.perf_counter()
+import custom_components.powermix
+import custom_components.powermix.sensor
+elapsed = time.perf_counter() - started
+print(elapsed, "custom_components.powermix.config_flow" in sys.modules)
+"""
+
+POWER = {"device_class": "power", "unit_of_measurement": "W"}
+CONSUMERS = 5
+
+
+def measure_import(repeat: int) -> tuple[float, bool]:
+    """Return the best import time in ms and whether config_flow was loaded."""
+
+    best = float("inf")
+    config_flow = False
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        best = min(best, float(output[0]) * 1000)
+        config_flow = config_flow or output[1] == "True"
+    return best, config_flow
+
+
+async def _setup_entries(count: int) -> float:
+    from homeassistant import loader
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+
+    from custom_components.powermix.const import (
+        CONF_INCLUDED_SENSORS,
+        CONF_MAIN_SENSOR,
+        CONF_PRODUCER_SENSORS,
+        CONF_SENSOR_PREFIX,
+        DOMAIN,
+    )
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            # Set up dependencies and the integration itself outside the timing.
+            assert await async_setup_component(hass, DOMAIN, {})
+            assert await async_setup_component(hass, "sensor", {})
+            entries = []
+            for index in range(count):
+                consumers = [f"sensor.site_{index}_load_{load}" for load in range(CONSUMERS)]
+                hass.states.async_set(f"sensor.site_{index}_total", "5000", POWER)
+                hass.states.async_set(f"sensor.site_{index}_pv", "1200", POWER)
+                for entity_id in consumers:
+                    hass.states.async_set(entity_id, "300", POWER)
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    data={
+                        CONF_MAIN_SENSOR: f"sensor.site_{index}_total",
+                        CONF_INCLUDED_SENSORS: consumers,
+                        CONF_PRODUCER_SENSORS: [f"sensor.site_{index}_pv"],
+                        CONF_SENSOR_PREFIX: f"Site {index}",
+                    },
+                )
+                entry.add_to_hass(hass)
+                entries.append(entry)
+
+            started = time.perf_counter()
+            for entry in entries:
+                assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            elapsed = time.perf_counter() - started
+
+            for entry in entries:
+                await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop(force=True)
+    return elapsed
+
+
+def measure_setup(count: int, repeat: int) -> float:
+    """Return the best per-entry setup time in ms for ``count`` entries."""
+
+    return min(asyncio.run(_setup_entries(count)) for _ in range(repeat)) / count * 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--entries", type=int, nargs="+", default=[1, 10, 100], help="entry counts to set up"
+    )
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    import_ms, config_flow = measure_import(args.repeat)
+    note = "  (config_flow imported!)" if config_flow else ""
+    print(f"{'import':<22} {import_ms:>8.2f} ms{note}")
+    for count in args.entries:
+        per_entry = measure_setup(count, args.repeat)
+        print(f"{f'setup x{count}':<22} {per_entry:>8.2f} ms/entry")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
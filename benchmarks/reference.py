@@ -0,0 +1,82 @@
+"""Straightforward reference versions of the numeric core for ``bench_core``.
+
+These are the helpers as they were before the core was tuned, plus a plain
+``Decimal`` take on the milliwatt parser. They are timed in the same run as
+the real core, so the regression gate compares ratios that do not depend on
+how fast the machine is.
+"""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from typing import Any, Sequence
+
+
+def coerce_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in {"unknown", "unavailable", "none", "nan"}:
+            return None
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    return None
+
+
+def calculate_other(main: Any, parts: Sequence[Any], *, allow_negative: bool = False) -> float | None:
+    main_value = coerce_float(main)
+    if main_value is None:
+        return None
+    total = 0.0
+    for entry in parts:
+        parsed = coerce_float(entry)
+        if parsed is not None:
+            total += parsed
+    result = round(main_value - total, 2)
+    if not allow_negative:
+        return max(0.0, result)
+    return result
+
+
+def milliwatts(value: Any, unit: str | None) -> tuple[int | None, str | None]:
+    normalized = _normalize_unit(unit)
+    label = "W" if normalized else unit
+    scale = 1_000_000 if normalized == "kW" else 1000
+    try:
+        number = Decimal(value.strip() if isinstance(value, str) else value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None, label
+    if not number.is_finite():
+        return None, label
+    return int((number * scale).quantize(Decimal(1), rounding=ROUND_HALF_EVEN)), label
+
+
+def other_milliwatts(
+    main: int | None, parts: Sequence[int | None], *, allow_negative: bool = False
+) -> int | None:
+    if main is None:
+        return None
+    total = 0
+    for part in parts:
+        if part is not None:
+            total += part
+    remaining = main - total
+    if not allow_negative:
+        return max(0, remaining)
+    return remaining
+
+
+def _normalize_unit(unit: str | None) -> str | None:
+    if not unit:
+        return None
+    text = str(unit).strip().lower()
+    if text in {"kw", "kilowatt", "kilowatts"}:
+        return "kW"
+    if text in {"w", "watt", "watts"}:
+        return "W"
+    return None
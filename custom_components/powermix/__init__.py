@@ -2,23 +2,245 @@
 
 from __future__ import annotations
 
+import logging
+from pathlib import Path
+from typing import Any
+
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, Unauthorized, UnknownUser
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_BREAKDOWNS,
+    ATTR_DRY_RUN,
+    ATTR_DURATION,
+    ATTR_END,
+    ATTR_ENTRY_ID,
+    ATTR_FILENAME,
+    ATTR_STAGGER,
+    ATTR_START,
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_PRODUCER_SENSORS,
+    DATA_METRICS_VIEW,
+    DATA_WEBSOCKET,
+    DEFAULT_IMPORT_STAGGER,
+    DOMAIN,
+    ROLE_CONSUMER,
+    ROLE_PRODUCER,
+    RULE_KEYS,
+    SERVICE_IMPORT_BREAKDOWNS,
+    SERVICE_REBUILD_STATISTICS,
+    SERVICE_RECORD_EVENTS,
+)
 
-from .const import DOMAIN
+_LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[str] = ["sensor"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+RECORD_EVENTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DURATION, default=300): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=86400)
+        ),
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+
+REBUILD_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+IMPORT_BREAKDOWNS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_FILENAME, "source"): cv.string,
+            vol.Exclusive(ATTR_BREAKDOWNS, "source"): vol.All(cv.ensure_list, [dict]),
+            vol.Optional(ATTR_DRY_RUN, default=False): cv.boolean,
+            vol.Optional(ATTR_STAGGER, default=DEFAULT_IMPORT_STAGGER): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=60)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_FILENAME, ATTR_BREAKDOWNS),
+)
+
 
 def _combined_config(entry: ConfigEntry) -> dict:
     return {**entry.data, **entry.options}
 
 
+def _resolved_config(runtime: dict) -> dict:
+    """Return the entry config with its rule-based members expanded as of now."""
+
+    config = dict(runtime["config"])
+    tracker = runtime.get("membership")
+    if tracker is None:
+        return config
+    for role, conf_key in (
+        (ROLE_CONSUMER, CONF_INCLUDED_SENSORS),
+        (ROLE_PRODUCER, CONF_PRODUCER_SENSORS),
+    ):
+        config[conf_key] = [*config.get(conf_key, []), *tracker.role_members(role)]
+        for key in RULE_KEYS[role]:
+            config.pop(key, None)
+    return config
+
+
+async def _async_allowed_path(hass: HomeAssistant, filename: str) -> Path:
+    """Resolve ``filename`` against the config directory and check the allowlist."""
+
+    path = Path(hass.config.path(filename))
+    if not await hass.async_add_executor_job(hass.config.is_allowed_path, str(path)):
+        raise HomeAssistantError(
+            f"{path} is not in a directory listed in allowlist_external_dirs"
+        )
+    return path
+
+
+async def _async_require_admin(hass: HomeAssistant, call: ServiceCall) -> None:
+    # async_register_admin_service cannot return a response, so services that
+    # do run the same check themselves.
+    if call.context.user_id:
+        user = await hass.auth.async_get_user(call.context.user_id)
+        if user is None:
+            raise UnknownUser(context=call.context)
+        if not user.is_admin:
+            raise Unauthorized(context=call.context)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    # Service and view modules are imported when first used to keep startup cheap.
+    async def _async_record_events(call: ServiceCall) -> None:
+        from .capture import StateChangeRecorder, capture_sources, write_capture
+
+        entry_id: str = call.data[ATTR_ENTRY_ID]
+        runtime = hass.data.get(DOMAIN, {}).get(entry_id)
+        if runtime is None:
+            raise HomeAssistantError(f"Powermix entry {entry_id} is not loaded")
+        entry_config = _resolved_config(runtime)
+        filename = call.data.get(ATTR_FILENAME) or f"powermix_capture_{entry_id}.jsonl"
+        path = await _async_allowed_path(hass, filename)
+        recorder = StateChangeRecorder(hass, capture_sources(entry_config))
+        recorder.async_start()
+        unsubscribers: list[CALLBACK_TYPE] = []
+
+        async def _async_write(events: list) -> None:
+            header = {"entry_id": entry_id, "config": entry_config}
+            await hass.async_add_executor_job(write_capture, path, header, events)
+            _LOGGER.info("Captured %d Powermix source events to %s", len(events), path)
+
+        @callback
+        def _async_finish(*_: Any) -> None:
+            # Runs once: when the duration is over, or early with what was
+            # captured so far when the entry unloads or Home Assistant stops.
+            if not unsubscribers:
+                return
+            for unsubscribe in unsubscribers:
+                unsubscribe()
+            unsubscribers.clear()
+            hass.async_create_task(_async_write(recorder.async_stop()))
+
+        unsubscribers.append(async_call_later(hass, call.data[ATTR_DURATION], _async_finish))
+        unsubscribers.append(hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _async_finish))
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is not None:
+            entry.async_on_unload(_async_finish)
+
+    async def _async_rebuild_statistics(call: ServiceCall) -> None:
+        from .statistics import async_rebuild_statistics
+
+        entry_id: str = call.data[ATTR_ENTRY_ID]
+        runtime = hass.data.get(DOMAIN, {}).get(entry_id)
+        if runtime is None:
+            raise HomeAssistantError(f"Powermix entry {entry_id} is not loaded")
+        await async_rebuild_statistics(
+            hass,
+            entry_id,
+            _resolved_config(runtime),
+            dt_util.as_local(call.data[ATTR_START]),
+            dt_util.as_local(call.data.get(ATTR_END) or dt_util.now()),
+        )
+
+    async def _async_import_breakdowns(call: ServiceCall) -> ServiceResponse:
+        from .importer import (
+            async_import_breakdowns,
+            load_breakdowns,
+            validate_breakdowns,
+        )
+
+        await _async_require_admin(hass, call)
+        if ATTR_FILENAME in call.data:
+            path = await _async_allowed_path(hass, call.data[ATTR_FILENAME])
+            try:
+                raw = await hass.async_add_executor_job(load_breakdowns, path)
+            except (OSError, ValueError) as err:
+                raise HomeAssistantError(f"Cannot read {path}: {err}") from err
+        else:
+            raw = call.data[ATTR_BREAKDOWNS]
+        breakdowns = validate_breakdowns(hass, raw)
+        if call.data[ATTR_DRY_RUN]:
+            return {"valid": [breakdown[CONF_MAIN_SENSOR] for breakdown in breakdowns]}
+        return await async_import_breakdowns(
+            hass, breakdowns, stagger=call.data[ATTR_STAGGER]
+        )
+
+    async_register_admin_service(
+        hass, DOMAIN, SERVICE_RECORD_EVENTS, _async_record_events, schema=RECORD_EVENTS_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REBUILD_STATISTICS,
+        _async_rebuild_statistics,
+        schema=REBUILD_STATISTICS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_BREAKDOWNS,
+        _async_import_breakdowns,
+        schema=IMPORT_BREAKDOWNS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "config": _combined_config(entry),
     }
 
+    if not hass.data.get(DATA_METRICS_VIEW):
+        from .view import PowermixMetricsView
+
+        hass.http.register_view(PowermixMetricsView())
+        hass.data[DATA_METRICS_VIEW] = True
+    if not hass.data.get(DATA_WEBSOCKET):
+        from .websocket_api import async_setup_websocket
+
+        async_setup_websocket(hass)
+        hass.data[DATA_WEBSOCKET] = True
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
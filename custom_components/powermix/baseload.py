@@ -0,0 +1,205 @@
+"""Streaming estimate of the always-on load hidden in Other Usage.
+
+Other Usage is a step function: each value holds until the next one. Over a
+sliding window the estimator keeps
+
+* the exact rolling minimum, via a monotonic deque of values that can still
+  become the minimum (amortized O(1) per update), and
+* a time-weighted low percentile, via a log-bucketed histogram per time slot
+  whose window total is maintained incrementally, so an update costs O(1) and
+  a query sorts a few hundred buckets at most.
+
+Both are plain data and round-trip through :meth:`BaseloadEstimator.as_dict`
+so the history survives restarts.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import math
+from typing import Any
+
+# Values closer to zero than this share one bucket.
+_ZERO = 0.5
+
+
+class RollingMinimum:
+    """Exact minimum of a step function over the last ``window`` seconds."""
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        # (time the value stopped being current, value); values strictly increase.
+        self._ended: deque[tuple[float, float]] = deque()
+        self._current: float | None = None
+
+    def add(self, now: float, value: float | None) -> None:
+        if self._current is not None:
+            self._push(now, self._current)
+        self._current = value
+        self._expire(now)
+
+    def value(self, now: float) -> float | None:
+        self._expire(now)
+        oldest = self._ended[0][1] if self._ended else None
+        if oldest is None or self._current is None:
+            return self._current if oldest is None else oldest
+        return min(oldest, self._current)
+
+    def _push(self, ended: float, value: float) -> None:
+        # Anything not smaller that ended earlier can never be the minimum again.
+        while self._ended and self._ended[-1][1] >= value:
+            self._ended.pop()
+        self._ended.append((ended, value))
+
+    def _expire(self, now: float) -> None:
+        horizon = now - self.window
+        while self._ended and self._ended[0][0] < horizon:
+            self._ended.popleft()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"ended": [list(item) for item in self._ended]}
+
+    def restore(self, data: dict[str, Any], now: float) -> None:
+        live = list(self._ended)
+        self._ended.clear()
+        # Values recorded since startup are newer than anything restored.
+        for ended, value in [*data.get("ended", []), *live]:
+            self._push(float(ended), float(value))
+        self._expire(now)
+
+
+class RollingQuantile:
+    """Time-weighted quantiles of a step function over a sliding window.
+
+    The window is split into ``slots``; durations are accumulated per slot in
+    buckets with ``accuracy`` relative error, and whole slots expire at once, so
+    the window is exact to one slot length.
+    """
+
+    def __init__(self, window: float, *, slots: int = 96, accuracy: float = 0.01) -> None:
+        self.window = window
+        self._slot_length = window / slots
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._slots: deque[tuple[int, dict[float, float]]] = deque()
+        self._totals: dict[float, float] = {}
+        self._current: float | None = None
+        self._since = 0.0
+
+    def add(self, now: float, value: float | None) -> None:
+        self._integrate(now)
+        self._current = None if value is None else self._bucket(value)
+
+    def quantile(self, now: float, q: float) -> float | None:
+        self._integrate(now)
+        covered = sum(self._totals.values())
+        if covered <= 0:
+            return None
+        target = q * covered
+        running = 0.0
+        for bucket in sorted(self._totals):
+            running += self._totals[bucket]
+            if running >= target:
+                return bucket
+        return max(self._totals)
+
+    def _bucket(self, value: float) -> float:
+        if abs(value) < _ZERO:
+            return 0.0
+        index = math.ceil(math.log(abs(value)) / self._log_gamma)
+        # The bucket midpoint is within ``accuracy`` of every value it holds.
+        return math.copysign(2 * self._gamma**index / (self._gamma + 1), value)
+
+    def _integrate(self, now: float) -> None:
+        start, self._since = self._since, max(self._since, now)
+        if self._current is not None:
+            while start < now:
+                slot = math.floor(start / self._slot_length)
+                end = min(now, (slot + 1) * self._slot_length)
+                if not self._slots or self._slots[-1][0] != slot:
+                    self._slots.append((slot, {}))
+                seconds = end - start
+                bucket = self._current
+                counts = self._slots[-1][1]
+                counts[bucket] = counts.get(bucket, 0.0) + seconds
+                self._totals[bucket] = self._totals.get(bucket, 0.0) + seconds
+                start = end
+        self._expire(now)
+
+    def _expire(self, now: float) -> None:
+        oldest = math.floor((now - self.window) / self._slot_length)
+        while self._slots and self._slots[0][0] <= oldest:
+            _, counts = self._slots.popleft()
+            for bucket, seconds in counts.items():
+                remaining = self._totals[bucket] - seconds
+                if remaining > 1e-9:
+                    self._totals[bucket] = remaining
+                else:
+                    del self._totals[bucket]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "slots": [
+                [slot, [[bucket, seconds] for bucket, seconds in counts.items()]]
+                for slot, counts in self._slots
+            ]
+        }
+
+    def restore(self, data: dict[str, Any], now: float) -> None:
+        merged: dict[int, dict[float, float]] = {}
+        restored = [
+            (int(slot), {float(bucket): float(seconds) for bucket, seconds in counts})
+            for slot, counts in data.get("slots", [])
+        ]
+        # The slot open at shutdown may have been reopened since startup.
+        for slot, counts in [*restored, *self._slots]:
+            target = merged.setdefault(slot, {})
+            for bucket, seconds in counts.items():
+                target[bucket] = target.get(bucket, 0.0) + seconds
+        self._slots = deque(sorted(merged.items()))
+        self._totals = {}
+        for _, counts in self._slots:
+            for bucket, seconds in counts.items():
+                self._totals[bucket] = self._totals.get(bucket, 0.0) + seconds
+        self._expire(now)
+
+
+class BaseloadEstimator:
+    """Rolling minimum and low percentile of Other Usage over one window."""
+
+    def __init__(self, window: float, percentile: float) -> None:
+        self.window = window
+        self.percentile = percentile
+        self.minimum = RollingMinimum(window)
+        self.quantile = RollingQuantile(window)
+
+    def update(self, now: float, value: float | None) -> None:
+        self.minimum.add(now, value)
+        self.quantile.add(now, value)
+
+    def estimate(self, now: float) -> tuple[float | None, float | None]:
+        """Return ``(rolling minimum, low percentile)`` as of ``now``."""
+
+        return (
+            self.minimum.value(now),
+            self.quantile.quantile(now, self.percentile / 100),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "window": self.window,
+            "minimum": self.minimum.as_dict(),
+            "quantile": self.quantile.as_dict(),
+        }
+
+    def restore(self, data: dict[str, Any], now: float) -> None:
+        """Merge history saved by :meth:`as_dict` into the live state.
+
+        History saved with a different window is dropped. The value that was
+        current at shutdown is not extended over the downtime.
+        """
+
+        if data.get("window") != self.window:
+            return
+        self.minimum.restore(data.get("minimum", {}), now)
+        self.quantile.restore(data.get("quantile", {}), now)
@@ -0,0 +1,81 @@
+"""Last-known-value cache that rides out short source outages."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class _CachedValue:
+    value: int
+    unit: str | None
+    updated: float
+    lost_at: float | None = None
+    expired: bool = False
+
+
+class LastKnownValueCache:
+    """Hold the previous reading of a source while it is briefly unavailable.
+
+    Every source reports through :meth:`resolve`. A parseable reading is stored
+    and returned as-is. A missing reading (``unavailable``, ``unknown`` or a
+    removed entity) returns the stored reading until ``ttl`` seconds have
+    passed since the source was lost; after that the outage is counted as an
+    expiration and ``None`` is returned like it would be without the cache.
+    ``holds`` and ``expirations`` count outages, not lookups.
+    A ``ttl`` of zero disables holding entirely.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = max(0.0, float(ttl))
+        self.holds = 0
+        self.expirations = 0
+        self._values: dict[str, _CachedValue] = {}
+
+    def resolve(
+        self, entity_id: str, value: int | None, unit: str | None, now: float
+    ) -> tuple[int | None, str | None, bool]:
+        """Return ``(value, unit, held)`` for the latest reading of ``entity_id``."""
+
+        cached = self._values.get(entity_id)
+        if value is not None:
+            if cached is None:
+                self._values[entity_id] = _CachedValue(value, unit, now)
+            else:
+                cached.value = value
+                cached.unit = unit
+                cached.updated = now
+                cached.lost_at = None
+                cached.expired = False
+            return value, unit, False
+
+        if cached is None or self.ttl <= 0 or cached.expired:
+            return None, unit, False
+        if cached.lost_at is None:
+            cached.lost_at = now
+            self.holds += 1
+        if now - cached.lost_at < self.ttl:
+            return cached.value, cached.unit, True
+        cached.expired = True
+        self.expirations += 1
+        return None, unit, False
+
+    def remaining(self, entity_id: str, now: float) -> float | None:
+        """Seconds until the hold on ``entity_id`` expires, if one is active."""
+
+        cached = self._values.get(entity_id)
+        if cached is None or cached.lost_at is None or cached.expired:
+            return None
+        return max(0.0, self.ttl - (now - cached.lost_at))
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "ttl": self.ttl,
+            "holds": self.holds,
+            "expirations": self.expirations,
+            "holding": sorted(
+                entity_id
+                for entity_id, cached in self._values.items()
+                if cached.lost_at is not None and not cached.expired
+            ),
+        }
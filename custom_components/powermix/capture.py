@@ -0,0 +1,144 @@
+"""Capture state changes of Powermix sources for later replay.
+
+A capture file is JSON lines. The first line is a header object with the
+format version, the entry id and its combined configuration. Every other line
+is a compact array ``[offset, entity_id, state, unit, friendly_name]`` where
+``offset`` is the number of seconds since the capture started and trailing
+``None`` fields after the state are omitted (a ``null`` state means the entity
+was removed). The first events of a capture are a snapshot of every source so
+a replay starts from the same state that was recorded.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import CONF_INCLUDED_SENSORS, CONF_MAIN_SENSOR, CONF_PRODUCER_SENSORS
+
+CAPTURE_VERSION = 1
+
+
+@dataclass(slots=True, frozen=True)
+class CapturedEvent:
+    offset: float
+    entity_id: str
+    state: str | None
+    unit: str | None = None
+    friendly_name: str | None = None
+
+    def as_row(self) -> list[Any]:
+        row: list[Any] = [
+            self.offset,
+            self.entity_id,
+            self.state,
+            self.unit,
+            self.friendly_name,
+        ]
+        while len(row) > 3 and row[-1] is None:
+            row.pop()
+        return row
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> CapturedEvent:
+        return cls(float(row[0]), row[1], *row[2:5])
+
+
+def capture_sources(config: dict[str, Any]) -> list[str]:
+    """Return the unique source entities of an entry configuration."""
+
+    return list(
+        dict.fromkeys(
+            [
+                config[CONF_MAIN_SENSOR],
+                *config.get(CONF_INCLUDED_SENSORS, []),
+                *config.get(CONF_PRODUCER_SENSORS, []),
+            ]
+        )
+    )
+
+
+def write_capture(
+    path: Path, header: dict[str, Any], events: Iterable[CapturedEvent]
+) -> None:
+    """Write a capture file; blocking, run it in an executor from the event loop."""
+
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write(json.dumps({"version": CAPTURE_VERSION, **header}) + "\n")
+        for event in events:
+            handle.write(json.dumps(event.as_row(), separators=(",", ":")) + "\n")
+
+
+def read_capture(path: Path) -> tuple[dict[str, Any], Iterator[CapturedEvent]]:
+    """Return the header and a lazy iterator over the events of a capture file."""
+
+    handle = path.open(encoding="utf-8")
+    header = json.loads(handle.readline())
+    if header.get("version") != CAPTURE_VERSION:
+        handle.close()
+        raise ValueError(f"Unsupported capture version: {header.get('version')!r}")
+
+    def _events() -> Iterator[CapturedEvent]:
+        with handle:
+            for line in handle:
+                if line.strip():
+                    yield CapturedEvent.from_row(json.loads(line))
+
+    return header, _events()
+
+
+class StateChangeRecorder:
+    """Buffer state changes of ``entity_ids`` in memory until :meth:`async_stop`.
+
+    The recorder only needs a ``hass`` object, so it can be attached to the live
+    instance through the ``record_events`` service or to a test core directly.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_ids: Iterable[str]) -> None:
+        self.hass = hass
+        self.entity_ids = list(entity_ids)
+        self.events: list[CapturedEvent] = []
+        self._started = 0.0
+        self._unsubscribe: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        self._started = time.monotonic()
+        for entity_id in self.entity_ids:
+            self._append(entity_id, self.hass.states.get(entity_id), 0.0)
+        self._unsubscribe = async_track_state_change_event(
+            self.hass, self.entity_ids, self._handle_state_change
+        )
+
+    @callback
+    def async_stop(self) -> list[CapturedEvent]:
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        return self.events
+
+    @callback
+    def _handle_state_change(self, event: Event) -> None:
+        offset = round(time.monotonic() - self._started, 3)
+        self._append(event.data["entity_id"], event.data.get("new_state"), offset)
+
+    def _append(self, entity_id: str, state: State | None, offset: float) -> None:
+        if state is None:
+            self.events.append(CapturedEvent(offset, entity_id, None))
+            return
+        self.events.append(
+            CapturedEvent(
+                offset,
+                entity_id,
+                state.state,
+                state.attributes.get("unit_of_measurement"),
+                state.attributes.get("friendly_name"),
+            )
+        )
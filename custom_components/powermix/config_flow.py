@@ -6,26 +6,86 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.const import CONF_NAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    CONF_BASELOAD_PERCENTILE,
+    CONF_BASELOAD_WINDOW,
+    CONF_ENERGY_CYCLES,
+    CONF_ENERGY_OFFSET,
+    CONF_ENERGY_TIMEZONE,
+    CONF_HISTORY_RETENTION,
     CONF_INCLUDED_SENSORS,
     CONF_MAIN_SENSOR,
     CONF_PRODUCER_SENSORS,
     CONF_SENSOR_PREFIX,
+    CONF_STALE_TIMEOUT,
+    CONF_STEP_THRESHOLD,
+    CYCLES,
+    DEFAULT_BASELOAD_PERCENTILE,
+    DEFAULT_BASELOAD_WINDOW,
+    DEFAULT_ENERGY_OFFSET,
+    DEFAULT_HISTORY_RETENTION,
     DEFAULT_SENSOR_PREFIX,
+    DEFAULT_STALE_TIMEOUT,
+    DEFAULT_STEP_THRESHOLD,
     DOMAIN,
+    RULE_KEYS,
     SENSOR_DOMAIN,
 )
 
-POWER_SELECTOR = selector.EntitySelector(
-    selector.EntitySelectorConfig(
-        domain=[SENSOR_DOMAIN],
-        device_class=["power"],
+
+def _power_selector(exclude: str | None = None) -> selector.EntitySelector:
+    """Pick one power sensor, or several other than ``exclude``.
+
+    Selectors are built per form so importing this module stays cheap.
+    """
+
+    if exclude is None:
+        return selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=[SENSOR_DOMAIN], device_class=["power"])
+        )
+    return selector.EntitySelector(
+        selector.EntitySelectorConfig(
+            domain=[SENSOR_DOMAIN],
+            device_class=["power"],
+            multiple=True,
+            exclude_entities=[exclude],
+        )
     )
-)
+
+
+def _membership_fields(current: dict[str, Any]) -> dict[vol.Marker, Any]:
+    """Return the form fields that pick members by area, label, device or glob."""
+
+    fields: dict[vol.Marker, Any] = {}
+    for areas, labels, devices, patterns in RULE_KEYS.values():
+        fields[vol.Optional(areas, default=current.get(areas, []))] = selector.AreaSelector(
+            selector.AreaSelectorConfig(multiple=True)
+        )
+        fields[vol.Optional(labels, default=current.get(labels, []))] = selector.LabelSelector(
+            selector.LabelSelectorConfig(multiple=True)
+        )
+        fields[vol.Optional(devices, default=current.get(devices, []))] = (
+            selector.DeviceSelector(selector.DeviceSelectorConfig(multiple=True))
+        )
+        fields[vol.Optional(patterns, default=current.get(patterns, []))] = (
+            selector.TextSelector(selector.TextSelectorConfig(multiple=True))
+        )
+    return fields
+
+
+def _membership_data(user_input: dict[str, Any]) -> dict[str, list[str]]:
+    data: dict[str, list[str]] = {}
+    for keys in RULE_KEYS.values():
+        for key in keys:
+            values = [value.strip() for value in user_input.get(key) or []]
+            data[key] = list(dict.fromkeys(value for value in values if value))
+    return data
 
 
 class PowermixConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -41,7 +101,7 @@ class PowermixConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._main_sensor = user_input[CONF_MAIN_SENSOR]
             return await self.async_step_sensors()
 
-        data_schema = vol.Schema({vol.Required(CONF_MAIN_SENSOR): POWER_SELECTOR})
+        data_schema = vol.Schema({vol.Required(CONF_MAIN_SENSOR): _power_selector()})
         return self.async_show_form(step_id="user", data_schema=data_schema)
 
     async def async_step_sensors(self, user_input: dict[str, Any] | None = None) -> FlowResult:
@@ -61,6 +121,7 @@ class PowermixConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_INCLUDED_SENSORS: filtered,
                 CONF_PRODUCER_SENSORS: producer_filtered,
                 CONF_SENSOR_PREFIX: prefix.strip() or DEFAULT_SENSOR_PREFIX,
+                **_membership_data(user_input),
             }
             friendly_title = await self._main_sensor_title()
             title = f"{friendly_title} breakdown"
@@ -68,27 +129,41 @@ class PowermixConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         schema = vol.Schema(
             {
-                vol.Optional(CONF_INCLUDED_SENSORS, default=[]): selector.EntitySelector(
-                    selector.EntitySelectorConfig(
-                        domain=[SENSOR_DOMAIN],
-                        device_class=["power"],
-                        multiple=True,
-                        exclude_entities=[self._main_sensor],
-                    )
+                vol.Optional(CONF_INCLUDED_SENSORS, default=[]): _power_selector(
+                    self._main_sensor
                 ),
-                vol.Optional(CONF_PRODUCER_SENSORS, default=[]): selector.EntitySelector(
-                    selector.EntitySelectorConfig(
-                        domain=[SENSOR_DOMAIN],
-                        device_class=["power"],
-                        multiple=True,
-                        exclude_entities=[self._main_sensor],
-                    )
+                vol.Optional(CONF_PRODUCER_SENSORS, default=[]): _power_selector(
+                    self._main_sensor
                 ),
+                **_membership_fields({}),
                 vol.Required(CONF_SENSOR_PREFIX, default=DEFAULT_SENSOR_PREFIX): str,
             }
         )
         return self.async_show_form(step_id="sensors", data_schema=schema)
 
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create or update the entry of one validated breakdown definition.
+
+        Definitions come from the ``import_breakdowns`` service, which validates
+        the whole set first. An existing entry with the same main sensor is
+        updated in place: the definition replaces its data, and options set in
+        the UI are kept unless the definition sets the same key.
+        """
+
+        data = {key: value for key, value in import_data.items() if key != CONF_NAME}
+        self._main_sensor = data[CONF_MAIN_SENSOR]
+        title = import_data.get(CONF_NAME) or f"{await self._main_sensor_title()} breakdown"
+        for entry in self._async_current_entries(include_ignore=False):
+            if entry.data.get(CONF_MAIN_SENSOR) != self._main_sensor:
+                continue
+            options = {key: value for key, value in entry.options.items() if key not in data}
+            if self.hass.config_entries.async_update_entry(
+                entry, title=title, data=data, options=options
+            ):
+                return self.async_abort(reason="updated")
+            return self.async_abort(reason="unchanged")
+        return self.async_create_entry(title=title, data=data)
+
     async def _main_sensor_title(self) -> str:
         if not self._main_sensor:
             return "Powermix"
@@ -113,8 +188,21 @@ class PowermixOptionsFlowHandler(config_entries.OptionsFlow):
         current_include = base.get(CONF_INCLUDED_SENSORS, [])
         current_prefix = base.get(CONF_SENSOR_PREFIX, DEFAULT_SENSOR_PREFIX)
         current_producers = base.get(CONF_PRODUCER_SENSORS, [])
+        current_stale_timeout = base.get(CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT)
+        current_window = base.get(CONF_BASELOAD_WINDOW, DEFAULT_BASELOAD_WINDOW)
+        current_percentile = base.get(CONF_BASELOAD_PERCENTILE, DEFAULT_BASELOAD_PERCENTILE)
+        current_cycles = base.get(CONF_ENERGY_CYCLES, [])
+        current_offset = base.get(CONF_ENERGY_OFFSET, DEFAULT_ENERGY_OFFSET)
+        current_time_zone = base.get(CONF_ENERGY_TIMEZONE, "")
+        current_step_threshold = base.get(CONF_STEP_THRESHOLD, DEFAULT_STEP_THRESHOLD)
+        current_retention = base.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION)
+        errors: dict[str, str] = {}
 
         if user_input is not None:
+            time_zone = (user_input.get(CONF_ENERGY_TIMEZONE) or "").strip()
+            if time_zone and dt_util.get_time_zone(time_zone) is None:
+                errors[CONF_ENERGY_TIMEZONE] = "invalid_time_zone"
+        if user_input is not None and not errors:
             include = [
                 entity
                 for entity in user_input.get(CONF_INCLUDED_SENSORS, [])
@@ -130,6 +218,27 @@ class PowermixOptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_INCLUDED_SENSORS: include,
                 CONF_PRODUCER_SENSORS: producers,
                 CONF_SENSOR_PREFIX: prefix.strip() or DEFAULT_SENSOR_PREFIX,
+                **_membership_data(user_input),
+                CONF_STALE_TIMEOUT: int(
+                    user_input.get(CONF_STALE_TIMEOUT, current_stale_timeout)
+                ),
+                CONF_BASELOAD_WINDOW: int(
+                    user_input.get(CONF_BASELOAD_WINDOW, current_window)
+                ),
+                CONF_BASELOAD_PERCENTILE: float(
+                    user_input.get(CONF_BASELOAD_PERCENTILE, current_percentile)
+                ),
+                CONF_ENERGY_CYCLES: [
+                    cycle for cycle in CYCLES if cycle in user_input.get(CONF_ENERGY_CYCLES, [])
+                ],
+                CONF_ENERGY_OFFSET: int(user_input.get(CONF_ENERGY_OFFSET, current_offset)),
+                CONF_ENERGY_TIMEZONE: time_zone,
+                CONF_STEP_THRESHOLD: int(
+                    user_input.get(CONF_STEP_THRESHOLD, current_step_threshold)
+                ),
+                CONF_HISTORY_RETENTION: int(
+                    user_input.get(CONF_HISTORY_RETENTION, current_retention)
+                ),
             }
             return self.async_create_entry(title="", data=data)
 
@@ -137,25 +246,90 @@ class PowermixOptionsFlowHandler(config_entries.OptionsFlow):
             {
                 vol.Optional(
                     CONF_INCLUDED_SENSORS, default=current_include
-                ): selector.EntitySelector(
-                    selector.EntitySelectorConfig(
-                        domain=[SENSOR_DOMAIN],
-                        device_class=["power"],
-                        multiple=True,
-                        exclude_entities=[main_sensor],
+                ): _power_selector(main_sensor),
+                vol.Optional(
+                    CONF_PRODUCER_SENSORS, default=current_producers
+                ): _power_selector(main_sensor),
+                **_membership_fields(base),
+                vol.Required(CONF_SENSOR_PREFIX, default=current_prefix): str,
+                vol.Optional(
+                    CONF_STALE_TIMEOUT, default=current_stale_timeout
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=3600,
+                        step=1,
+                        unit_of_measurement="s",
+                        mode=selector.NumberSelectorMode.BOX,
                     )
                 ),
                 vol.Optional(
-                    CONF_PRODUCER_SENSORS, default=current_producers
-                ): selector.EntitySelector(
-                    selector.EntitySelectorConfig(
-                        domain=[SENSOR_DOMAIN],
-                        device_class=["power"],
+                    CONF_BASELOAD_WINDOW, default=current_window
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=720,
+                        step=1,
+                        unit_of_measurement="h",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_BASELOAD_PERCENTILE, default=current_percentile
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=50,
+                        step=0.5,
+                        unit_of_measurement="%",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_ENERGY_CYCLES, default=current_cycles
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=list(CYCLES),
                         multiple=True,
-                        exclude_entities=[main_sensor],
+                        translation_key=CONF_ENERGY_CYCLES,
+                    )
+                ),
+                vol.Optional(
+                    CONF_ENERGY_OFFSET, default=current_offset
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=23,
+                        step=1,
+                        unit_of_measurement="h",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_ENERGY_TIMEZONE, default=current_time_zone
+                ): selector.TextSelector(),
+                vol.Optional(
+                    CONF_STEP_THRESHOLD, default=current_step_threshold
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=100000,
+                        step=1,
+                        unit_of_measurement="W",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_HISTORY_RETENTION, default=current_retention
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1440,
+                        step=1,
+                        unit_of_measurement="min",
+                        mode=selector.NumberSelectorMode.BOX,
                     )
                 ),
-                vol.Required(CONF_SENSOR_PREFIX, default=current_prefix): str,
             }
         )
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
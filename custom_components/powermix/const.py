@@ -2,15 +2,90 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
+
 DOMAIN = "powermix"
 SENSOR_DOMAIN = "sensor"
 
+DATA_METRICS_VIEW = f"{DOMAIN}_metrics_view"
+DATA_WEBSOCKET = f"{DOMAIN}_websocket"
+DATA_ENERGY_SCHEDULER = f"{DOMAIN}_energy_scheduler"
+
 CONF_MAIN_SENSOR = "main_sensor"
 CONF_INCLUDED_SENSORS = "included_sensors"
 CONF_PRODUCER_SENSORS = "producer_sensors"
 CONF_SENSOR_PREFIX = "sensor_prefix"
+CONF_STALE_TIMEOUT = "stale_timeout"
+CONF_BASELOAD_WINDOW = "baseload_window"
+CONF_BASELOAD_PERCENTILE = "baseload_percentile"
+CONF_ENERGY_CYCLES = "energy_cycles"
+CONF_ENERGY_OFFSET = "energy_offset"
+CONF_ENERGY_TIMEZONE = "energy_timezone"
+CONF_STEP_THRESHOLD = "step_threshold"
+CONF_HISTORY_RETENTION = "history_retention"
+CONF_CONSUMER_AREAS = "consumer_areas"
+CONF_CONSUMER_LABELS = "consumer_labels"
+CONF_CONSUMER_DEVICES = "consumer_devices"
+CONF_CONSUMER_PATTERNS = "consumer_patterns"
+CONF_PRODUCER_AREAS = "producer_areas"
+CONF_PRODUCER_LABELS = "producer_labels"
+CONF_PRODUCER_DEVICES = "producer_devices"
+CONF_PRODUCER_PATTERNS = "producer_patterns"
+
+ROLE_CONSUMER = "consumer"
+ROLE_PRODUCER = "producer"
+
+# role -> (areas, labels, devices, patterns) configuration keys
+RULE_KEYS: dict[str, tuple[str, str, str, str]] = {
+    ROLE_CONSUMER: (
+        CONF_CONSUMER_AREAS,
+        CONF_CONSUMER_LABELS,
+        CONF_CONSUMER_DEVICES,
+        CONF_CONSUMER_PATTERNS,
+    ),
+    ROLE_PRODUCER: (
+        CONF_PRODUCER_AREAS,
+        CONF_PRODUCER_LABELS,
+        CONF_PRODUCER_DEVICES,
+        CONF_PRODUCER_PATTERNS,
+    ),
+}
+
+CYCLE_DAILY = "daily"
+CYCLE_WEEKLY = "weekly"
+CYCLE_MONTHLY = "monthly"
+CYCLES = (CYCLE_DAILY, CYCLE_WEEKLY, CYCLE_MONTHLY)
 
 DEFAULT_SENSOR_PREFIX = "Powermix"
+DEFAULT_STALE_TIMEOUT = 30
+DEFAULT_BASELOAD_WINDOW = 24
+DEFAULT_BASELOAD_PERCENTILE = 5
+DEFAULT_ENERGY_OFFSET = 0
+DEFAULT_STEP_THRESHOLD = 0
+DEFAULT_HISTORY_RETENTION = 60
+
+SERVICE_RECORD_EVENTS = "record_events"
+SERVICE_REBUILD_STATISTICS = "rebuild_statistics"
+SERVICE_IMPORT_BREAKDOWNS = "import_breakdowns"
+
+EVENT_STATISTICS_PROGRESS = f"{DOMAIN}_statistics_progress"
+EVENT_LOAD_STEP = f"{DOMAIN}_load_step"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_DURATION = "duration"
+ATTR_FILENAME = "filename"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_BREAKDOWNS = "breakdowns"
+ATTR_DRY_RUN = "dry_run"
+ATTR_STAGGER = "stagger"
+
+DEFAULT_IMPORT_STAGGER = 1.0
+
+# The baseload sensor is meant for trends, so it is written at most this often.
+BASELOAD_UPDATE_INTERVAL = timedelta(minutes=5)
+# Energy counters are written on this interval and at every cycle boundary.
+ENERGY_UPDATE_INTERVAL = timedelta(minutes=1)
 
 OTHER_SENSOR_KEY = "other"
 MIRROR_SENSOR_KEY = "mirror"
@@ -0,0 +1,25 @@
+"""Diagnostics support for Powermix."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    cache = runtime.get("cache")
+    metrics = runtime.get("metrics")
+    membership = runtime.get("membership")
+    return {
+        "config": runtime["config"],
+        "rule_members": dict(membership.members) if membership else None,
+        "stale_cache": cache.as_dict() if cache else None,
+        "counters": dict(metrics.counters) if metrics else None,
+    }
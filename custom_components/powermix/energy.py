@@ -0,0 +1,215 @@
+"""Cycle-based energy counters fed from the Powermix update path.
+
+Every published power value of the Other Usage sensor and the mirrors is
+integrated into per-cycle totals (left Riemann sum, since a value holds until
+the next one). Values arrive in integer milliwatts and time is taken in whole
+milliseconds, so the totals are exact integers (mW·ms) that never drift, no
+matter how many steps a cycle adds up. Cycle boundaries of all entries are handled by one
+:class:`EnergyScheduler` per Home Assistant instance, which keeps a single
+timer for the earliest upcoming boundary and a single interval for writing the
+counters, instead of one timer per meter.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, time, timedelta, tzinfo
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CYCLE_DAILY,
+    CYCLE_MONTHLY,
+    CYCLE_WEEKLY,
+    CYCLES,
+    ENERGY_UPDATE_INTERVAL,
+)
+
+# mW·ms per kWh
+_KWH = 1_000_000 * 3_600_000
+
+
+def cycle_start(cycle: str, when: datetime, tz: tzinfo, offset: timedelta) -> datetime:
+    """Return the start of the cycle containing ``when``.
+
+    Cycles start at local midnight plus ``offset`` of a day, a Monday or the
+    first of a month in ``tz``.
+    """
+
+    day = (when.astimezone(tz) - offset).date()
+    if cycle == CYCLE_WEEKLY:
+        day -= timedelta(days=day.weekday())
+    elif cycle == CYCLE_MONTHLY:
+        day = day.replace(day=1)
+    return _local(day, tz, offset)
+
+
+def next_cycle_start(cycle: str, start: datetime, tz: tzinfo, offset: timedelta) -> datetime:
+    """Return the start of the cycle following the one that starts at ``start``."""
+
+    day = (start.astimezone(tz) - offset).date()
+    if cycle == CYCLE_DAILY:
+        day += timedelta(days=1)
+    elif cycle == CYCLE_WEEKLY:
+        day += timedelta(days=7)
+    else:
+        day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return _local(day, tz, offset)
+
+
+def _local(day: date, tz: tzinfo, offset: timedelta) -> datetime:
+    # Wall-clock arithmetic, so an offset of 6 h means 06:00 on DST days too.
+    return datetime.combine(day, time(), tzinfo=tz) + offset
+
+
+class EnergyMeters:
+    """Per-cycle energy totals of every power series of one entry."""
+
+    def __init__(
+        self, cycles: Iterable[str], tz: tzinfo, offset: timedelta, now: datetime
+    ) -> None:
+        self.cycles = [cycle for cycle in CYCLES if cycle in set(cycles)]
+        self.tz = tz
+        self.offset = offset
+        self.starts = {cycle: cycle_start(cycle, now, tz, offset) for cycle in self.cycles}
+        self.ends = {
+            cycle: next_cycle_start(cycle, start, tz, offset)
+            for cycle, start in self.starts.items()
+        }
+        # series key -> (ms timestamp, mW) of the current step
+        self._last: dict[str, tuple[int, int | None]] = {}
+        # (series key, cycle) -> mW·ms
+        self._totals: dict[tuple[str, str], int] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    def update(self, key: str, now: float, value: int | None) -> None:
+        """Close the previous step of ``key`` at ``now`` and start ``value`` (mW)."""
+
+        stamp = round(now * 1000)
+        self._integrate(key, stamp)
+        self._last[key] = (stamp, value)
+
+    def total(self, key: str, cycle: str, now: float) -> float:
+        """Return the kWh of ``key`` in the current ``cycle`` up to ``now``."""
+
+        return self.raw_total(key, cycle, now) / _KWH
+
+    def raw_total(self, key: str, cycle: str, now: float) -> int:
+        """Return the exact mW·ms of ``key`` in the current ``cycle`` up to ``now``."""
+
+        stamp = round(now * 1000)
+        total = self._totals.get((key, cycle), 0)
+        since, value = self._last.get(key, (stamp, None))
+        if value is not None and stamp > since:
+            total += value * (stamp - since)
+        return total
+
+    def restore(self, key: str, cycle: str, total: int, last_reset: datetime | None) -> None:
+        """Seed a mW·ms counter saved before a restart if it belongs to the current cycle."""
+
+        if cycle in self.starts and last_reset == self.starts[cycle]:
+            self._totals[(key, cycle)] = self._totals.get((key, cycle), 0) + total
+
+    def remove(self, key: str) -> None:
+        self._last.pop(key, None)
+        for cycle in self.cycles:
+            self._totals.pop((key, cycle), None)
+
+    def next_boundary(self) -> datetime | None:
+        return min(self.ends.values(), default=None)
+
+    def roll(self, now: datetime) -> bool:
+        """Start the cycles that ended by ``now``; return whether any did."""
+
+        rolled = False
+        for cycle in self.cycles:
+            while self.ends[cycle] <= now:
+                boundary = round(self.ends[cycle].timestamp() * 1000)
+                for key in self._last:
+                    self._integrate(key, boundary)
+                for key in list(self._last):
+                    self._totals.pop((key, cycle), None)
+                self.starts[cycle] = self.ends[cycle]
+                self.ends[cycle] = next_cycle_start(cycle, self.starts[cycle], self.tz, self.offset)
+                rolled = True
+        return rolled
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @callback
+    def async_notify(self) -> None:
+        for listener in list(self._listeners):
+            listener()
+
+    def _integrate(self, key: str, until: int) -> None:
+        since, value = self._last.get(key, (until, None))
+        if value is not None and until > since:
+            energy = value * (until - since)
+            for cycle in self.cycles:
+                self._totals[(key, cycle)] = self._totals.get((key, cycle), 0) + energy
+        if key in self._last and until > since:
+            self._last[key] = (until, value)
+
+
+class EnergyScheduler:
+    """One boundary timer and one write interval for all entries' meters."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._meters: list[EnergyMeters] = []
+        self._cancel_boundary: CALLBACK_TYPE | None = None
+        self._cancel_interval: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(self, meters: EnergyMeters) -> CALLBACK_TYPE:
+        self._meters.append(meters)
+        if self._cancel_interval is None:
+            self._cancel_interval = async_track_time_interval(
+                self.hass, self._handle_interval, ENERGY_UPDATE_INTERVAL
+            )
+        self._schedule()
+
+        @callback
+        def _remove() -> None:
+            self._meters.remove(meters)
+            if not self._meters and self._cancel_interval is not None:
+                self._cancel_interval()
+                self._cancel_interval = None
+            self._schedule()
+
+        return _remove
+
+    def _schedule(self) -> None:
+        if self._cancel_boundary is not None:
+            self._cancel_boundary()
+            self._cancel_boundary = None
+        boundaries = [
+            boundary
+            for meters in self._meters
+            if (boundary := meters.next_boundary()) is not None
+        ]
+        if boundaries:
+            self._cancel_boundary = async_track_point_in_utc_time(
+                self.hass, self._handle_boundary, dt_util.as_utc(min(boundaries))
+            )
+
+    @callback
+    def _handle_boundary(self, now: datetime) -> None:
+        self._cancel_boundary = None
+        for meters in self._meters:
+            if meters.roll(now):
+                meters.async_notify()
+        self._schedule()
+
+    @callback
+    def _handle_interval(self, _: datetime) -> None:
+        for meters in self._meters:
+            meters.async_notify()
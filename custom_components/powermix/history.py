@@ -0,0 +1,123 @@
+"""Short-horizon in-memory history of Powermix sensors.
+
+Every published value is appended to a per-sensor pair of ``array('d')``
+buffers (timestamps and values, ``nan`` for unknown), so a sample costs 16
+bytes and no Python object. Samples older than the retention are dropped
+lazily: a start index moves forward and the arrays are compacted once more
+than half of them is expired, keeping appends amortized O(1).
+
+The buffers back the ``powermix/history`` websocket command, which serves the
+recent series of a whole entry without a recorder query.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+import math
+
+# Expired samples are only cut off once there are at least this many.
+_COMPACT_MIN = 256
+
+
+class SeriesBuffer:
+    """Recent values of one step series within ``retention`` seconds."""
+
+    __slots__ = ("retention", "_times", "_values", "_start")
+
+    def __init__(self, retention: float) -> None:
+        self.retention = retention
+        self._times = array("d")
+        self._values = array("d")
+        self._start = 0
+
+    def __len__(self) -> int:
+        return len(self._times) - self._start
+
+    def append(self, now: float, value: float | None) -> None:
+        stored = math.nan if value is None else value
+        if len(self) and now <= self._times[-1]:
+            # Several values at one instant: only the last one was ever current.
+            self._values[-1] = stored
+            return
+        self._times.append(now)
+        self._values.append(stored)
+        self._expire(now)
+
+    def points(
+        self, since: float, until: float, resolution: float | None = None
+    ) -> list[tuple[float, float | None]]:
+        """Return the series between ``since`` and ``until``.
+
+        Without ``resolution`` every sample is returned, the one current at
+        ``since`` moved to ``since``. With it, the time-weighted mean of each
+        ``resolution``-second bucket is returned instead; buckets without any
+        known value are ``None``.
+        """
+
+        first = max(bisect_right(self._times, since, lo=self._start) - 1, self._start)
+        last = bisect_right(self._times, until, lo=self._start)
+        if first >= last:
+            return []
+        if not resolution:
+            return [
+                (max(self._times[index], since), _known(self._values[index]))
+                for index in range(first, last)
+            ]
+        return self._downsample(first, last, since, until, resolution)
+
+    def _downsample(
+        self, first: int, last: int, since: float, until: float, resolution: float
+    ) -> list[tuple[float, float | None]]:
+        buckets = math.ceil((until - since) / resolution)
+        weighted = [0.0] * buckets
+        covered = [0.0] * buckets
+        for index in range(first, last):
+            value = self._values[index]
+            start = max(self._times[index], since)
+            end = self._times[index + 1] if index + 1 < last else until
+            if math.isnan(value) or end <= start:
+                continue
+            bucket = int((start - since) / resolution)
+            while start < end and bucket < buckets:
+                stop = min(end, since + (bucket + 1) * resolution)
+                weighted[bucket] += value * (stop - start)
+                covered[bucket] += stop - start
+                start = stop
+                bucket += 1
+        return [
+            (since + bucket * resolution, round(weighted[bucket] / covered[bucket], 2))
+            if covered[bucket] > 0
+            else (since + bucket * resolution, None)
+            for bucket in range(buckets)
+        ]
+
+    def _expire(self, now: float) -> None:
+        # The last sample before the horizon is still the value at the horizon.
+        horizon = bisect_right(self._times, now - self.retention, lo=self._start) - 1
+        if horizon > self._start:
+            self._start = horizon
+        if self._start >= _COMPACT_MIN and 2 * self._start > len(self._times):
+            del self._times[: self._start]
+            del self._values[: self._start]
+            self._start = 0
+
+
+class HistoryBuffers:
+    """The :class:`SeriesBuffer` of every sensor of one entry, by unique id."""
+
+    def __init__(self, retention: float) -> None:
+        self.retention = retention
+        self.series: dict[str, SeriesBuffer] = {}
+
+    def record(self, key: str, now: float, value: float | None) -> None:
+        if (buffer := self.series.get(key)) is None:
+            buffer = self.series[key] = SeriesBuffer(self.retention)
+        buffer.append(now, value)
+
+    def remove(self, key: str) -> None:
+        self.series.pop(key, None)
+
+
+def _known(value: float) -> float | None:
+    return None if math.isnan(value) else value
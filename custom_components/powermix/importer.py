@@ -0,0 +1,273 @@
+"""Declarative bulk import of Powermix breakdowns.
+
+A breakdown set is a list of entry definitions, typically loaded from a YAML or
+JSON file in the configuration directory::
+
+    breakdowns:
+      - main_sensor: sensor.site_a_total
+        name: Site A
+        included_sensors: [sensor.site_a_heat_pump, sensor.site_a_ev]
+        producer_sensors: [sensor.site_a_pv]
+        consumer_areas: [site_a_circuits]
+
+The whole set is validated in one pass before anything is changed. Entries are
+matched to existing ones by their main sensor, so importing the same file again
+updates them in place instead of adding duplicates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Mapping
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import voluptuous as vol
+from homeassistant import config_entries
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.util.yaml import load_yaml
+
+from .const import (
+    CONF_BASELOAD_PERCENTILE,
+    CONF_BASELOAD_WINDOW,
+    CONF_ENERGY_CYCLES,
+    CONF_ENERGY_OFFSET,
+    CONF_ENERGY_TIMEZONE,
+    CONF_HISTORY_RETENTION,
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_PRODUCER_SENSORS,
+    CONF_SENSOR_PREFIX,
+    CONF_STALE_TIMEOUT,
+    CONF_STEP_THRESHOLD,
+    CYCLES,
+    DOMAIN,
+    RULE_KEYS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+CONF_BREAKDOWNS = "breakdowns"
+
+BREAKDOWN_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_MAIN_SENSOR): cv.entity_id,
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(CONF_INCLUDED_SENSORS, default=[]): [cv.entity_id],
+        vol.Optional(CONF_PRODUCER_SENSORS, default=[]): [cv.entity_id],
+        vol.Optional(CONF_SENSOR_PREFIX): vol.All(
+            cv.string, vol.Strip, vol.Length(min=1)
+        ),
+        vol.Optional(CONF_STALE_TIMEOUT): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=3600)
+        ),
+        vol.Optional(CONF_BASELOAD_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=720)
+        ),
+        vol.Optional(CONF_BASELOAD_PERCENTILE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=50)
+        ),
+        vol.Optional(CONF_ENERGY_CYCLES): [vol.In(CYCLES)],
+        vol.Optional(CONF_ENERGY_OFFSET): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=23)
+        ),
+        vol.Optional(CONF_ENERGY_TIMEZONE): cv.time_zone,
+        vol.Optional(CONF_STEP_THRESHOLD): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=100000)
+        ),
+        vol.Optional(CONF_HISTORY_RETENTION): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=1440)
+        ),
+        **{
+            vol.Optional(key, default=[]): [cv.string]
+            for keys in RULE_KEYS.values()
+            for key in keys
+        },
+    }
+)
+
+BREAKDOWN_SET_SCHEMA = vol.Schema(
+    {vol.Required(CONF_BREAKDOWNS): vol.All(cv.ensure_list, [dict])},
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+class BreakdownImportError(HomeAssistantError):
+    """A breakdown set failed validation; ``errors`` lists every problem found."""
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("Invalid Powermix breakdowns:\n" + "\n".join(errors))
+        self.errors = errors
+
+
+def load_breakdowns(path: Path) -> list[Any]:
+    """Read a breakdown set from a YAML or JSON file; blocking."""
+
+    if path.suffix.lower() == ".json":
+        content = json.loads(path.read_text(encoding="utf-8"))
+    else:
+        content = load_yaml(path)
+    if isinstance(content, list):
+        return content
+    try:
+        return BREAKDOWN_SET_SCHEMA(content)[CONF_BREAKDOWNS]
+    except vol.Invalid as err:
+        raise BreakdownImportError([f"{path.name}: {err}"]) from err
+
+
+def validate_breakdowns(hass: HomeAssistant, raw: Iterable[Any]) -> list[dict[str, Any]]:
+    """Validate a whole breakdown set and return the normalized definitions.
+
+    Every definition is checked before anything is reported so one import run
+    lists all the problems of a file at once.
+    """
+
+    errors: list[str] = []
+    breakdowns: list[dict[str, Any]] = []
+    for index, item in enumerate(raw):
+        label = f"breakdowns[{index}]"
+        try:
+            breakdown = BREAKDOWN_SCHEMA(item)
+        except vol.Invalid as err:
+            errors.append(f"{label}: {err}")
+            continue
+        label = f"{label} ({breakdown[CONF_MAIN_SENSOR]})"
+        errors.extend(f"{label}: {problem}" for problem in _source_problems(hass, breakdown))
+        breakdowns.append(breakdown)
+
+    seen: dict[str, int] = {}
+    for index, breakdown in enumerate(breakdowns):
+        main_sensor = breakdown[CONF_MAIN_SENSOR]
+        if main_sensor in seen:
+            errors.append(
+                f"{main_sensor} is the main sensor of more than one breakdown "
+                f"(#{seen[main_sensor]} and #{index})"
+            )
+        seen.setdefault(main_sensor, index)
+
+    if cycle := _find_cycle(_source_graph(hass, breakdowns)):
+        errors.append("Main sensors form a cycle: " + " -> ".join(cycle))
+
+    if errors:
+        raise BreakdownImportError(errors)
+    return breakdowns
+
+
+async def async_import_breakdowns(
+    hass: HomeAssistant, breakdowns: list[dict[str, Any]], *, stagger: float
+) -> dict[str, list[Any]]:
+    """Create or update one entry per validated breakdown.
+
+    Every entry is set up (or reloaded) as soon as its flow finishes, so the
+    next one is only started ``stagger`` seconds later to spread the load of a
+    large set. A flow that ends any other way (another flow for the same main
+    sensor in progress, for example) is listed under ``failed`` with its reason
+    and the import carries on with the next breakdown.
+    """
+
+    result: dict[str, list[Any]] = {"created": [], "updated": [], "unchanged": [], "failed": []}
+    for index, breakdown in enumerate(breakdowns):
+        if index and stagger:
+            await asyncio.sleep(stagger)
+        flow = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": config_entries.SOURCE_IMPORT},
+            data=breakdown,
+        )
+        main_sensor = breakdown[CONF_MAIN_SENSOR]
+        outcome = "created" if flow["type"] == "create_entry" else flow.get("reason")
+        if outcome in ("created", "updated", "unchanged"):
+            result[outcome].append(main_sensor)
+            continue
+        reason = outcome or flow["type"]
+        _LOGGER.warning("Importing the breakdown of %s failed: %s", main_sensor, reason)
+        result["failed"].append({CONF_MAIN_SENSOR: main_sensor, "reason": reason})
+    _LOGGER.info(
+        "Imported Powermix breakdowns: %d created, %d updated, %d unchanged, %d failed",
+        len(result["created"]),
+        len(result["updated"]),
+        len(result["unchanged"]),
+        len(result["failed"]),
+    )
+    return result
+
+
+def _source_problems(hass: HomeAssistant, breakdown: Mapping[str, Any]) -> list[str]:
+    main_sensor = breakdown[CONF_MAIN_SENSOR]
+    consumers = breakdown[CONF_INCLUDED_SENSORS]
+    producers = breakdown[CONF_PRODUCER_SENSORS]
+    problems: list[str] = []
+    listed: set[str] = set()
+    for entity_id in (*consumers, *producers):
+        if entity_id == main_sensor:
+            problems.append(f"{entity_id} is also the main sensor")
+        elif entity_id in listed:
+            problems.append(f"{entity_id} is listed more than once")
+        listed.add(entity_id)
+
+    registry = er.async_get(hass)
+    for entity_id in dict.fromkeys((main_sensor, *consumers, *producers)):
+        state = hass.states.get(entity_id)
+        entry = registry.async_get(entity_id)
+        if state is None and entry is None:
+            problems.append(f"{entity_id} does not exist")
+            continue
+        device_class = state.attributes.get("device_class") if state else None
+        if device_class is None and entry is not None:
+            device_class = entry.device_class or entry.original_device_class
+        if device_class != "power":
+            problems.append(f"{entity_id} is not a power sensor")
+    return problems
+
+
+def _source_graph(
+    hass: HomeAssistant, breakdowns: list[dict[str, Any]]
+) -> dict[str, list[str]]:
+    """Map every main sensor to its sources, existing entries included."""
+
+    graph: dict[str, list[str]] = {}
+    for breakdown in breakdowns:
+        graph.setdefault(breakdown[CONF_MAIN_SENSOR], []).extend(
+            [*breakdown[CONF_INCLUDED_SENSORS], *breakdown[CONF_PRODUCER_SENSORS]]
+        )
+    # Imported definitions replace the existing entry with the same main sensor.
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        config = {**entry.data, **entry.options}
+        graph.setdefault(
+            config[CONF_MAIN_SENSOR],
+            [*config.get(CONF_INCLUDED_SENSORS, []), *config.get(CONF_PRODUCER_SENSORS, [])],
+        )
+    return graph
+
+
+def _find_cycle(graph: Mapping[str, list[str]]) -> list[str] | None:
+    """Return one cycle of main sensors as a path, or ``None``."""
+
+    done: set[str] = set()
+    for root in graph:
+        if root in done:
+            continue
+        path: list[str] = [root]
+        on_path = {root}
+        stack = [iter(graph.get(root, ()))]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                node = path.pop()
+                on_path.discard(node)
+                done.add(node)
+                continue
+            if child in on_path:
+                return [*path[path.index(child):], child]
+            if child in done or child not in graph:
+                continue
+            path.append(child)
+            on_path.add(child)
+            stack.append(iter(graph[child]))
+    return None
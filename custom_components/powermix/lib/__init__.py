@@ -2,12 +2,41 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 try:  # pragma: no cover - only hit when the package is installed
-    from powermix.calculator import calculate_other, coerce_float  # type: ignore[import]
-except Exception:  # pragma: no cover - fall back to bundled copy
-    from ._vendor import calculate_other, coerce_float  # noqa: F401
+    from powermix.calculator import (  # type: ignore[import]
+        calculate_other,
+        coerce_float,
+        milliwatts,
+        milliwatts_to_watts,
+        other_milliwatts,
+    )
+except ImportError:  # pragma: no cover - fall back to bundled copy
+    from ._vendor import (  # noqa: F401
+        calculate_other,
+        coerce_float,
+        milliwatts,
+        milliwatts_to_watts,
+        other_milliwatts,
+    )
 
 __all__ = [
     "calculate_other",
     "coerce_float",
+    "milliwatts",
+    "milliwatts_to_watts",
+    "other_milliwatts",
+    "state_milliwatts",
 ]
+
+if TYPE_CHECKING:
+    from homeassistant.core import State
+
+
+def state_milliwatts(state: State | None) -> tuple[int | None, str | None]:
+    """Return a power entity state as ``(milliwatts, unit)``."""
+
+    if not state:
+        return None, None
+    return milliwatts(state.state, state.attributes.get("unit_of_measurement"))
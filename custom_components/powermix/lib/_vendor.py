@@ -1,35 +1,89 @@
-"""Bundled numeric helpers for Powermix."""
+"""Bundled numeric helpers for Powermix.
+
+Generated from src/powermix/calculator.py by scripts/vendor; do not edit.
+"""
 
 from __future__ import annotations
 
+import math
+from typing import Iterable, Sequence
+
 NumberLike = float | int | str | None
 
+_MISSING = frozenset({"unknown", "unavailable", "none", "nan"})
+_KNOWN_UNITS = {"W": "W", "kW": "kW"}
+# Milliwatts per unit of a reading, by normalized unit.
+_SCALES = {"W": 1000, "kW": 1_000_000}
+_MILLIWATT_DIGITS = {1000: 3, 1_000_000: 6}
+
 
 def coerce_float(value: NumberLike) -> float | None:
+    """Best-effort conversion of a state value to ``float``.
+
+    ``None``, ``"unknown"`` or ``"unavailable"`` return ``None``. Strings are
+    stripped before conversion and use ``float`` which handles standard decimal
+    notation. Any parsing failure also yields ``None`` so callers can decide how
+    to treat missing data.
+    """
+
+    # ``None`` (an unknown source) and then exact types first: plain floats,
+    # ints and strings are nearly every other call and skip the isinstance
+    # chain below.
     if value is None:
         return None
+    kind = type(value)
+    if kind is float:
+        return value  # type: ignore[return-value]
+    if kind is str:
+        return _parse_text(value)  # type: ignore[arg-type]
+    if kind is int:
+        return float(value)  # type: ignore[arg-type]
     if isinstance(value, (int, float)):
         return float(value)
     if isinstance(value, str):
-        text = value.strip().lower()
-        if text in {"unknown", "unavailable", "none", "nan"}:
-            return None
-        try:
-            return float(text)
-        except ValueError:
-            return None
+        return _parse_text(value)
     return None
 
 
+def _parse_text(value: str) -> float | None:
+    # Exact Home Assistant sentinels are caught without raising. Otherwise
+    # ``float`` already strips whitespace and is case-insensitive, and the
+    # sentinel words cannot parse, so only a NaN result needs a second look.
+    if value in _MISSING:
+        return None
+    try:
+        result = float(value)
+    except ValueError:
+        return None
+    if result != result and value.strip().lower() in _MISSING:
+        return None
+    return result
+
+
 def calculate_other(
-    main: NumberLike, parts: list[NumberLike], *, allow_negative: bool = False
+    main: NumberLike,
+    parts: Sequence[NumberLike],
+    *,
+    allow_negative: bool = False,
 ) -> float | None:
+    """Return the ``main`` value minus the sum of ``parts``.
+
+    ``None`` or unparseable values in ``parts`` are ignored. If ``main`` cannot
+    be parsed the function returns ``None``. When ``allow_negative`` is ``False``
+    (default) the result is clamped at zero so the derived sensor never shows
+    negative usage. Callers that model local production can set
+    ``allow_negative=True`` to expose export periods.
+    """
+
     main_value = coerce_float(main)
     if main_value is None:
         return None
 
     total = 0.0
     for entry in parts:
+        if type(entry) is float:
+            total += entry  # type: ignore[operator]
+            continue
         parsed = coerce_float(entry)
         if parsed is not None:
             total += parsed
@@ -39,3 +93,105 @@ def calculate_other(
     if not allow_negative:
         return max(0.0, result)
     return result
+
+
+def milliwatts(value: NumberLike, unit: str | None) -> tuple[int | None, str | None]:
+    """Return ``(value, unit)`` with power readings in integer milliwatts.
+
+    ``kW`` readings are scaled like ``W`` ones and both are reported as
+    ``"W"``; any other unit is passed through unchanged. Unparseable values
+    yield ``None`` while still reporting the unit. Plain decimal strings are parsed straight to an exact ``int`` without
+    going through ``float``; anything else falls back to :func:`coerce_float`.
+    Sub-milliwatt digits are rounded half to even. Infinite readings count as
+    unparseable.
+    """
+
+    normalized = _normalize_unit(unit)
+    scale = _SCALES.get(normalized or "W", 1000)
+    label = _unit_label(normalized, unit)
+    if type(value) is str:
+        parsed = _text_to_milli(value, scale)
+        if parsed is not None:
+            return parsed, label
+    elif type(value) is int:
+        return value * scale, label  # type: ignore[operator]
+    number = coerce_float(value)
+    if number is None or not math.isfinite(number):
+        return None, label
+    return round(number * scale), label
+
+
+def other_milliwatts(
+    main: int | None, parts: Iterable[int | None], *, allow_negative: bool = False
+) -> int | None:
+    """Return ``main`` minus the known ``parts``, exactly; see :func:`calculate_other`."""
+
+    if main is None:
+        return None
+    remaining = main - sum(part for part in parts if part is not None)
+    if not allow_negative and remaining < 0:
+        return 0
+    return remaining
+
+
+def milliwatts_to_watts(value: int | None) -> float | None:
+    """Convert integer milliwatts to Watts with two decimals, for entity states."""
+
+    if value is None:
+        return None
+    return round(value, -1) / 1000
+
+
+def _text_to_milli(value: str, scale: int) -> int | None:
+    # ``[+-]digits[.digits]`` only; exponents, "inf", "1_000" and the like are
+    # left to ``float``.
+    if "_" in value:
+        return None
+    whole, _, fraction = value.partition(".")
+    digits = _MILLIWATT_DIGITS[scale]
+    if len(fraction) <= digits:
+        # ``int`` takes care of the sign and surrounding whitespace.
+        if fraction and not fraction.isdecimal():
+            return None
+        if not (fraction or whole.strip().lstrip("+-")):
+            return None
+        try:
+            return int(whole + fraction.ljust(digits, "0"))
+        except ValueError:
+            return None
+    text = value.strip()
+    negative = text[:1] == "-"
+    if negative or text[:1] == "+":
+        text = text[1:]
+    whole, _, fraction = text.partition(".")
+    kept, rest = fraction[:digits], fraction[digits:]
+    number = whole + kept
+    if not number.isdecimal() or not fraction.isdecimal():
+        return None
+    result = int(number)
+    if rest[0] > "5" or (rest[0] == "5" and (rest.rstrip("0") != "5" or result % 2)):
+        result += 1
+    return -result if negative else result
+
+
+def _normalize_unit(unit: str | None) -> str | None:
+    if not unit:
+        return None
+    known = _KNOWN_UNITS.get(unit) if type(unit) is str else None
+    if known is not None:
+        return known
+    text = str(unit).strip().lower()
+    if text in {"kw", "kilowatt", "kilowatts"}:
+        return "kW"
+    if text in {"w", "watt", "watts"}:
+        return "W"
+    return None
+
+
+def _unit_label(normalized: str | None, original: str | None) -> str | None:
+    if normalized == "W":
+        return "W"
+    if normalized == "kW":
+        return "W"
+    return original
+
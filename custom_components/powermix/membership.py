@@ -0,0 +1,210 @@
+"""Rule-based membership: consumers and producers picked by area, label, device or glob.
+
+Rules are resolved once through the entity and device registry indexes and the
+result is kept current from ``entity_registry_updated`` and
+``device_registry_updated`` events, re-evaluating only the entities an event
+touches. Only enabled ``sensor`` entities with the ``power`` device class are
+candidates; entities listed explicitly in the configuration always keep the role
+they were given there, and an entity matching both rules becomes a producer.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+import fnmatch
+from functools import lru_cache
+import re
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from .const import DOMAIN, ROLE_CONSUMER, ROLE_PRODUCER, RULE_KEYS, SENSOR_DOMAIN
+
+
+@dataclass(slots=True, frozen=True)
+class MembershipRule:
+    """Which registry entities one role picks up."""
+
+    areas: frozenset[str] = frozenset()
+    labels: frozenset[str] = frozenset()
+    devices: frozenset[str] = frozenset()
+    patterns: tuple[str, ...] = ()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], role: str) -> MembershipRule:
+        areas, labels, devices, patterns = (config.get(key) or [] for key in RULE_KEYS[role])
+        return cls(
+            frozenset(areas),
+            frozenset(labels),
+            frozenset(devices),
+            tuple(dict.fromkeys(p.strip() for p in patterns if p.strip())),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.areas or self.labels or self.devices or self.patterns)
+
+    def matches(
+        self,
+        entity_id: str,
+        device_id: str | None,
+        area_id: str | None,
+        labels: Iterable[str],
+    ) -> bool:
+        """Return whether an entity with the given effective placement matches."""
+
+        if device_id is not None and device_id in self.devices:
+            return True
+        if area_id is not None and area_id in self.areas:
+            return True
+        if not self.labels.isdisjoint(labels):
+            return True
+        return bool(self.patterns) and _compile(self.patterns).match(entity_id) is not None
+
+
+class MembershipTracker:
+    """Keep the rule-based members of one entry in sync with the registries.
+
+    ``members`` maps entity ids to their role in resolution order. ``on_change``
+    runs after every registry event that changed it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rules: Mapping[str, MembershipRule],
+        *,
+        exclude: Iterable[str],
+        on_change: Callable[[], None],
+    ) -> None:
+        self.hass = hass
+        self.rules = {role: rule for role, rule in rules.items() if rule}
+        self.members: dict[str, str] = {}
+        self._exclude = frozenset(exclude)
+        self._on_change = on_change
+        self._unsubscribers: list[CALLBACK_TYPE] = []
+
+    def role_members(self, role: str) -> list[str]:
+        return [
+            entity_id for entity_id, member_role in self.members.items() if member_role == role
+        ]
+
+    @callback
+    def async_start(self) -> None:
+        self.members = self._resolve()
+        self._unsubscribers = [
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._handle_entity_event
+            ),
+            self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, self._handle_device_event
+            ),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        while self._unsubscribers:
+            self._unsubscribers.pop()()
+
+    def _resolve(self) -> dict[str, str]:
+        entities = er.async_get(self.hass)
+        devices = dr.async_get(self.hass)
+        candidates: dict[str, er.RegistryEntry] = {}
+
+        def _add(entries: Iterable[er.RegistryEntry]) -> None:
+            for entry in entries:
+                if entry.domain == SENSOR_DOMAIN:
+                    candidates.setdefault(entry.entity_id, entry)
+
+        def _add_devices(device_entries: Iterable[dr.DeviceEntry]) -> None:
+            for device in device_entries:
+                _add(er.async_entries_for_device(entities, device.id))
+
+        for rule in self.rules.values():
+            for device_id in rule.devices:
+                _add(er.async_entries_for_device(entities, device_id))
+            for area_id in rule.areas:
+                _add(er.async_entries_for_area(entities, area_id))
+                _add_devices(dr.async_entries_for_area(devices, area_id))
+            for label in rule.labels:
+                _add(er.async_entries_for_label(entities, label))
+                _add_devices(dr.async_entries_for_label(devices, label))
+            if rule.patterns:
+                pattern = _compile(rule.patterns)
+                _add(
+                    entry
+                    for entity_id, entry in entities.entities.items()
+                    if pattern.match(entity_id)
+                )
+
+        # Candidates come from indexes that ignore inheritance and device
+        # class, so each one is still checked against the full rules.
+        members: dict[str, str] = {}
+        for entity_id in sorted(candidates):
+            if (role := self._evaluate(candidates[entity_id])) is not None:
+                members[entity_id] = role
+        return members
+
+    def _evaluate(self, entry: er.RegistryEntry | None) -> str | None:
+        if (
+            entry is None
+            or entry.domain != SENSOR_DOMAIN
+            or entry.platform == DOMAIN
+            or entry.disabled
+            or entry.entity_id in self._exclude
+            or (entry.device_class or entry.original_device_class) != "power"
+        ):
+            return None
+        device = dr.async_get(self.hass).async_get(entry.device_id) if entry.device_id else None
+        area_id = entry.area_id or (device.area_id if device else None)
+        labels = (entry.labels | device.labels) if device else entry.labels
+        for role in (ROLE_PRODUCER, ROLE_CONSUMER):
+            rule = self.rules.get(role)
+            if rule and rule.matches(entry.entity_id, entry.device_id, area_id, labels):
+                return role
+        return None
+
+    def _update(self, entity_ids: Iterable[str], *, removed: Iterable[str] = ()) -> None:
+        changed = False
+        for entity_id in removed:
+            changed |= self.members.pop(entity_id, None) is not None
+        registry = er.async_get(self.hass)
+        for entity_id in entity_ids:
+            role = self._evaluate(registry.async_get(entity_id))
+            if role == self.members.get(entity_id):
+                continue
+            if role is None:
+                del self.members[entity_id]
+            else:
+                self.members[entity_id] = role
+            changed = True
+        if changed:
+            self._on_change()
+
+    @callback
+    def _handle_entity_event(self, event: Event) -> None:
+        data = event.data
+        if data["action"] == "remove":
+            self._update((), removed=[data["entity_id"]])
+            return
+        # A renamed entity leaves under its old id and is re-evaluated under the new one.
+        renamed = [data["old_entity_id"]] if "old_entity_id" in data else []
+        self._update([data["entity_id"]], removed=renamed)
+
+    @callback
+    def _handle_device_event(self, event: Event) -> None:
+        data = event.data
+        if data["action"] != "update" or not {"area_id", "labels"} & set(data["changes"]):
+            # Removed devices detach their entities through entity updates.
+            return
+        entities = er.async_get(self.hass)
+        self._update(
+            entry.entity_id
+            for entry in er.async_entries_for_device(entities, data["device_id"])
+        )
+
+
+@lru_cache(maxsize=32)
+def _compile(patterns: tuple[str, ...]) -> re.Pattern[str]:
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
@@ -0,0 +1,153 @@
+"""Prometheus exposition of Powermix values straight from memory.
+
+Entities import this module to feed their values, so it stays free of the
+HTTP stack; the view that serves the exposition lives in :mod:`.view`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .cache import LastKnownValueCache
+
+POWER_FAMILY = "powermix_power_watts"
+ENERGY_FAMILY = "powermix_energy_kwh"
+
+# (metric name, help text) for the per-entry internal counters.
+_COUNTERS: tuple[tuple[str, str], ...] = (
+    ("powermix_updates_total", "Source state changes handled by Powermix entities."),
+    ("powermix_state_writes_total", "State writes performed by Powermix entities."),
+    ("powermix_skipped_writes_total", "State changes that left the output unchanged."),
+    ("powermix_stale_holds_total", "Source outages bridged with the last known value."),
+    ("powermix_stale_expirations_total", "Source outages that outlasted the hold period."),
+)
+
+
+class PowermixMetrics:
+    """Metric state for one config entry.
+
+    Gauge lines are formatted when a value changes and the entry block is only
+    re-joined on the next scrape after a change, so serving a scrape is a
+    string concatenation regardless of how many sources the entry tracks.
+    """
+
+    def __init__(
+        self, entry_id: str, prefix: str, cache: LastKnownValueCache | None = None
+    ) -> None:
+        self.entry_id = entry_id
+        self.prefix = prefix
+        self._cache = cache
+        self._base_labels = f'entry="{_escape(entry_id)}",prefix="{_escape(prefix)}"'
+        self._lines: dict[str, str] = {}
+        self._block: str | None = ""
+        self._energy_lines: dict[str, str] = {}
+        self._energy_block: str | None = ""
+        self.counters: dict[str, int] = {
+            "updates": 0,
+            "writes": 0,
+            "skipped_writes": 0,
+        }
+
+    def set_power(self, key: str, role: str, source: str, value: float | None) -> None:
+        """Record the current value of the series ``key``; ``None`` drops it."""
+
+        if value is None:
+            if self._lines.pop(key, None) is not None:
+                self._block = None
+            return
+        line = (
+            f'{POWER_FAMILY}{{{self._base_labels},role="{_escape(role)}",'
+            f'source="{_escape(source)}"}} {_format(value)}\n'
+        )
+        if self._lines.get(key) != line:
+            self._lines[key] = line
+            self._block = None
+
+    def set_energy(
+        self, key: str, role: str, source: str, cycle: str, value: float | None
+    ) -> None:
+        """Record the current counter of the energy series ``key``; ``None`` drops it."""
+
+        if value is None:
+            if self._energy_lines.pop(key, None) is not None:
+                self._energy_block = None
+            return
+        line = (
+            f'{ENERGY_FAMILY}{{{self._base_labels},role="{_escape(role)}",'
+            f'source="{_escape(source)}",cycle="{_escape(cycle)}"}} {_format(value)}\n'
+        )
+        if self._energy_lines.get(key) != line:
+            self._energy_lines[key] = line
+            self._energy_block = None
+
+    def remove(self, key: str) -> None:
+        if self._lines.pop(key, None) is not None:
+            self._block = None
+        if self._energy_lines.pop(key, None) is not None:
+            self._energy_block = None
+
+    def power_block(self) -> str:
+        if self._block is None:
+            self._block = "".join(self._lines.values())
+        return self._block
+
+    def energy_block(self) -> str:
+        if self._energy_block is None:
+            self._energy_block = "".join(self._energy_lines.values())
+        return self._energy_block
+
+    def counter_values(self) -> tuple[int, ...]:
+        holds = self._cache.holds if self._cache else 0
+        expirations = self._cache.expirations if self._cache else 0
+        return (
+            self.counters["updates"],
+            self.counters["writes"],
+            self.counters["skipped_writes"],
+            holds,
+            expirations,
+        )
+
+    def counter_line(self, name: str, value: float) -> str:
+        return f"{name}{{{self._base_labels}}} {_format(value)}\n"
+
+
+def render_exposition(entries: Iterable[PowermixMetrics]) -> str:
+    """Render every entry in the Prometheus text exposition format."""
+
+    entries = list(entries)
+    parts = [
+        f"# HELP {POWER_FAMILY} Current Powermix power values in Watts.\n",
+        f"# TYPE {POWER_FAMILY} gauge\n",
+    ]
+    parts.extend(metrics.power_block() for metrics in entries)
+    parts.append(
+        f"# HELP {ENERGY_FAMILY} Powermix energy in the current cycle in kWh.\n"
+        f"# TYPE {ENERGY_FAMILY} gauge\n"
+    )
+    parts.extend(metrics.energy_block() for metrics in entries)
+    counter_values = [metrics.counter_values() for metrics in entries]
+    for index, (name, help_text) in enumerate(_COUNTERS):
+        parts.append(f"# HELP {name} {help_text}\n")
+        parts.append(f"# TYPE {name} counter\n")
+        parts.extend(
+            metrics.counter_line(name, values[index])
+            for metrics, values in zip(entries, counter_values)
+        )
+    return "".join(parts)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
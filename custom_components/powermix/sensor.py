@@ -2,30 +2,77 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from abc import abstractmethod
+import asyncio
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, tzinfo
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
+from homeassistant.util import dt as dt_util
 
-from .lib import calculate_other, coerce_float
+from .lib import milliwatts_to_watts, other_milliwatts, state_milliwatts
 
+from .metrics import PowermixMetrics
 from .const import (
+    BASELOAD_UPDATE_INTERVAL,
+    CONF_BASELOAD_PERCENTILE,
+    CONF_BASELOAD_WINDOW,
+    CONF_ENERGY_CYCLES,
+    CONF_ENERGY_OFFSET,
+    CONF_ENERGY_TIMEZONE,
+    CONF_HISTORY_RETENTION,
     CONF_INCLUDED_SENSORS,
     CONF_MAIN_SENSOR,
     CONF_PRODUCER_SENSORS,
     CONF_SENSOR_PREFIX,
+    CONF_STALE_TIMEOUT,
+    CONF_STEP_THRESHOLD,
+    DEFAULT_BASELOAD_PERCENTILE,
+    DEFAULT_BASELOAD_WINDOW,
+    DEFAULT_ENERGY_OFFSET,
+    DEFAULT_HISTORY_RETENTION,
     DEFAULT_SENSOR_PREFIX,
+    DEFAULT_STALE_TIMEOUT,
+    DEFAULT_STEP_THRESHOLD,
+    DATA_ENERGY_SCHEDULER,
     DOMAIN,
+    EVENT_LOAD_STEP,
+    ROLE_CONSUMER,
+    ROLE_PRODUCER,
+    RULE_KEYS,
 )
 
+if TYPE_CHECKING:
+    # Optional features are imported by the entries that enable them.
+    from .baseload import BaseloadEstimator
+    from .cache import LastKnownValueCache
+    from .energy import EnergyMeters
+    from .history import HistoryBuffers
+    from .membership import MembershipTracker
+    from .steps import StepDetector
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
-    entry_data = hass.data[DOMAIN][entry.entry_id]["config"]
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    entry_data = runtime["config"]
     main_sensor: str = entry_data[CONF_MAIN_SENSOR]
     selected: list[str] = [
         sensor for sensor in entry_data.get(CONF_INCLUDED_SENSORS, []) if sensor != main_sensor
@@ -34,36 +81,341 @@ async def async_setup_entry(
         sensor for sensor in entry_data.get(CONF_PRODUCER_SENSORS, []) if sensor != main_sensor
     ]
     prefix: str = entry_data.get(CONF_SENSOR_PREFIX, DEFAULT_SENSOR_PREFIX)
+    cache: LastKnownValueCache | None = None
+    if stale_timeout := entry_data.get(CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT):
+        from .cache import LastKnownValueCache
 
-    entities: list[SensorEntity] = [
-        PowermixOtherSensor(entry.entry_id, prefix, main_sensor, selected, producers)
-    ]
-
-    entities.extend(
-        PowermixMirrorSensor(entry.entry_id, prefix, source, role="consumer")
-        for source in selected
+        cache = runtime.setdefault("cache", LastKnownValueCache(stale_timeout))
+    metrics = runtime.setdefault(
+        "metrics", PowermixMetrics(entry.entry_id, prefix, cache)
     )
+    baseload: BaseloadEstimator | None = None
+    if window := entry_data.get(CONF_BASELOAD_WINDOW, DEFAULT_BASELOAD_WINDOW):
+        from .baseload import BaseloadEstimator
+
+        baseload = runtime.setdefault(
+            "baseload",
+            BaseloadEstimator(
+                window * 3600,
+                entry_data.get(CONF_BASELOAD_PERCENTILE, DEFAULT_BASELOAD_PERCENTILE),
+            ),
+        )
+    energy: EnergyMeters | None = None
+    if cycles := entry_data.get(CONF_ENERGY_CYCLES):
+        from .energy import EnergyMeters, EnergyScheduler
+
+        energy = runtime.setdefault(
+            "energy",
+            EnergyMeters(
+                cycles,
+                _energy_time_zone(entry_data.get(CONF_ENERGY_TIMEZONE)),
+                timedelta(hours=entry_data.get(CONF_ENERGY_OFFSET, DEFAULT_ENERGY_OFFSET)),
+                dt_util.utcnow(),
+            ),
+        )
+        if (scheduler := hass.data.get(DATA_ENERGY_SCHEDULER)) is None:
+            scheduler = hass.data[DATA_ENERGY_SCHEDULER] = EnergyScheduler(hass)
+        entry.async_on_unload(scheduler.async_add(energy))
+
+    steps: StepDetector | None = None
+    if step_threshold := entry_data.get(CONF_STEP_THRESHOLD, DEFAULT_STEP_THRESHOLD):
+        from .steps import StepDetector
+
+        steps = StepDetector(step_threshold)
+    history: HistoryBuffers | None = None
+    if retention := entry_data.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION):
+        from .history import HistoryBuffers
+
+        history = runtime.setdefault("history", HistoryBuffers(retention * 60))
+
+    def _mirror(source: str, role: str) -> PowermixMirrorSensor:
+        return PowermixMirrorSensor(
+            entry.entry_id,
+            prefix,
+            source,
+            role=role,
+            cache=cache,
+            metrics=metrics,
+            energy=energy,
+            history=history,
+        )
 
-    entities.extend(
-        PowermixMirrorSensor(entry.entry_id, prefix, source, role="producer")
-        for source in producers
+    def _energy_sensors(sensor: PowermixBaseSensor) -> list[PowermixEnergySensor]:
+        if energy is None:
+            return []
+        return [
+            PowermixEnergySensor(sensor, cycle, energy, metrics=metrics, history=history)
+            for cycle in energy.cycles
+        ]
+
+    other = PowermixOtherSensor(
+        entry.entry_id,
+        prefix,
+        main_sensor,
+        [],
+        [],
+        cache=cache,
+        metrics=metrics,
+        baseload=baseload,
+        energy=energy,
+        steps=steps,
+        history=history,
+    )
+    sync = _MembershipSync(
+        hass, other, selected, producers, _mirror, _energy_sensors, async_add_entities
     )
 
+    if any(entry_data.get(key) for keys in RULE_KEYS.values() for key in keys):
+        from .membership import MembershipRule, MembershipTracker
+
+        rules = {role: MembershipRule.from_config(entry_data, role) for role in RULE_KEYS}
+        if any(rules.values()):
+            tracker = MembershipTracker(
+                hass,
+                rules,
+                exclude=[main_sensor, *selected, *producers],
+                on_change=sync.async_members_changed,
+            )
+            tracker.async_start()
+            entry.async_on_unload(tracker.async_stop)
+            runtime["membership"] = tracker
+            sync.tracker = tracker
+
+    consumers, all_producers = sync.members()
+    other.async_set_members(consumers, all_producers)
+    entities: list[SensorEntity] = [other, *_energy_sensors(other)]
+    for role, sources in ((ROLE_CONSUMER, consumers), (ROLE_PRODUCER, all_producers)):
+        for source in sources:
+            mirror = _mirror(source, role)
+            sync.mirrors[source] = mirror
+            sync.energy[source] = _energy_sensors(mirror)
+            entities.extend((mirror, *sync.energy[source]))
+    if baseload is not None:
+        entities.append(
+            PowermixBaseloadSensor(
+                entry.entry_id,
+                prefix,
+                main_sensor,
+                baseload,
+                metrics=metrics,
+                history=history,
+            )
+        )
     async_add_entities(entities)
 
 
+class _MembershipSync:
+    """Attach and detach rule-based members of a running entry without a reload."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        other: PowermixOtherSensor,
+        selected: list[str],
+        producers: list[str],
+        make_mirror: Callable[[str, str], PowermixMirrorSensor],
+        make_energy: Callable[[PowermixBaseSensor], list[PowermixEnergySensor]],
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        self.hass = hass
+        self.other = other
+        self.tracker: MembershipTracker | None = None
+        self.mirrors: dict[str, PowermixMirrorSensor] = {}
+        # Energy counters that come and go with each mirror.
+        self.energy: dict[str, list[PowermixEnergySensor]] = {}
+        self._selected = selected
+        self._producers = producers
+        self._make_mirror = make_mirror
+        self._make_energy = make_energy
+        self._async_add_entities = async_add_entities
+        self._pending: asyncio.Task[None] | None = None
+
+    def members(self) -> tuple[list[str], list[str]]:
+        """Return the configured members followed by the rule-based ones."""
+
+        if self.tracker is None:
+            return self._selected, self._producers
+        return (
+            [*self._selected, *self.tracker.role_members(ROLE_CONSUMER)],
+            [*self._producers, *self.tracker.role_members(ROLE_PRODUCER)],
+        )
+
+    @callback
+    def async_members_changed(self) -> None:
+        consumers, producers = self.members()
+        self.other.async_set_members(consumers, producers)
+        wanted = {
+            source: role
+            for role, sources in ((ROLE_CONSUMER, consumers), (ROLE_PRODUCER, producers))
+            for source in sources
+        }
+        detached: list[PowermixBaseSensor] = []
+        for source, mirror in list(self.mirrors.items()):
+            if wanted.get(source) != mirror.role:
+                detached.extend((self.mirrors.pop(source), *self.energy.pop(source, [])))
+        attached: list[PowermixBaseSensor] = []
+        for source, role in wanted.items():
+            if source not in self.mirrors:
+                mirror = self.mirrors[source] = self._make_mirror(source, role)
+                self.energy[source] = self._make_energy(mirror)
+                attached.extend((mirror, *self.energy[source]))
+        if detached or attached:
+            # Changes are chained so a mirror that moves between roles is gone
+            # before its replacement reuses the unique id.
+            self._pending = self.hass.async_create_task(
+                self._async_apply(self._pending, detached, attached)
+            )
+
+    async def _async_apply(
+        self,
+        previous: asyncio.Task[None] | None,
+        detached: list[PowermixBaseSensor],
+        attached: list[PowermixBaseSensor],
+    ) -> None:
+        if previous is not None:
+            await previous
+        registry = er.async_get(self.hass)
+        for entity in detached:
+            # A detached mirror is removed for good instead of lingering as unavailable.
+            if entity.entity_id and registry.async_get(entity.entity_id):
+                registry.async_remove(entity.entity_id)
+            elif entity.hass is not None:
+                await entity.async_remove()
+        if attached:
+            self._async_add_entities(attached)
+
+
 class PowermixBaseSensor(SensorEntity):
     """Common helpers for Powermix entities."""
 
     _attr_should_poll = False
+    _native_value: float | None = None
+    # Exact value behind ``_native_value`` for the power series (Other and mirrors).
+    _milliwatts: int | None = None
+    # Fed with every published value when energy counters are enabled.
+    _energy: EnergyMeters | None = None
+    # Labels under which the entity is exported through the metrics view.
+    _metrics_role: str
+    _metrics_source: str
+    # Set for energy counters, which are exported per cycle instead of as power.
+    _metrics_cycle: str | None = None
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache: LastKnownValueCache | None = None,
+        metrics: PowermixMetrics | None = None,
+        history: HistoryBuffers | None = None,
+    ) -> None:
         self._unsubscribe: CALLBACK_TYPE | None = None
+        self._cache = cache
+        self._metrics = metrics
+        self._history = history
+        self._cancel_expiry: CALLBACK_TYPE | None = None
+
+    @property
+    def native_value(self) -> float | None:
+        return self._native_value
 
     async def async_will_remove_from_hass(self) -> None:
         if self._unsubscribe:
             self._unsubscribe()
             self._unsubscribe = None
+        self._cancel_pending_expiry()
+        if self._metrics and self.unique_id:
+            self._metrics.remove(self.unique_id)
+        if self._energy and self.unique_id:
+            self._energy.remove(self.unique_id)
+        if self._history and self.unique_id:
+            self._history.remove(self.unique_id)
+
+    @callback
+    def _handle_state_change(self, _: Event | None) -> None:
+        previous = self._snapshot()
+        self._recompute()
+        if self._metrics:
+            self._metrics.counters["updates"] += 1
+        if previous == self._snapshot():
+            if self._metrics:
+                self._metrics.counters["skipped_writes"] += 1
+            return
+        self._publish()
+
+    def _publish(self) -> None:
+        self.async_write_ha_state()
+        self._published()
+
+    def _published(self) -> None:
+        """Hand the written value to the metrics and the per-entry consumers.
+
+        ``async_added_to_hass`` calls this directly: the platform writes the
+        first state itself once that returns.
+        """
+
+        if self._metrics and self.unique_id:
+            self._metrics.counters["writes"] += 1
+            if self._metrics_cycle is None:
+                self._metrics.set_power(
+                    self.unique_id, self._metrics_role, self._metrics_source, self._native_value
+                )
+            else:
+                self._metrics.set_energy(
+                    self.unique_id,
+                    self._metrics_role,
+                    self._metrics_source,
+                    self._metrics_cycle,
+                    self._native_value,
+                )
+        if self.unique_id and (self._energy or self._history):
+            now = time.time()
+            if self._energy:
+                self._energy.update(self.unique_id, now, self._milliwatts)
+            if self._history:
+                self._history.record(self.unique_id, now, self._native_value)
+
+    def _snapshot(self) -> tuple[object, ...]:
+        """Return everything that ends up in the written state."""
+
+        return (self._native_value, self._attr_native_unit_of_measurement)
+
+    @abstractmethod
+    def _recompute(self) -> None:
+        """Refresh ``_native_value`` and attributes from the current inputs."""
+
+    def _read_source(self, entity_id: str) -> tuple[int | None, str | None]:
+        """Return the source value in milliwatts, bridging short outages via the cache."""
+
+        value, unit = state_milliwatts(self.hass.states.get(entity_id))
+        if self._cache is None:
+            return value, unit
+        value, unit, _ = self._cache.resolve(entity_id, value, unit, time.monotonic())
+        return value, unit
+
+    def _schedule_expiry(self, entity_ids: Iterable[str]) -> None:
+        """Re-evaluate once the earliest active hold on ``entity_ids`` runs out."""
+
+        self._cancel_pending_expiry()
+        if self._cache is None:
+            return
+        now = time.monotonic()
+        pending = [
+            remaining
+            for entity_id in entity_ids
+            if (remaining := self._cache.remaining(entity_id, now)) is not None
+        ]
+        if pending:
+            self._cancel_expiry = async_call_later(
+                self.hass, min(pending), self._handle_expiry
+            )
+
+    def _cancel_pending_expiry(self) -> None:
+        if self._cancel_expiry:
+            self._cancel_expiry()
+            self._cancel_expiry = None
+
+    @callback
+    def _handle_expiry(self, _: datetime) -> None:
+        self._cancel_expiry = None
+        self._handle_state_change(None)
 
 
 class PowermixOtherSensor(PowermixBaseSensor):
@@ -79,58 +431,102 @@ class PowermixOtherSensor(PowermixBaseSensor):
         main_sensor: str,
         selected: Iterable[str],
         producers: Iterable[str],
+        *,
+        cache: LastKnownValueCache | None = None,
+        metrics: PowermixMetrics | None = None,
+        baseload: BaseloadEstimator | None = None,
+        energy: EnergyMeters | None = None,
+        steps: StepDetector | None = None,
+        history: HistoryBuffers | None = None,
     ) -> None:
-        super().__init__()
+        super().__init__(cache, metrics, history)
+        self._entry_id = entry_id
+        self._baseload = baseload
+        self._energy = energy
+        self._steps = steps
         self._main_sensor = main_sensor
-        self._selected = list(dict.fromkeys(s for s in selected if s != main_sensor))
-        self._producers = list(dict.fromkeys(s for s in producers if s != main_sensor))
-        self._allow_negative = bool(self._producers)
+        self._metrics_role = "other"
+        self._metrics_source = main_sensor
         self._attr_name = f"{prefix} Other Usage"
         self._attr_unique_id = f"{entry_id}_other"
         self._native_value: float | None = None
         self._attr_native_unit_of_measurement: str | None = None
+        self._set_members(selected, producers)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._refresh_state()
+        self._published()
+        self._subscribe()
+
+    @callback
+    def async_set_members(self, selected: Iterable[str], producers: Iterable[str]) -> None:
+        """Swap the tracked sources of a running entity and publish the result."""
+
+        self._set_members(selected, producers)
+        if self._unsubscribe is None:
+            # Not added yet; async_added_to_hass picks the new members up.
+            return
+        self._unsubscribe()
+        self._subscribe()
+        self._refresh_state()
+        self._publish()
+
+    def _set_members(self, selected: Iterable[str], producers: Iterable[str]) -> None:
+        main_sensor = self._main_sensor
+        self._selected = list(dict.fromkeys(s for s in selected if s != main_sensor))
+        self._producers = list(dict.fromkeys(s for s in producers if s != main_sensor))
+        self._allow_negative = bool(self._producers)
         self._attr_extra_state_attributes = {
-            "main_sensor": self._main_sensor,
+            "main_sensor": main_sensor,
             "included_sensors": self._selected,
             "producer_sensors": self._producers,
         }
 
-    @property
-    def native_value(self) -> float | None:
-        return self._native_value
-
-    async def async_added_to_hass(self) -> None:
-        await super().async_added_to_hass()
-        self._refresh_state()
-        self.async_write_ha_state()
+    def _subscribe(self) -> None:
         self._unsubscribe = async_track_state_change_event(
             self.hass,
             [self._main_sensor, *self._selected],
             self._handle_state_change,
         )
 
-    @callback
-    def _handle_state_change(self, _: Event | None) -> None:
+    def _recompute(self) -> None:
         self._refresh_state()
-        self.async_write_ha_state()
+
+    def _published(self) -> None:
+        super()._published()
+        # Published values are exactly the steps of the Other Usage series.
+        now = time.time()
+        if self._baseload is not None:
+            self._baseload.update(now, self._native_value)
+        if self._steps is not None and (step := self._steps.update(now, self._native_value)):
+            self.hass.bus.async_fire(
+                EVENT_LOAD_STEP,
+                {
+                    "entry_id": self._entry_id,
+                    "entity_id": self.entity_id,
+                    "magnitude": round(step.magnitude, 2),
+                    "before": round(step.before, 2),
+                    "after": round(step.after, 2),
+                    "duration": round(step.duration, 1),
+                    "timestamp": dt_util.utc_from_timestamp(step.at).isoformat(),
+                },
+            )
 
     def _refresh_state(self) -> None:
-        main_state = self._get_state(self._main_sensor)
-        selected_states = [self._get_state(entity) for entity in self._selected]
-        main_value, unit = _value_in_watts(main_state)
+        main_value, unit = self._read_source(self._main_sensor)
         part_values = []
-        for state in selected_states:
-            value, _ = _value_in_watts(state)
+        for entity in self._selected:
+            value, _ = self._read_source(entity)
             part_values.append(value)
-        self._native_value = calculate_other(
+        self._milliwatts = other_milliwatts(
             main_value,
             part_values,
             allow_negative=self._allow_negative,
         )
+        self._native_value = milliwatts_to_watts(self._milliwatts)
         self._attr_native_unit_of_measurement = unit
-
-    def _get_state(self, entity_id: str) -> State | None:
-        return self.hass.states.get(entity_id)
+        self._schedule_expiry([self._main_sensor, *self._selected])
 
 
 class PowermixMirrorSensor(PowermixBaseSensor):
@@ -140,12 +536,24 @@ class PowermixMirrorSensor(PowermixBaseSensor):
     _attr_state_class = SensorStateClass.MEASUREMENT
 
     def __init__(
-        self, entry_id: str, prefix: str, source_entity_id: str, *, role: str
+        self,
+        entry_id: str,
+        prefix: str,
+        source_entity_id: str,
+        *,
+        role: str,
+        cache: LastKnownValueCache | None = None,
+        metrics: PowermixMetrics | None = None,
+        energy: EnergyMeters | None = None,
+        history: HistoryBuffers | None = None,
     ) -> None:
-        super().__init__()
+        super().__init__(cache, metrics, history)
+        self._energy = energy
         self._source_entity_id = source_entity_id
         self._prefix = prefix
         self._role = role
+        self._metrics_role = role
+        self._metrics_source = source_entity_id
         slug = _slugify(source_entity_id)
         self._attr_unique_id = f"{entry_id}_mirror_{slug}"
         self._attr_name = f"{prefix} {source_entity_id}"
@@ -156,81 +564,202 @@ class PowermixMirrorSensor(PowermixBaseSensor):
             "sensor_role": self._role,
         }
 
-    @property
-    def native_value(self) -> float | None:
-        return self._native_value
-
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
         self._sync_from_source()
-        self.async_write_ha_state()
+        self._published()
         self._unsubscribe = async_track_state_change_event(
             self.hass,
             [self._source_entity_id],
             self._handle_state_change,
         )
 
-    @callback
-    def _handle_state_change(self, _: Event | None) -> None:
+    @property
+    def role(self) -> str:
+        return self._role
+
+    def _snapshot(self) -> tuple[object, ...]:
+        return (*super()._snapshot(), self._attr_name)
+
+    def _recompute(self) -> None:
         self._sync_from_source()
-        self.async_write_ha_state()
 
     def _sync_from_source(self) -> None:
         state = self.hass.states.get(self._source_entity_id)
         friendly_name = None
-        if state:
-            value, unit = _value_in_watts(state)
-            self._native_value = value
+        value, unit = self._read_source(self._source_entity_id)
+        self._milliwatts = value
+        self._native_value = milliwatts_to_watts(value)
+        if state or value is not None:
             self._attr_native_unit_of_measurement = unit
+        if state:
             friendly_name = state.attributes.get("friendly_name")
-        else:
-            self._native_value = None
         if friendly_name:
             self._attr_name = f"{self._prefix} {friendly_name}"
+        self._schedule_expiry([self._source_entity_id])
 
     async def async_will_remove_from_hass(self) -> None:
         await super().async_will_remove_from_hass()
 
 
+class BaseloadStoredData(ExtraStoredData):
+    """Estimator history saved with the baseload sensor's restore state."""
+
+    def __init__(self, history: dict[str, Any]) -> None:
+        self.history = history
+
+    def as_dict(self) -> dict[str, Any]:
+        return self.history
+
+
+class PowermixBaseloadSensor(PowermixBaseSensor, RestoreEntity):
+    """Low-frequency estimate of the always-on part of Other Usage."""
+
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "W"
+
+    def __init__(
+        self,
+        entry_id: str,
+        prefix: str,
+        main_sensor: str,
+        estimator: BaseloadEstimator,
+        *,
+        metrics: PowermixMetrics | None = None,
+        history: HistoryBuffers | None = None,
+    ) -> None:
+        super().__init__(None, metrics, history)
+        self._estimator = estimator
+        self._metrics_role = "baseload"
+        self._metrics_source = main_sensor
+        self._attr_name = f"{prefix} Baseload"
+        self._attr_unique_id = f"{entry_id}_baseload"
+        self._minimum: float | None = None
+        self._attr_extra_state_attributes = self._attributes()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_extra_data()) is not None:
+            self._estimator.restore(last.as_dict(), time.time())
+        self._recompute()
+        self._published()
+        self._unsubscribe = async_track_time_interval(
+            self.hass, self._handle_state_change, BASELOAD_UPDATE_INTERVAL
+        )
+
+    @property
+    def extra_restore_state_data(self) -> BaseloadStoredData:
+        return BaseloadStoredData(self._estimator.as_dict())
+
+    def _snapshot(self) -> tuple[object, ...]:
+        return (*super()._snapshot(), self._minimum)
+
+    def _recompute(self) -> None:
+        minimum, low = self._estimator.estimate(time.time())
+        self._native_value = None if low is None else round(low, 2)
+        self._minimum = None if minimum is None else round(minimum, 2)
+        self._attr_extra_state_attributes = self._attributes()
+
+    def _attributes(self) -> dict[str, Any]:
+        return {
+            "rolling_minimum": self._minimum,
+            "window_hours": self._estimator.window / 3600,
+            "percentile": self._estimator.percentile,
+        }
+
+
+class EnergyStoredData(ExtraStoredData):
+    """Exact mW·ms total saved with an energy sensor's restore state.
+
+    The state itself is rounded to Wh, so restoring from it would drop up to
+    half a Wh on every restart.
+    """
+
+    def __init__(self, total: int, last_reset: datetime | None) -> None:
+        self.total = total
+        self.last_reset = last_reset
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "last_reset": None if self.last_reset is None else self.last_reset.isoformat(),
+        }
+
+
+class PowermixEnergySensor(PowermixBaseSensor, RestoreEntity):
+    """Energy of a Powermix power sensor in the current day, week or month."""
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_native_unit_of_measurement = "kWh"
+
+    def __init__(
+        self,
+        sensor: PowermixBaseSensor,
+        cycle: str,
+        meters: EnergyMeters,
+        *,
+        metrics: PowermixMetrics | None = None,
+        history: HistoryBuffers | None = None,
+    ) -> None:
+        super().__init__(metrics=metrics, history=history)
+        self._meters = meters
+        self._cycle = cycle
+        self._metrics_role = sensor._metrics_role
+        self._metrics_source = sensor._metrics_source
+        self._metrics_cycle = cycle
+        self._sensor = sensor
+        self._series = sensor.unique_id
+        self._attr_unique_id = f"{sensor.unique_id}_energy_{cycle}"
+        self._attr_last_reset = meters.starts[cycle]
+        self._attr_extra_state_attributes = {"cycle": cycle}
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_extra_data()) is not None:
+            saved = last.as_dict()
+            if isinstance(total := saved.get("total"), int):
+                self._meters.restore(
+                    self._series,
+                    self._cycle,
+                    total,
+                    dt_util.parse_datetime(str(saved.get("last_reset"))),
+                )
+        self._recompute()
+        self._published()
+        # Written by the shared energy scheduler rather than on every power step.
+        self._unsubscribe = self._meters.async_add_listener(
+            lambda: self._handle_state_change(None)
+        )
+
+    @property
+    def extra_restore_state_data(self) -> EnergyStoredData:
+        return EnergyStoredData(
+            self._meters.raw_total(self._series, self._cycle, time.time()),
+            self._meters.starts[self._cycle],
+        )
+
+    @property
+    def name(self) -> str:
+        # Follows the power sensor, whose name tracks its source's friendly name.
+        return f"{self._sensor.name} {self._cycle.capitalize()} Energy"
+
+    def _snapshot(self) -> tuple[object, ...]:
+        return (*super()._snapshot(), self._attr_last_reset, self.name)
+
+    def _recompute(self) -> None:
+        total = self._meters.total(self._series, self._cycle, time.time())
+        self._native_value = round(total, 3)
+        self._attr_last_reset = self._meters.starts[self._cycle]
+
+
+def _energy_time_zone(name: str | None) -> tzinfo:
+    if name and (zone := dt_util.get_time_zone(name)) is not None:
+        return zone
+    return dt_util.DEFAULT_TIME_ZONE
+
+
 def _slugify(value: str) -> str:
     return value.lower().replace(".", "_").replace(" ", "_")
 
-
-def _value_in_watts(state: State | None) -> tuple[float | None, str | None]:
-    if not state:
-        return None, None
-    value = coerce_float(state.state)
-    unit_attr = state.attributes.get("unit_of_measurement")
-    normalized = _normalize_unit(unit_attr)
-    if value is None:
-        return None, _unit_label(normalized, unit_attr)
-    if normalized == "kW":
-        return _round_native(value * 1000.0), "W"
-    if normalized == "W":
-        return _round_native(value), "W"
-    return _round_native(value), unit_attr
-
-
-def _normalize_unit(unit: str | None) -> str | None:
-    if not unit:
-        return None
-    text = str(unit).strip().lower()
-    if text in {"kw", "kilowatt", "kilowatts"}:
-        return "kW"
-    if text in {"w", "watt", "watts"}:
-        return "W"
-    return None
-
-
-def _unit_label(normalized: str | None, original: str | None) -> str | None:
-    if normalized == "W":
-        return "W"
-    if normalized == "kW":
-        return "W"
-    return original
-
-
-def _round_native(value: float | None) -> float | None:
-    if value is None:
-        return None
-    return round(value, 2)
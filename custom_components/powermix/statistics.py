@@ -0,0 +1,296 @@
+"""Rebuild the long-term statistics of Other Usage from recorder history."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import datetime, timedelta
+import heapq
+from itertools import chain, repeat
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics
+from homeassistant.core import HomeAssistant, State
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_PRODUCER_SENSORS,
+    CONF_STALE_TIMEOUT,
+    DEFAULT_STALE_TIMEOUT,
+    DOMAIN,
+    EVENT_STATISTICS_PROGRESS,
+    SENSOR_DOMAIN,
+)
+from .cache import LastKnownValueCache
+from .lib import milliwatts_to_watts, other_milliwatts, state_milliwatts
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+# History is fetched and imported one chunk at a time so memory use depends on
+# the chunk length and source count, never on the length of the rebuild.
+CHUNK = timedelta(hours=24)
+
+
+class HourlyAccumulator:
+    """Fold a step function of values into hourly time-weighted mean/min/max.
+
+    Each value holds from the moment it is added until the next one; ``None``
+    marks a gap that contributes nothing. Completed hours are returned from
+    :meth:`add` and :meth:`advance` as soon as the stream moves past them.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        self._hour = _floor_hour(start)
+        self._since = start
+        self._value: float | None = None
+        self._reset_hour()
+
+    def add(self, when: datetime, value: float | None) -> list[StatisticData]:
+        completed = self.advance(when)
+        self._value = value
+        return completed
+
+    def advance(self, until: datetime) -> list[StatisticData]:
+        completed: list[StatisticData] = []
+        while until >= self._hour + HOUR:
+            self._integrate(self._hour + HOUR)
+            if (row := self._finish_hour()) is not None:
+                completed.append(row)
+            self._hour += HOUR
+            self._reset_hour()
+        self._integrate(until)
+        return completed
+
+    def _integrate(self, until: datetime) -> None:
+        seconds = (until - self._since).total_seconds()
+        if self._value is not None and seconds > 0:
+            self._weighted += self._value * seconds
+            self._covered += seconds
+            self._min = self._value if self._min is None else min(self._min, self._value)
+            self._max = self._value if self._max is None else max(self._max, self._value)
+        self._since = max(self._since, until)
+
+    def _finish_hour(self) -> StatisticData | None:
+        if not self._covered:
+            return None
+        return StatisticData(
+            start=self._hour,
+            mean=round(self._weighted / self._covered, 2),
+            min=round(self._min, 2),
+            max=round(self._max, 2),
+        )
+
+    def _reset_hour(self) -> None:
+        self._weighted = 0.0
+        self._covered = 0.0
+        self._min: float | None = None
+        self._max: float | None = None
+
+
+class OtherUsageSeries:
+    """Re-derive the Other Usage steps from source history like the live sensor.
+
+    Values go through the same normalization, last-known-value hold and
+    ``other_milliwatts`` as the live sensor; the sum of the parts is kept as
+    exact integer milliwatts and only adjusted by the source that changed. A
+    missing source keeps its last reading for ``stale_timeout`` seconds and the
+    series steps when that hold runs out, where the sensor's expiry timer would
+    fire. State carries over between :meth:`feed` calls so history can be
+    streamed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        main_sensor: str,
+        parts: Sequence[str],
+        *,
+        allow_negative: bool,
+        stale_timeout: float = 0.0,
+    ) -> None:
+        self.main_sensor = main_sensor
+        self._parts = set(parts)
+        self._allow_negative = allow_negative
+        # Holds run on integer milliseconds so an expiry lands exactly on its deadline.
+        self._cache = LastKnownValueCache(round(stale_timeout * 1000))
+        self._readings: dict[str, tuple[int | None, str | None]] = {}
+        self._values: dict[str, int | None] = {}
+        self._parts_total = 0
+        self._unit: str | None = None
+        self._expiry: int | None = None
+
+    def feed(
+        self, history_states: Mapping[str, Sequence[State]]
+    ) -> Iterator[tuple[datetime, float | None, str | None]]:
+        """Yield ``(time, other, unit)`` whenever any source changed or a hold expired.
+
+        ``history_states`` maps every source to its chronological states.
+        """
+
+        streams = [
+            zip((state.last_updated for state in states), repeat(entity_id), states)
+            for entity_id, states in history_states.items()
+        ]
+        for when, entity_id, state in heapq.merge(*streams, key=lambda item: item[0]):
+            yield from self.advance(when)
+            stamp = round(when.timestamp() * 1000)
+            self._readings[entity_id] = state_milliwatts(state)
+            self._resolve(entity_id, stamp)
+            yield when, self._other(), self._unit
+            self._schedule(stamp)
+
+    def advance(self, until: datetime) -> Iterator[tuple[datetime, float | None, str | None]]:
+        """Yield the steps of holds that run out no later than ``until``."""
+
+        limit = round(until.timestamp() * 1000)
+        while self._expiry is not None and self._expiry <= limit:
+            stamp = self._expiry
+            for entity_id, (value, _) in self._readings.items():
+                if value is None:
+                    self._resolve(entity_id, stamp)
+            yield dt_util.utc_from_timestamp(stamp / 1000), self._other(), self._unit
+            self._schedule(stamp)
+
+    def _resolve(self, entity_id: str, stamp: int) -> None:
+        value, unit = self._readings[entity_id]
+        value, unit, _ = self._cache.resolve(entity_id, value, unit, stamp)
+        if entity_id in self._parts:
+            self._parts_total += (value or 0) - (self._values.get(entity_id) or 0)
+        self._values[entity_id] = value
+        if entity_id == self.main_sensor:
+            self._unit = unit
+
+    def _other(self) -> float | None:
+        return milliwatts_to_watts(
+            other_milliwatts(
+                self._values.get(self.main_sensor),
+                (self._parts_total,),
+                allow_negative=self._allow_negative,
+            )
+        )
+
+    def _schedule(self, stamp: int) -> None:
+        pending = [
+            remaining
+            for entity_id in self._readings
+            if (remaining := self._cache.remaining(entity_id, stamp)) is not None
+        ]
+        self._expiry = stamp + int(min(pending)) if pending else None
+
+
+def iter_other_values(
+    history_states: Mapping[str, Sequence[State]],
+    main_sensor: str,
+    parts: Sequence[str],
+    *,
+    allow_negative: bool,
+    stale_timeout: float = 0.0,
+) -> Iterator[tuple[datetime, float | None, str | None]]:
+    """Yield ``(time, other, unit)`` of one history window; see :class:`OtherUsageSeries`."""
+
+    series = OtherUsageSeries(
+        main_sensor, parts, allow_negative=allow_negative, stale_timeout=stale_timeout
+    )
+    yield from series.feed(history_states)
+
+
+async def async_rebuild_statistics(
+    hass: HomeAssistant,
+    entry_id: str,
+    config: Mapping[str, Any],
+    start: datetime,
+    end: datetime,
+) -> int:
+    """Recompute and import hourly Other Usage statistics; return the hour count."""
+
+    registry = er.async_get(hass)
+    statistic_id = registry.async_get_entity_id(SENSOR_DOMAIN, DOMAIN, f"{entry_id}_other")
+    if statistic_id is None:
+        raise HomeAssistantError(f"Powermix entry {entry_id} has no Other Usage sensor")
+
+    main_sensor: str = config[CONF_MAIN_SENSOR]
+    parts = [s for s in dict.fromkeys(config.get(CONF_INCLUDED_SENSORS, [])) if s != main_sensor]
+    allow_negative = any(s != main_sensor for s in config.get(CONF_PRODUCER_SENSORS, []))
+    sources = [main_sensor, *parts]
+
+    start = _floor_hour(dt_util.as_utc(start))
+    end = _floor_hour(dt_util.as_utc(end))
+    if end <= start:
+        raise HomeAssistantError("The statistics period must cover at least one hour")
+
+    series = OtherUsageSeries(
+        main_sensor,
+        parts,
+        allow_negative=allow_negative,
+        stale_timeout=config.get(CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT),
+    )
+    accumulator = HourlyAccumulator(start)
+    unit: str | None = None
+    imported = 0
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + CHUNK, end)
+        states = await get_instance(hass).async_add_executor_job(
+            _fetch_history, hass, chunk_start, chunk_end, sources
+        )
+        rows: list[StatisticData] = []
+        for when, other, other_unit in chain(series.feed(states), series.advance(chunk_end)):
+            unit = other_unit or unit
+            rows.extend(accumulator.add(max(when, chunk_start), other))
+        rows.extend(accumulator.advance(chunk_end))
+        del states
+
+        if rows:
+            _import(hass, statistic_id, unit, rows)
+            imported += len(rows)
+        hass.bus.async_fire(
+            EVENT_STATISTICS_PROGRESS,
+            {
+                "entry_id": entry_id,
+                "statistic_id": statistic_id,
+                "processed_until": chunk_end.isoformat(),
+                "hours_imported": imported,
+            },
+        )
+        _LOGGER.debug("Rebuilt %s statistics up to %s", statistic_id, chunk_end)
+        chunk_start = chunk_end
+
+    _LOGGER.info("Imported %d hourly statistics for %s", imported, statistic_id)
+    return imported
+
+
+def _fetch_history(
+    hass: HomeAssistant, start: datetime, end: datetime, entity_ids: list[str]
+) -> Mapping[str, Sequence[State]]:
+    return history.get_significant_states(
+        hass,
+        start,
+        end,
+        entity_ids,
+        include_start_time_state=True,
+        significant_changes_only=False,
+    )  # type: ignore[return-value]
+
+
+def _import(
+    hass: HomeAssistant, statistic_id: str, unit: str | None, rows: Iterable[StatisticData]
+) -> None:
+    metadata = StatisticMetaData(
+        has_mean=True,
+        has_sum=False,
+        name=None,
+        source="recorder",
+        statistic_id=statistic_id,
+        unit_of_measurement=unit,
+    )
+    async_import_statistics(hass, metadata, list(rows))
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
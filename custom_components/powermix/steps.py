@@ -0,0 +1,97 @@
+"""Streaming detection of load steps in Other Usage.
+
+A two-sided CUSUM runs over the published Other Usage values. With a minimum
+step size ``threshold`` the allowance and the decision interval are both half
+of it, so a jump of at least ``threshold`` is reported on its first sample,
+noise below half of it never accumulates, and a smaller persistent shift
+moves the reference level without being reported. Every update is O(1): the
+detector keeps running sums, not samples.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class LoadStep:
+    """One detected change of the Other Usage level."""
+
+    at: float
+    before: float
+    after: float
+    # How long the previous level held before the step, in seconds.
+    duration: float
+
+    @property
+    def magnitude(self) -> float:
+        return self.after - self.before
+
+
+class _Cusum:
+    """One side of the CUSUM, with the samples since it last left zero."""
+
+    __slots__ = ("score", "since", "total", "count")
+
+    def __init__(self) -> None:
+        self.score = 0.0
+        self.since = 0.0
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, now: float, value: float, evidence: float) -> None:
+        score = self.score + evidence
+        if score <= 0:
+            self.score = 0.0
+            return
+        if self.score == 0:
+            self.since, self.total, self.count = now, 0.0, 0
+        self.score = score
+        self.total += value
+        self.count += 1
+
+
+class StepDetector:
+    """Report steps of at least ``threshold`` Watts in a stream of values."""
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._allowance = threshold / 2
+        self._limit = threshold / 2
+        self._since = 0.0
+        self._total = 0.0
+        self._count = 0
+        self._up = _Cusum()
+        self._down = _Cusum()
+
+    def update(self, now: float, value: float | None) -> LoadStep | None:
+        """Feed the value that is current from ``now`` on; return a detected step."""
+
+        if value is None:
+            # Nothing is known about the level across a gap.
+            self._count = 0
+            return None
+        if not self._count:
+            self._start(now, value, 1)
+            return None
+
+        level = self._total / self._count
+        deviation = value - level
+        self._up.add(now, value, deviation - self._allowance)
+        self._down.add(now, value, -deviation - self._allowance)
+        for side in (self._up, self._down):
+            if side.score >= self._limit:
+                after = side.total / side.count
+                step = LoadStep(side.since, level, after, side.since - self._since)
+                self._start(side.since, side.total, side.count)
+                return step if abs(step.magnitude) >= self.threshold else None
+        self._total += value
+        self._count += 1
+        return None
+
+    def _start(self, now: float, total: float, count: int) -> None:
+        self._since = now
+        self._total = total
+        self._count = count
+        self._up = _Cusum()
+        self._down = _Cusum()
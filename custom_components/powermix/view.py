@@ -0,0 +1,32 @@
+"""HTTP view serving the Powermix metrics."""
+
+from __future__ import annotations
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+
+from .const import DOMAIN
+from .metrics import render_exposition
+
+METRICS_URL = "/api/powermix/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class PowermixMetricsView(HomeAssistantView):
+    """Serve the metrics of all loaded Powermix entries."""
+
+    url = METRICS_URL
+    name = "api:powermix:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass = request.app["hass"]
+        entries = (
+            runtime["metrics"]
+            for runtime in hass.data.get(DOMAIN, {}).values()
+            if "metrics" in runtime
+        )
+        return web.Response(
+            body=render_exposition(entries).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
@@ -0,0 +1,62 @@
+"""Websocket commands of the Powermix integration."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import ATTR_DURATION, ATTR_ENTRY_ID, DOMAIN, SENSOR_DOMAIN
+
+ATTR_RESOLUTION = "resolution"
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, websocket_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/history",
+        vol.Required(ATTR_ENTRY_ID): str,
+        vol.Optional(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional(ATTR_RESOLUTION): vol.All(vol.Coerce(float), vol.Range(min=1)),
+    }
+)
+@callback
+def websocket_history(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return the buffered recent series of every sensor of one entry."""
+
+    runtime = hass.data.get(DOMAIN, {}).get(msg[ATTR_ENTRY_ID])
+    if runtime is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Powermix entry is not loaded"
+        )
+        return
+    history = runtime.get("history")
+    if history is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_SUPPORTED, "History is disabled for this entry"
+        )
+        return
+
+    until = time.time()
+    since = until - min(msg.get(ATTR_DURATION, history.retention), history.retention)
+    resolution = msg.get(ATTR_RESOLUTION)
+    registry = er.async_get(hass)
+    series = {}
+    for unique_id, buffer in history.series.items():
+        entity_id = registry.async_get_entity_id(SENSOR_DOMAIN, DOMAIN, unique_id)
+        if entity_id is not None:
+            series[entity_id] = buffer.points(since, until, resolution)
+    connection.send_result(
+        msg["id"],
+        {"start": since, "end": until, "resolution": resolution, "series": series},
+    )
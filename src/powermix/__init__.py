@@ -1,8 +1,17 @@
 """Powermix helpers."""
 
-from .calculator import calculate_other, coerce_float
+from .calculator import (
+    calculate_other,
+    coerce_float,
+    milliwatts,
+    milliwatts_to_watts,
+    other_milliwatts,
+)
 
 __all__ = [
     "calculate_other",
     "coerce_float",
+    "milliwatts",
+    "milliwatts_to_watts",
+    "other_milliwatts",
 ]
@@ -0,0 +1,92 @@
+"""Command line entry point: ``python -m powermix serve``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+from .engine import (
+    OUTPUT_LINE,
+    OUTPUT_STATES,
+    AuthenticationError,
+    Breakdown,
+    EngineConfig,
+    PowermixEngine,
+    SubscriptionError,
+)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m powermix")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the headless breakdown engine")
+    serve.add_argument(
+        "--url",
+        default=os.environ.get("POWERMIX_HA_URL", "ws://localhost:8123/api/websocket"),
+        help="Home Assistant websocket URL (env: POWERMIX_HA_URL)",
+    )
+    serve.add_argument(
+        "--token",
+        default=os.environ.get("POWERMIX_HA_TOKEN"),
+        help="long-lived access token (env: POWERMIX_HA_TOKEN)",
+    )
+    serve.add_argument("--main", required=True, help="main power sensor")
+    serve.add_argument("--consumer", action="append", default=[], help="consumer sensor")
+    serve.add_argument("--producer", action="append", default=[], help="producer sensor")
+    serve.add_argument("--prefix", default="Powermix")
+    serve.add_argument("--output", choices=[OUTPUT_STATES, OUTPUT_LINE], default=OUTPUT_STATES)
+    serve.add_argument(
+        "--line-file", help="append line protocol to this file instead of stdout"
+    )
+    serve.add_argument("--batch-interval", type=float, default=1.0, help="seconds")
+    serve.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+async def _serve(args: argparse.Namespace) -> int:
+    sink = None
+    if args.output == OUTPUT_LINE:
+        sink = open(args.line_file, "a", encoding="utf-8") if args.line_file else sys.stdout
+    engine = PowermixEngine(
+        EngineConfig(
+            url=args.url,
+            token=args.token,
+            breakdown=Breakdown(args.main, args.consumer, args.producer, prefix=args.prefix),
+            output=args.output,
+            batch_interval=args.batch_interval,
+            line_sink=sink,
+        )
+    )
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, engine.stop)
+    try:
+        await engine.run()
+    except AuthenticationError as err:
+        logging.getLogger(__name__).error("Authentication failed: %s", err)
+        return 1
+    except SubscriptionError as err:
+        logging.getLogger(__name__).error("Subscribing to state changes failed: %s", err)
+        return 1
+    finally:
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("a Home Assistant access token is required (--token or POWERMIX_HA_TOKEN)")
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    return asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
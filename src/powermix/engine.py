@@ -0,0 +1,369 @@
+"""Headless Powermix engine driven by the Home Assistant websocket API.
+
+The engine keeps the breakdown arithmetic out of the Home Assistant event loop:
+it subscribes to ``state_changed`` events over the websocket API, computes the
+Other Usage value and the mirrors with the same rules as the integration, and
+publishes the results in batches, either back to Home Assistant as states via
+the REST API or as InfluxDB line protocol. ``aiohttp`` is only needed for the
+network side and is imported lazily.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import json
+import logging
+import re
+import time
+from typing import Any, TextIO
+
+from .calculator import milliwatts, milliwatts_to_watts, other_milliwatts
+
+_LOGGER = logging.getLogger(__name__)
+
+OUTPUT_STATES = "states"
+OUTPUT_LINE = "line"
+
+MAX_BACKOFF = 60.0
+
+
+class AuthenticationError(Exception):
+    """Raised when Home Assistant rejects the access token."""
+
+
+class SubscriptionError(Exception):
+    """Raised when Home Assistant rejects the ``state_changed`` subscription."""
+
+
+@dataclass(slots=True)
+class Output:
+    """A computed value ready to be published."""
+
+    entity_id: str
+    role: str
+    value: float | None
+    unit: str | None
+    friendly_name: str
+
+    def attributes(self) -> dict[str, Any]:
+        attributes: dict[str, Any] = {
+            "friendly_name": self.friendly_name,
+            "device_class": "power",
+            "state_class": "measurement",
+            "sensor_role": self.role,
+        }
+        if self.unit is not None:
+            attributes["unit_of_measurement"] = self.unit
+        return attributes
+
+
+class Breakdown:
+    """Incrementally maintained Other Usage and mirror values of one breakdown."""
+
+    def __init__(
+        self,
+        main_sensor: str,
+        consumers: Iterable[str],
+        producers: Iterable[str] = (),
+        *,
+        prefix: str = "Powermix",
+    ) -> None:
+        self.main_sensor = main_sensor
+        self.consumers = list(dict.fromkeys(s for s in consumers if s != main_sensor))
+        self.producers = list(dict.fromkeys(s for s in producers if s != main_sensor))
+        self.prefix = prefix
+        self._allow_negative = bool(self.producers)
+        # source -> (milliwatts, unit); the consumer sum is kept exact and
+        # adjusted by the one source that changed.
+        self._values: dict[str, tuple[int | None, str | None]] = {}
+        self._consumer_total = 0
+        slug = _slug(prefix)
+        self.other = Output(
+            f"sensor.{slug}_other_usage", "other", None, None, f"{prefix} Other Usage"
+        )
+        self.mirrors: dict[str, Output] = {}
+        for role, sources in (("consumer", self.consumers), ("producer", self.producers)):
+            for source in sources:
+                object_id = source.split(".", 1)[-1]
+                self.mirrors[source] = Output(
+                    f"sensor.{slug}_{_slug(object_id)}", role, None, None, f"{prefix} {source}"
+                )
+
+    @property
+    def sources(self) -> list[str]:
+        return list(dict.fromkeys([self.main_sensor, *self.consumers, *self.producers]))
+
+    def update(
+        self, entity_id: str, state: str | None, attributes: dict[str, Any] | None
+    ) -> list[Output]:
+        """Apply a source state and return the outputs whose value changed."""
+
+        attributes = attributes or {}
+        milli, unit = (
+            milliwatts(state, attributes.get("unit_of_measurement"))
+            if state is not None
+            else (None, None)
+        )
+        if entity_id in self.consumers:
+            previous = self._values.get(entity_id, (None, None))[0]
+            self._consumer_total += (milli or 0) - (previous or 0)
+        self._values[entity_id] = (milli, unit)
+        value = milliwatts_to_watts(milli)
+        changed: list[Output] = []
+
+        mirror = self.mirrors.get(entity_id)
+        if mirror is not None:
+            name = attributes.get("friendly_name")
+            new_name = f"{self.prefix} {name}" if name else mirror.friendly_name
+            # A removed source keeps its last unit, like the integration's mirrors.
+            new_unit = unit if state is not None else mirror.unit
+            if (mirror.value, mirror.unit, mirror.friendly_name) != (value, new_unit, new_name):
+                mirror.value = value
+                mirror.unit = new_unit
+                mirror.friendly_name = new_name
+                changed.append(mirror)
+
+        if entity_id == self.main_sensor or entity_id in self.consumers:
+            main_value, main_unit = self._values.get(self.main_sensor, (None, None))
+            other = milliwatts_to_watts(
+                other_milliwatts(
+                    main_value, (self._consumer_total,), allow_negative=self._allow_negative
+                )
+            )
+            if (self.other.value, self.other.unit) != (other, main_unit):
+                self.other.value = other
+                self.other.unit = main_unit
+                changed.append(self.other)
+        return changed
+
+
+@dataclass
+class EngineConfig:
+    url: str
+    token: str
+    breakdown: Breakdown
+    output: str = OUTPUT_STATES
+    batch_interval: float = 1.0
+    line_sink: TextIO | None = None
+    rest_url: str | None = None
+    measurement: str = "powermix"
+    reconnect_delay: float = 1.0
+    request_timeout: float = 10.0
+
+    def __post_init__(self) -> None:
+        if self.rest_url is None:
+            self.rest_url = _rest_base(self.url)
+
+
+@dataclass
+class EngineStats:
+    connections: int = 0
+    events: int = 0
+    batches: int = 0
+    published: int = 0
+    last_error: str | None = None
+
+
+class PowermixEngine:
+    """Subscribe, compute and publish until :meth:`stop` is called."""
+
+    def __init__(self, config: EngineConfig, *, clock: Callable[[], float] = time.time) -> None:
+        self.config = config
+        self.stats = EngineStats()
+        self._clock = clock
+        self._pending: dict[str, Output] = {}
+        self._stopped = asyncio.Event()
+        self._connected = asyncio.Event()
+
+    @property
+    def connected(self) -> asyncio.Event:
+        return self._connected
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def run(self) -> None:
+        import aiohttp
+
+        backoff = self.config.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            flusher = asyncio.create_task(self._flush_loop(session))
+            try:
+                while not self._stopped.is_set():
+                    connections = self.stats.connections
+                    try:
+                        await self._run_connection(session)
+                    except (AuthenticationError, SubscriptionError):
+                        raise
+                    except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as err:
+                        self.stats.last_error = repr(err)
+                        _LOGGER.warning("Websocket connection failed: %s", err)
+                    except (TypeError, ValueError) as err:
+                        # receive_json raises TypeError on a close frame, for
+                        # example mid-handshake, and ValueError on malformed JSON.
+                        self.stats.last_error = repr(err)
+                        _LOGGER.warning("Unexpected websocket message: %s", err)
+                    finally:
+                        self._connected.clear()
+                    if self._stopped.is_set():
+                        break
+                    if self.stats.connections > connections:
+                        # The connection was up, so this is a fresh outage.
+                        backoff = self.config.reconnect_delay
+                    try:
+                        await asyncio.wait_for(self._stopped.wait(), backoff)
+                    except asyncio.TimeoutError:
+                        pass
+                    backoff = min(backoff * 2, MAX_BACKOFF)
+            finally:
+                flusher.cancel()
+                await asyncio.gather(flusher, return_exceptions=True)
+                await self._flush(session)
+
+    async def _run_connection(self, session: Any) -> None:
+        import aiohttp
+
+        async with session.ws_connect(self.config.url, heartbeat=30) as ws:
+            message = await ws.receive_json()
+            if message.get("type") == "auth_required":
+                await ws.send_json({"type": "auth", "access_token": self.config.token})
+                message = await ws.receive_json()
+            if message.get("type") != "auth_ok":
+                raise AuthenticationError(message.get("message", "authentication failed"))
+
+            await ws.send_json(
+                {"id": 1, "type": "subscribe_events", "event_type": "state_changed"}
+            )
+            await ws.send_json({"id": 2, "type": "get_states"})
+            self.stats.connections += 1
+            self._connected.set()
+            sources = set(self.config.breakdown.sources)
+
+            closer = asyncio.create_task(self._close_on_stop(ws))
+            try:
+                async for raw in ws:
+                    if raw.type == aiohttp.WSMsgType.TEXT:
+                        self._handle_message(json.loads(raw.data), sources)
+            finally:
+                closer.cancel()
+        if not self._stopped.is_set():
+            raise aiohttp.ClientConnectionError("websocket closed by Home Assistant")
+
+    async def _close_on_stop(self, ws: Any) -> None:
+        await self._stopped.wait()
+        await ws.close()
+
+    def _handle_message(self, message: dict[str, Any], sources: set[str]) -> None:
+        if message.get("type") == "result" and message.get("id") == 1:
+            if not message.get("success", True):
+                error = message.get("error") or {}
+                raise SubscriptionError(error.get("message", "subscribe_events rejected"))
+        elif message.get("type") == "result" and message.get("id") == 2:
+            for state in message.get("result") or []:
+                if state["entity_id"] in sources:
+                    self._apply(state["entity_id"], state)
+        elif message.get("type") == "event":
+            data = message["event"].get("data", {})
+            entity_id = data.get("entity_id")
+            if entity_id in sources:
+                self.stats.events += 1
+                self._apply(entity_id, data.get("new_state"))
+
+    def _apply(self, entity_id: str, state: dict[str, Any] | None) -> None:
+        if state is None:
+            changed = self.config.breakdown.update(entity_id, None, None)
+        else:
+            changed = self.config.breakdown.update(
+                entity_id, state.get("state"), state.get("attributes")
+            )
+        for output in changed:
+            self._pending[output.entity_id] = output
+
+    async def _flush_loop(self, session: Any) -> None:
+        while True:
+            await asyncio.sleep(self.config.batch_interval)
+            try:
+                await self._flush(session)
+            except Exception:  # a bad batch must not end publishing for good
+                _LOGGER.exception("Publishing a batch failed")
+
+    async def _flush(self, session: Any) -> None:
+        if not self._pending:
+            return
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self.stats.batches += 1
+        if self.config.output == OUTPUT_LINE:
+            self._write_lines(batch)
+            self.stats.published += len(batch)
+        else:
+            results = await asyncio.gather(
+                *(self._post_state(session, output) for output in batch)
+            )
+            self.stats.published += sum(results)
+
+    async def _post_state(self, session: Any, output: Output) -> bool:
+        """Post one state; on failure keep it pending for the next batch."""
+
+        import aiohttp
+
+        payload = {
+            "state": "unavailable" if output.value is None else output.value,
+            "attributes": output.attributes(),
+        }
+        try:
+            async with session.post(
+                f"{self.config.rest_url}/api/states/{output.entity_id}",
+                json=payload,
+                headers={"Authorization": f"Bearer {self.config.token}"},
+                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout),
+            ) as response:
+                response.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            # Keep the newest value so the next batch retries it.
+            self._pending.setdefault(output.entity_id, output)
+            self.stats.last_error = repr(err)
+            _LOGGER.warning("Publishing %s failed: %r", output.entity_id, err)
+            return False
+        return True
+
+    def _write_lines(self, batch: list[Output]) -> None:
+        sink = self.config.line_sink
+        if sink is None:
+            return
+        timestamp = int(self._clock() * 1_000_000_000)
+        lines = [
+            to_line_protocol(self.config.measurement, self.config.breakdown.prefix, output, timestamp)
+            for output in batch
+            if output.value is not None
+        ]
+        if lines:
+            sink.write("".join(lines))
+            sink.flush()
+
+
+def to_line_protocol(measurement: str, prefix: str, output: Output, timestamp: int) -> str:
+    tags = ",".join(
+        f"{key}={_escape_tag(value)}"
+        for key, value in (
+            ("entity_id", output.entity_id),
+            ("prefix", prefix),
+            ("role", output.role),
+        )
+    )
+    return f"{_escape_tag(measurement)},{tags} value={float(output.value)!r} {timestamp}\n"
+
+
+def _escape_tag(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_") or "powermix"
+
+
+def _rest_base(url: str) -> str:
+    base = re.sub(r"^ws", "http", url)
+    return re.sub(r"/api/websocket/?$", "", base)
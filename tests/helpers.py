@@ -23,7 +23,16 @@ class DummyStates:
         return self._data.get(entity_id)
 
 
+class DummyBus:
+    def __init__(self) -> None:
+        self.fired: list[tuple[str, dict[str, Any]]] = []
+
+    def async_fire(self, event_type: str, event_data: dict[str, Any] | None = None) -> None:
+        self.fired.append((event_type, dict(event_data or {})))
+
+
 class DummyHass:
     def __init__(self) -> None:
         self.states = DummyStates()
+        self.bus = DummyBus()
         self.data: dict[str, Any] = {}
@@ -0,0 +1,264 @@
+"""Replay a Powermix capture file through the sensor platform.
+
+Usage::
+
+    python -m tests.replay capture.jsonl [--realtime] [--runs N]
+                           [--save outputs.json] [--compare outputs.json]
+
+Entities are created with ``sensor.async_setup_entry`` against ``DummyHass``.
+Time is virtual: ``time.monotonic`` and ``async_call_later`` follow the
+recorded offsets, so hold expirations fire exactly as they would have live and
+two runs over the same capture must write identical states. Energy counters
+are written every ``ENERGY_UPDATE_INTERVAL`` of virtual time up to the last
+event; cycle boundaries are not replayed. ``--realtime`` additionally paces
+events at their original speed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import hashlib
+import heapq
+import itertools
+import json
+from pathlib import Path
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable
+from unittest.mock import patch
+
+from homeassistant.components.sensor import SensorEntity
+
+from custom_components.powermix import sensor
+from custom_components.powermix.capture import capture_sources, read_capture
+from custom_components.powermix.const import (
+    DATA_ENERGY_SCHEDULER,
+    DOMAIN,
+    ENERGY_UPDATE_INTERVAL,
+)
+from tests.helpers import DummyHass
+
+Output = tuple[float, str, Any, Any]
+# (virtual time, event type, event data) of an event fired on the bus.
+Fired = tuple[float, str, dict[str, Any]]
+
+
+@dataclass
+class ReplayResult:
+    events: int = 0
+    elapsed: float = 0.0
+    outputs: list[Output] = field(default_factory=list)
+    fired: list[Fired] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.events / self.elapsed if self.elapsed else float("inf")
+
+    def digest(self) -> str:
+        payload = json.dumps([self.outputs, self.fired], separators=(",", ":")).encode()
+        return hashlib.sha256(payload).hexdigest()
+
+
+async def _no_restore(_: Any) -> None:
+    return None
+
+
+class _ReplayEnergyScheduler:
+    """Stand-in for ``EnergyScheduler`` that notifies on virtual-time timers."""
+
+    def __init__(self, call_later: Callable[[Any, float, Callable[[Any], None]], Any]) -> None:
+        self._call_later = call_later
+        self._cancels: list[Callable[[], None]] = []
+
+    def async_add(self, meters: Any) -> Callable[[], None]:
+        interval = ENERGY_UPDATE_INTERVAL.total_seconds()
+        cancel: list[Callable[[], None]] = []
+
+        def _tick(_: Any) -> None:
+            meters.async_notify()
+            cancel[0] = self._call_later(None, interval, _tick)
+
+        cancel.append(self._call_later(None, interval, _tick))
+        self._cancels.append(lambda: cancel[0]())
+        return self._cancels[-1]
+
+    def stop(self) -> None:
+        for cancel in self._cancels:
+            cancel()
+
+
+async def async_replay(path: Path, *, realtime: bool = False) -> ReplayResult:
+    header, events = read_capture(path)
+    config = header["config"]
+    unloads: list[Callable[[], None]] = []
+    entry = SimpleNamespace(entry_id=header["entry_id"], async_on_unload=unloads.append)
+    hass = DummyHass()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"config": config}
+
+    result = ReplayResult()
+    clock = [0.0]
+    listeners: dict[str, list[Callable[[Any], None]]] = {}
+    timers: list[tuple[float, int, Callable[[Any], None]]] = []
+    cancelled: set[int] = set()
+    sequence = itertools.count()
+
+    def track(_: Any, entity_ids: list[str], action: Callable[[Any], None]):
+        for entity_id in entity_ids:
+            listeners.setdefault(entity_id, []).append(action)
+
+        def _unsubscribe() -> None:
+            for entity_id in entity_ids:
+                listeners[entity_id].remove(action)
+
+        return _unsubscribe
+
+    def call_later(_: Any, delay: float, action: Callable[[Any], None]):
+        handle = next(sequence)
+        heapq.heappush(timers, (clock[0] + delay, handle, action))
+        return lambda: cancelled.add(handle)
+
+    energy_scheduler = _ReplayEnergyScheduler(call_later)
+    hass.data[DATA_ENERGY_SCHEDULER] = energy_scheduler
+
+    def fire(event_type: str, event_data: dict[str, Any] | None = None) -> None:
+        result.fired.append((round(clock[0], 3), event_type, dict(event_data or {})))
+
+    hass.bus.async_fire = fire  # type: ignore[method-assign]
+
+    def record(entity: SensorEntity) -> None:
+        result.outputs.append(
+            (
+                round(clock[0], 3),
+                entity.unique_id,
+                entity.native_value,
+                entity.native_unit_of_measurement,
+            )
+        )
+
+    def apply(event: Any) -> None:
+        if event.state is None:
+            hass.states.remove(event.entity_id)
+            return
+        attributes = {}
+        if event.unit is not None:
+            attributes["unit_of_measurement"] = event.unit
+        if event.friendly_name is not None:
+            attributes["friendly_name"] = event.friendly_name
+        hass.states.set(event.entity_id, event.state, attributes)
+
+    def fire_timers(until: float) -> None:
+        while timers and timers[0][0] <= until:
+            due, handle, action = heapq.heappop(timers)
+            if handle in cancelled:
+                continue
+            clock[0] = due
+            action(None)
+
+    with patch.object(sensor, "async_track_state_change_event", track), patch.object(
+        sensor, "async_call_later", call_later
+    ), patch.object(
+        sensor, "time", SimpleNamespace(monotonic=lambda: clock[0], time=lambda: clock[0])
+    ), patch.object(
+        # The baseload sensor's periodic writes and restored history depend on
+        # wall time and storage, so only its initial write is part of a replay.
+        sensor, "async_track_time_interval", lambda *_: lambda: None
+    ), patch.object(
+        sensor.PowermixBaseloadSensor, "async_get_last_extra_data", _no_restore
+    ), patch.object(
+        sensor.PowermixEnergySensor, "async_get_last_extra_data", _no_restore
+    ), patch.object(
+        SensorEntity, "async_write_ha_state", record
+    ):
+        for event in itertools.islice(events, len(capture_sources(config))):
+            apply(event)
+
+        entities: list[Any] = []
+        await sensor.async_setup_entry(
+            hass, entry, lambda new, update_before_add=False: entities.extend(new)
+        )
+        for entity in entities:
+            entity.hass = hass
+            await entity.async_added_to_hass()
+            # Like the entity platform, which writes the first state itself.
+            entity.async_write_ha_state()
+
+        started = time.perf_counter()
+        for event in events:
+            if realtime:
+                await asyncio.sleep(max(0.0, event.offset - (time.perf_counter() - started)))
+            fire_timers(event.offset)
+            clock[0] = event.offset
+            apply(event)
+            update = SimpleNamespace(
+                data={"entity_id": event.entity_id, "new_state": hass.states.get(event.entity_id)}
+            )
+            for action in list(listeners.get(event.entity_id, ())):
+                action(update)
+            result.events += 1
+        fire_timers(clock[0])
+        energy_scheduler.stop()
+        fire_timers(float("inf"))
+        result.elapsed = time.perf_counter() - started
+
+        for entity in entities:
+            await entity.async_will_remove_from_hass()
+        for unload in unloads:
+            unload()
+
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("--realtime", action="store_true")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--save", type=Path, help="write the outputs and fired events of the first run")
+    parser.add_argument("--compare", type=Path, help="outputs and fired events saved by an earlier build")
+    args = parser.parse_args(argv)
+
+    results = [
+        asyncio.run(async_replay(args.capture, realtime=args.realtime))
+        for _ in range(max(1, args.runs))
+    ]
+    first = results[0]
+    best = min(results, key=lambda result: result.elapsed)
+    print(f"events:        {first.events}")
+    print(f"writes:        {len(first.outputs)}")
+    print(f"fired events:  {len(first.fired)}")
+    print(f"best elapsed:  {best.elapsed * 1000:.2f} ms")
+    print(f"throughput:    {best.throughput:,.0f} events/s")
+    print(f"digest:        {first.digest()}")
+
+    status = 0
+    if len({result.digest() for result in results}) != 1:
+        print("NON-DETERMINISTIC: runs produced different outputs")
+        status = 1
+    # Round-tripped through JSON so it compares equal to a saved baseline.
+    baseline = json.loads(json.dumps({"outputs": first.outputs, "fired": first.fired}))
+    if args.save:
+        args.save.write_text(json.dumps(baseline))
+    if args.compare:
+        expected = json.loads(args.compare.read_text())
+        matched = True
+        for key, label in (("outputs", "write"), ("fired", "fired event")):
+            want, got = expected.get(key, []), baseline[key]
+            if want != got:
+                mismatch = next(
+                    (index for index, pair in enumerate(zip(want, got)) if pair[0] != pair[1]),
+                    min(len(want), len(got)),
+                )
+                print(f"MISMATCH against {args.compare} at {label} #{mismatch}")
+                matched = False
+        if matched:
+            print(f"outputs and fired events match {args.compare}")
+        else:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import random
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.powermix.baseload import (
+    BaseloadEstimator,
+    RollingMinimum,
+    RollingQuantile,
+)
+from custom_components.powermix.metrics import PowermixMetrics
+from custom_components.powermix.sensor import PowermixBaseloadSensor, PowermixOtherSensor
+from tests.helpers import DummyHass
+
+
+def _steps(seed: int, count: int) -> list[tuple[float, float | None]]:
+    rng = random.Random(seed)
+    now = 0.0
+    steps = []
+    for _ in range(count):
+        now += rng.expovariate(1 / 30)
+        value = None if rng.random() < 0.05 else round(rng.uniform(-200, 3000), 2)
+        steps.append((now, value))
+    return steps
+
+
+def _window_values(
+    steps: list[tuple[float, float | None]], now: float, window: float
+) -> list[tuple[float, float]]:
+    """(value, seconds inside the window) for every step, brute force."""
+
+    spans = []
+    for (start, value), (end, _) in zip(steps, [*steps[1:], (now, None)]):
+        seconds = min(end, now) - max(start, now - window)
+        if value is not None and seconds > 0:
+            spans.append((value, seconds))
+    return spans
+
+
+def test_rolling_minimum_matches_brute_force() -> None:
+    window = 3600.0
+    steps = _steps(1, 2000)
+    rolling = RollingMinimum(window)
+    for index, (now, value) in enumerate(steps):
+        rolling.add(now, value)
+        probe = now + 1.0
+        expected = min(
+            (value for value, _ in _window_values(steps[: index + 1], probe, window)),
+            default=None,
+        )
+        assert rolling.value(probe) == expected
+
+
+def test_rolling_quantile_stays_within_accuracy() -> None:
+    window = 6 * 3600.0
+    steps = _steps(2, 3000)
+    quantile = RollingQuantile(window, slots=96, accuracy=0.01)
+    for now, value in steps:
+        quantile.add(now, value)
+    now = steps[-1][0]
+
+    # Expected over the window that whole-slot expiry actually covers.
+    slot = window / 96
+    covered = now - (int((now - window) / slot) + 1) * slot
+    spans = sorted(_window_values(steps, now, covered))
+    total = sum(seconds for _, seconds in spans)
+    running = 0.0
+    for expected, seconds in spans:
+        running += seconds
+        if running >= 0.05 * total:
+            break
+
+    estimate = quantile.quantile(now, 0.05)
+    assert estimate == pytest.approx(expected, rel=0.011)
+
+
+def test_estimator_history_survives_a_restart() -> None:
+    estimator = BaseloadEstimator(24 * 3600, 5)
+    for now, value in _steps(3, 500):
+        estimator.update(now, value)
+    last = _steps(3, 500)[-1][0]
+    before = estimator.estimate(last + 60)
+
+    saved = json.loads(json.dumps(estimator.as_dict()))
+    restored = BaseloadEstimator(24 * 3600, 5)
+    restored.restore(saved, last + 60)
+    assert restored.estimate(last + 60)[0] == before[0]
+    assert restored.estimate(last + 60)[1] == pytest.approx(before[1])
+
+    # History saved for another window is not reused.
+    other_window = BaseloadEstimator(3600, 5)
+    other_window.restore(saved, last + 60)
+    assert other_window.estimate(last + 60) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_baseload_sensor_restores_history_and_reports_low_envelope() -> None:
+    clock = {"now": 0.0}
+    estimator = BaseloadEstimator(3600, 5)
+    estimator.update(0.0, 150.0)
+    estimator.update(600.0, 900.0)
+    saved = estimator.as_dict()
+
+    metrics = PowermixMetrics("entry123", "Powermix", None)
+    sensor = PowermixBaseloadSensor(
+        "entry123", "Powermix", "sensor.main", BaseloadEstimator(3600, 5), metrics=metrics
+    )
+    sensor.hass = DummyHass()
+    clock["now"] = 1800.0
+    with patch(
+        "custom_components.powermix.sensor.time",
+        SimpleNamespace(time=lambda: clock["now"], monotonic=lambda: clock["now"]),
+    ), patch.object(
+        sensor, "async_get_last_extra_data", return_value=SimpleNamespace(as_dict=lambda: saved)
+    ), patch(
+        "custom_components.powermix.sensor.async_track_time_interval"
+    ) as track_interval, patch(
+        "custom_components.powermix.sensor.SensorEntity.async_write_ha_state"
+    ):
+        await sensor.async_added_to_hass()
+
+    # 150 W held for the first 10 minutes, then nothing is known after the restart.
+    assert sensor.native_value == pytest.approx(150.0, rel=0.01)
+    assert sensor.extra_state_attributes == {
+        "rolling_minimum": 150.0,
+        "window_hours": 1.0,
+        "percentile": 5,
+    }
+    assert track_interval.call_count == 1
+    assert sensor.extra_restore_state_data.as_dict()["window"] == 3600
+    # Exported as a power series of its own role, sourced from the main sensor.
+    assert 'role="baseload",source="sensor.main"} ' in metrics.power_block()
+
+
+@pytest.mark.asyncio
+async def test_other_sensor_feeds_published_values_to_the_estimator() -> None:
+    hass = DummyHass()
+    hass.states.set("sensor.main", "500", {"unit_of_measurement": "W"})
+    hass.states.set("sensor.ev", "100", {"unit_of_measurement": "W"})
+    estimator = BaseloadEstimator(3600, 5)
+    other = PowermixOtherSensor(
+        "entry123", "Powermix", "sensor.main", ["sensor.ev"], [], baseload=estimator
+    )
+    other.hass = hass
+    clock = {"now": 0.0}
+
+    with patch(
+        "custom_components.powermix.sensor.time",
+        SimpleNamespace(time=lambda: clock["now"], monotonic=lambda: clock["now"]),
+    ), patch("custom_components.powermix.sensor.SensorEntity.async_write_ha_state"):
+        other._handle_state_change(None)  # type: ignore[attr-defined]
+        clock["now"] = 60.0
+        hass.states.set("sensor.ev", "300", {"unit_of_measurement": "W"})
+        other._handle_state_change(None)  # type: ignore[attr-defined]
+        clock["now"] = 120.0
+        other._handle_state_change(None)  # type: ignore[attr-defined]  # unchanged
+
+    assert estimator.estimate(120.0)[0] == 200.0
+    assert estimator.estimate(120.0)[1] == pytest.approx(200.0, rel=0.01)
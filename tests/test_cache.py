@@ -0,0 +1,39 @@
+from custom_components.powermix.cache import LastKnownValueCache
+
+
+def test_cache_holds_value_until_ttl_expires() -> None:
+    cache = LastKnownValueCache(30)
+    assert cache.resolve("sensor.ev", 100_000, "W", 0.0) == (100_000, "W", False)
+
+    assert cache.resolve("sensor.ev", None, None, 5.0) == (100_000, "W", True)
+    assert cache.resolve("sensor.ev", None, None, 20.0) == (100_000, "W", True)
+    assert cache.remaining("sensor.ev", 20.0) == 15.0
+
+    assert cache.resolve("sensor.ev", None, None, 35.0) == (None, None, False)
+    assert cache.remaining("sensor.ev", 35.0) is None
+    # A single outage counts once, however often it is looked up.
+    assert cache.holds == 1
+    assert cache.expirations == 1
+
+
+def test_cache_recovery_resets_the_outage() -> None:
+    cache = LastKnownValueCache(30)
+    cache.resolve("sensor.ev", 100_000, "W", 0.0)
+    cache.resolve("sensor.ev", None, None, 10.0)
+    assert cache.resolve("sensor.ev", 120_000, "W", 15.0) == (120_000, "W", False)
+
+    # The next outage starts a fresh TTL window.
+    assert cache.resolve("sensor.ev", None, None, 40.0) == (120_000, "W", True)
+    assert cache.holds == 2
+    assert cache.expirations == 0
+    assert cache.as_dict()["holding"] == ["sensor.ev"]
+
+
+def test_cache_without_ttl_or_history_does_not_hold() -> None:
+    disabled = LastKnownValueCache(0)
+    disabled.resolve("sensor.ev", 100_000, "W", 0.0)
+    assert disabled.resolve("sensor.ev", None, None, 1.0) == (None, None, False)
+
+    cache = LastKnownValueCache(30)
+    assert cache.resolve("sensor.never_seen", None, None, 0.0) == (None, None, False)
+    assert cache.holds == 0
@@ -1,4 +1,10 @@
-from powermix.calculator import calculate_other, coerce_float
+from powermix.calculator import (
+    calculate_other,
+    coerce_float,
+    milliwatts,
+    milliwatts_to_watts,
+    other_milliwatts,
+)
 
 
 def test_coerce_float_handles_numbers_and_strings() -> None:
@@ -26,3 +32,24 @@ def test_calculate_other_allows_negative_when_requested() -> None:
 
 def test_calculate_other_rounds_to_two_decimals() -> None:
     assert calculate_other(10, [3.3333]) == 6.67
+
+
+def test_milliwatts_parses_decimal_strings_exactly() -> None:
+    assert milliwatts("1234.5", "W") == (1_234_500, "W")
+    assert milliwatts(" -0.25 ", "kW") == (-250_000, "W")
+    assert milliwatts("0.1", "W") == (100, "W")
+    assert milliwatts("0.0025", "W") == (2, "W")  # half to even
+    assert milliwatts("0.0035", "W") == (4, "W")
+    assert milliwatts(12, "W") == (12_000, "W")
+    assert milliwatts("1e3", "W") == (1_000_000, "W")
+    assert milliwatts("inf", "W") == (None, "W")
+    assert milliwatts("unavailable", "kW") == (None, "W")
+
+
+def test_milliwatt_sums_do_not_drift() -> None:
+    parts = [milliwatts("0.1", "W")[0]] * 10
+    assert other_milliwatts(1000, parts) == 0
+    assert other_milliwatts(1000, [3000, None]) == 0
+    assert other_milliwatts(1000, [3000], allow_negative=True) == -2000
+    assert milliwatts_to_watts(other_milliwatts(10_000, [3_333])) == 6.67
+    assert milliwatts_to_watts(None) is None
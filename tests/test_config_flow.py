@@ -9,8 +9,12 @@ from custom_components.powermix.config_flow import (
     PowermixOptionsFlowHandler,
 )
 from custom_components.powermix.const import (
+    CONF_CONSUMER_AREAS,
+    CONF_CONSUMER_PATTERNS,
     CONF_INCLUDED_SENSORS,
     CONF_MAIN_SENSOR,
+    CONF_PRODUCER_AREAS,
+    CONF_PRODUCER_LABELS,
     CONF_PRODUCER_SENSORS,
     CONF_SENSOR_PREFIX,
     DEFAULT_SENSOR_PREFIX,
@@ -100,3 +104,31 @@ async def test_options_flow_updates_include_and_prefix() -> None:
     assert options[CONF_INCLUDED_SENSORS] == ["sensor.ev", "sensor.heat_pump"]
     assert options[CONF_PRODUCER_SENSORS] == ["sensor.pv", "sensor.battery"]
     assert options[CONF_SENSOR_PREFIX] == "Custom Prefix"
+
+
+@pytest.mark.asyncio
+async def test_options_flow_stores_membership_rules() -> None:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_MAIN_SENSOR: "sensor.total_power",
+            CONF_INCLUDED_SENSORS: [],
+            CONF_SENSOR_PREFIX: "Powermix",
+        },
+    )
+
+    flow = PowermixOptionsFlowHandler(entry)
+    result = await flow.async_step_init(
+        {
+            CONF_CONSUMER_AREAS: ["garage"],
+            CONF_CONSUMER_PATTERNS: [" sensor.*_power ", "", "sensor.*_power"],
+            CONF_PRODUCER_LABELS: ["solar"],
+            CONF_SENSOR_PREFIX: "Powermix",
+        }
+    )
+
+    options = result["data"]
+    assert options[CONF_CONSUMER_AREAS] == ["garage"]
+    assert options[CONF_CONSUMER_PATTERNS] == ["sensor.*_power"]
+    assert options[CONF_PRODUCER_LABELS] == ["solar"]
+    assert options[CONF_PRODUCER_AREAS] == []
@@ -0,0 +1,92 @@
+"""Differential tests: the package and the bundled copy must agree."""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+import random
+import runpy
+from typing import Any
+
+from custom_components.powermix.lib import _vendor
+from powermix import calculator
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CORPUS: list[Any] = [
+    None, 0, 1, -7, True, False, 0.0, -0.0, 3.14, 1e300, math.inf, -math.inf, math.nan,
+    "0", "42", "42.5", " 42.5 ", "-1.25", "+3", "1e3", "1E-3", "1_000", ".5", "5.",
+    "inf", "-Infinity", "nan", " NaN ", "-nan", "+nan", "unknown", " Unavailable ",
+    "none", "None", "", "   ", "garbage", "12abc", "0x10", "١٢٣", "\t7\n",
+    b"12", [1], {"a": 1}, object(),
+]
+
+
+def _reference_coerce_float(value: Any) -> float | None:
+    # The original implementation the fast path must stay equivalent to.
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in {"unknown", "unavailable", "none", "nan"}:
+            return None
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    return None
+
+
+def _same(left: Any, right: Any) -> bool:
+    if isinstance(left, tuple) and isinstance(right, tuple):
+        return len(left) == len(right) and all(map(_same, left, right))
+    if isinstance(left, float) and isinstance(right, float) and math.isnan(left):
+        return math.isnan(right)
+    return left == right and type(left) is type(right)
+
+
+def _fuzz(count: int) -> list[str]:
+    rng = random.Random(1234)
+    alphabet = "0123456789.-+eE _naifNAIF\t"
+    return ["".join(rng.choices(alphabet, k=rng.randint(0, 8))) for _ in range(count)]
+
+
+def test_vendored_copy_is_generated_from_the_package() -> None:
+    vendor = runpy.run_path(str(ROOT / "scripts" / "vendor"), run_name="vendor")
+    assert (ROOT / "custom_components/powermix/lib/_vendor.py").read_text() == vendor["render"]()
+
+
+def test_coerce_float_matches_reference_in_both_distributions() -> None:
+    for value in CORPUS + _fuzz(5000):
+        expected = _reference_coerce_float(value)
+        assert _same(calculator.coerce_float(value), expected), value
+        assert _same(_vendor.coerce_float(value), expected), value
+
+
+def test_calculate_other_agrees() -> None:
+    rng = random.Random(99)
+    numeric = [value for value in CORPUS if isinstance(value, (type(None), int, float, str))]
+    for _ in range(500):
+        main = rng.choice(numeric)
+        parts = rng.sample(numeric, rng.randint(0, 6))
+        allow_negative = rng.random() < 0.5
+        assert _same(
+            calculator.calculate_other(main, parts, allow_negative=allow_negative),
+            _vendor.calculate_other(main, parts, allow_negative=allow_negative),
+        )
+
+
+def test_milliwatts_track_coerce_float_in_both_distributions() -> None:
+    for value in CORPUS + _fuzz(5000):
+        for unit in ("W", "kW"):
+            milli, label = calculator.milliwatts(value, unit)
+            assert _same((milli, label), _vendor.milliwatts(value, unit)), value
+            reference = _reference_coerce_float(value)
+            if reference is None or not math.isfinite(reference):
+                assert milli is None, value
+            else:
+                scaled = reference * (1000 if unit == "W" else 1_000_000)
+                assert type(milli) is int, value
+                assert math.isclose(milli, scaled, rel_tol=1e-12, abs_tol=1), value
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from homeassistant.core import HomeAssistant, State
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.powermix.const import (
+    CONF_BASELOAD_WINDOW,
+    CONF_ENERGY_CYCLES,
+    CONF_ENERGY_OFFSET,
+    CONF_ENERGY_TIMEZONE,
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_SENSOR_PREFIX,
+    DOMAIN,
+    SENSOR_DOMAIN,
+)
+from custom_components.powermix.energy import (
+    CYCLE_DAILY,
+    CYCLE_MONTHLY,
+    CYCLE_WEEKLY,
+    EnergyMeters,
+    cycle_start,
+    next_cycle_start,
+)
+
+AMSTERDAM = ZoneInfo("Europe/Amsterdam")
+POWER = {"device_class": "power", "unit_of_measurement": "W"}
+
+
+def test_cycle_boundaries_follow_offset_and_local_time() -> None:
+    offset = timedelta(hours=6)
+    # 03:00 local on Sunday 31 March 2024 still belongs to Saturday's day.
+    when = datetime(2024, 3, 31, 1, 0, tzinfo=dt_util.UTC)
+    day = cycle_start(CYCLE_DAILY, when, AMSTERDAM, offset)
+    assert day == datetime(2024, 3, 30, 6, 0, tzinfo=AMSTERDAM)
+    # The DST switch shortens that day, but the next one still starts at 06:00.
+    assert next_cycle_start(CYCLE_DAILY, day, AMSTERDAM, offset) == datetime(
+        2024, 3, 31, 6, 0, tzinfo=AMSTERDAM
+    )
+    assert cycle_start(CYCLE_WEEKLY, when, AMSTERDAM, offset) == datetime(
+        2024, 3, 25, 6, 0, tzinfo=AMSTERDAM
+    )
+    month = cycle_start(CYCLE_MONTHLY, when, AMSTERDAM, offset)
+    assert month == datetime(2024, 3, 1, 6, 0, tzinfo=AMSTERDAM)
+    assert next_cycle_start(CYCLE_MONTHLY, month, AMSTERDAM, offset) == datetime(
+        2024, 4, 1, 6, 0, tzinfo=AMSTERDAM
+    )
+
+
+def test_meters_split_energy_exactly_at_the_boundary() -> None:
+    start = datetime(2024, 5, 5, 23, 0, tzinfo=AMSTERDAM)  # a Sunday
+    meters = EnergyMeters([CYCLE_WEEKLY, CYCLE_DAILY], AMSTERDAM, timedelta(), start)
+    assert meters.cycles == [CYCLE_DAILY, CYCLE_WEEKLY]
+    t0 = start.timestamp()
+
+    meters.update("other", t0, 1_000_000)
+    meters.update("other", t0 + 1800, None)
+    meters.update("other", t0 + 2700, 2_000_000)
+    assert meters.total("other", CYCLE_DAILY, t0 + 3600) == pytest.approx(1.0)
+
+    # Rolled late, at 00:30: only the half hour after midnight is in the new cycles.
+    assert meters.roll(start + timedelta(minutes=90))
+    assert meters.total("other", CYCLE_DAILY, t0 + 5400) == pytest.approx(1.0)
+    assert meters.total("other", CYCLE_WEEKLY, t0 + 5400) == pytest.approx(1.0)
+    assert meters.starts[CYCLE_DAILY] == datetime(2024, 5, 6, tzinfo=AMSTERDAM)
+    assert meters.next_boundary() == datetime(2024, 5, 7, tzinfo=AMSTERDAM)
+
+    # A counter restored from the previous cycle is dropped; the current one is exact.
+    meters.restore("mirror", CYCLE_DAILY, 5, datetime(2024, 5, 5, tzinfo=AMSTERDAM))
+    meters.restore("mirror", CYCLE_WEEKLY, 18_000_000_000_001, meters.starts[CYCLE_WEEKLY])
+    assert meters.raw_total("mirror", CYCLE_DAILY, t0 + 5400) == 0
+    assert meters.raw_total("mirror", CYCLE_WEEKLY, t0 + 5400) == 18_000_000_000_001
+    assert meters.total("mirror", CYCLE_WEEKLY, t0 + 5400) == pytest.approx(5.0)
+
+
+@pytest.mark.asyncio
+async def test_energy_sensors_count_and_reset_on_the_shared_schedule(
+    hass: HomeAssistant, enable_custom_integrations: None, freezer: FrozenDateTimeFactory
+) -> None:
+    freezer.move_to(datetime(2024, 5, 6, 22, 0, tzinfo=AMSTERDAM))
+    hass.states.async_set("sensor.main", "1000", POWER)
+    hass.states.async_set("sensor.ev", "400", POWER)
+    entries = []
+    for main_sensor, prefix in (("sensor.main", "Powermix"), ("sensor.ev", "EV")):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_MAIN_SENSOR: main_sensor,
+                CONF_INCLUDED_SENSORS: ["sensor.ev"] if main_sensor == "sensor.main" else [],
+                CONF_SENSOR_PREFIX: prefix,
+            },
+            options={
+                CONF_BASELOAD_WINDOW: 0,
+                CONF_ENERGY_CYCLES: [CYCLE_DAILY, CYCLE_MONTHLY],
+                CONF_ENERGY_OFFSET: 0,
+                CONF_ENERGY_TIMEZONE: "Europe/Amsterdam",
+            },
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.powermix_other_usage_daily_energy").state == "0.0"
+    assert hass.states.get("sensor.powermix_sensor_ev_daily_energy") is not None
+    assert hass.states.get("sensor.ev_other_usage_monthly_energy") is not None
+
+    freezer.tick(timedelta(minutes=30))
+    hass.states.async_set("sensor.main", "1600", POWER)
+    await hass.async_block_till_done()
+    freezer.tick(timedelta(minutes=30))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    daily = hass.states.get("sensor.powermix_other_usage_daily_energy")
+    assert float(daily.state) == pytest.approx(0.9)  # 0.5 h at 600 W + 0.5 h at 1200 W
+    assert daily.attributes["last_reset"] == "2024-05-06T00:00:00+02:00"
+    assert daily.attributes["state_class"] == "total"
+    assert float(hass.states.get("sensor.powermix_sensor_ev_daily_energy").state) == 0.4
+    energy_block = hass.data[DOMAIN][entries[0].entry_id]["metrics"].energy_block()
+    assert (
+        'powermix_energy_kwh{entry="%s",prefix="Powermix",role="consumer",'
+        'source="sensor.ev",cycle="monthly"} 0.4\n' % entries[0].entry_id
+    ) in energy_block
+    assert 'role="other",source="sensor.main",cycle="daily"} 0.9\n' in energy_block
+
+    # Midnight resets the daily counters of both entries; the monthly ones keep going.
+    freezer.tick(timedelta(hours=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    daily = hass.states.get("sensor.powermix_other_usage_daily_energy")
+    assert float(daily.state) == 0
+    assert daily.attributes["last_reset"] == "2024-05-07T00:00:00+02:00"
+    assert float(hass.states.get("sensor.ev_other_usage_daily_energy").state) == 0
+    monthly = hass.states.get("sensor.powermix_other_usage_monthly_energy")
+    assert float(monthly.state) == pytest.approx(2.1)
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_energy_sensor_restores_the_exact_total(
+    hass: HomeAssistant, enable_custom_integrations: None, freezer: FrozenDateTimeFactory
+) -> None:
+    freezer.move_to(datetime(2024, 5, 6, 22, 0, tzinfo=AMSTERDAM))
+    hass.states.async_set("sensor.main", "600", POWER)
+    # 0.5 Wh more than the saved state shows, which the rounded state would lose.
+    saved = 1_800_000_000 + 3_600_000_000 // 2
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State("sensor.powermix_other_usage_daily_energy", "0.001"),
+                {"total": saved, "last_reset": "2024-05-06T00:00:00+02:00"},
+            ),
+            (
+                State("sensor.powermix_other_usage_monthly_energy", "0.001"),
+                {"total": saved, "last_reset": "2024-04-01T00:00:00+02:00"},
+            ),
+        ],
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MAIN_SENSOR: "sensor.main", CONF_INCLUDED_SENSORS: []},
+        options={
+            CONF_BASELOAD_WINDOW: 0,
+            CONF_ENERGY_CYCLES: [CYCLE_DAILY, CYCLE_MONTHLY],
+            CONF_ENERGY_OFFSET: 0,
+            CONF_ENERGY_TIMEZONE: "Europe/Amsterdam",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    meters = hass.data[DOMAIN][entry.entry_id]["energy"]
+    series = f"{entry.entry_id}_other"
+    now = dt_util.utcnow().timestamp()
+    assert meters.raw_total(series, CYCLE_DAILY, now) == saved
+    # Saved in April, so it does not belong to the current monthly cycle.
+    assert meters.raw_total(series, CYCLE_MONTHLY, now) == 0
+
+    # What is saved on the next restart is the exact total again, not the state.
+    freezer.tick(timedelta(hours=1))
+    daily = hass.data[SENSOR_DOMAIN].get_entity("sensor.powermix_other_usage_daily_energy")
+    assert daily.extra_restore_state_data.as_dict() == {
+        "total": saved + 600_000 * 3_600_000,
+        "last_reset": "2024-05-06T00:00:00+02:00",
+    }
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
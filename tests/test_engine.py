@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import io
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from powermix.__main__ import main
+from powermix.engine import (
+    OUTPUT_LINE,
+    AuthenticationError,
+    Breakdown,
+    EngineConfig,
+    PowermixEngine,
+    SubscriptionError,
+)
+
+
+class FakeHomeAssistant:
+    """Just enough of the websocket and REST API to drive the engine."""
+
+    def __init__(self, states: dict[str, tuple[str, dict[str, Any]]]) -> None:
+        self.states = states
+        self.sockets: list[web.WebSocketResponse] = []
+        self.posted: list[tuple[str, dict[str, Any]]] = []
+        self.reject_subscribe = False
+        # Entities whose next POST hangs until the client gives up.
+        self.stall: set[str] = set()
+        # Faults for the next handshakes: "close" after the auth message, "garbage"
+        # sends a frame that is not JSON.
+        self.handshake_faults: list[str] = []
+        self.app = web.Application()
+        self.app.router.add_get("/api/websocket", self._websocket)
+        self.app.router.add_post("/api/states/{entity_id}", self._post_state)
+
+    def _state(self, entity_id: str) -> dict[str, Any]:
+        state, attributes = self.states[entity_id]
+        return {"entity_id": entity_id, "state": state, "attributes": attributes}
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        fault = self.handshake_faults.pop(0) if self.handshake_faults else None
+        if fault == "garbage":
+            await ws.send_str("{not json")
+            await ws.close()
+            return ws
+        await ws.send_json({"type": "auth_required"})
+        auth = await ws.receive_json()
+        if fault == "close":
+            await ws.close()
+            return ws
+        if auth.get("access_token") != "secret":
+            await ws.send_json({"type": "auth_invalid", "message": "Invalid access token"})
+            await ws.close()
+            return ws
+        await ws.send_json({"type": "auth_ok"})
+        self.sockets.append(ws)
+        async for message in ws:
+            command = message.json()
+            result: Any = None
+            if command["type"] == "subscribe_events" and self.reject_subscribe:
+                await ws.send_json(
+                    {
+                        "id": command["id"],
+                        "type": "result",
+                        "success": False,
+                        "error": {"code": "unauthorized", "message": "Unauthorized"},
+                    }
+                )
+                continue
+            if command["type"] == "get_states":
+                result = [self._state(entity_id) for entity_id in self.states]
+            await ws.send_json(
+                {"id": command["id"], "type": "result", "success": True, "result": result}
+            )
+        self.sockets.remove(ws)
+        return ws
+
+    async def _post_state(self, request: web.Request) -> web.Response:
+        entity_id = request.match_info["entity_id"]
+        if entity_id in self.stall:
+            self.stall.discard(entity_id)
+            await asyncio.sleep(5)
+        self.posted.append((entity_id, await request.json()))
+        return web.json_response({})
+
+    async def push(self, entity_id: str, state: str, attributes: dict[str, Any]) -> None:
+        self.states[entity_id] = (state, attributes)
+        for ws in list(self.sockets):
+            await ws.send_json(
+                {
+                    "id": 1,
+                    "type": "event",
+                    "event": {
+                        "event_type": "state_changed",
+                        "data": {"entity_id": entity_id, "new_state": self._state(entity_id)},
+                    },
+                }
+            )
+
+
+async def _wait_for(predicate: Callable[[], bool]) -> None:
+    for _ in range(400):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def _fake() -> FakeHomeAssistant:
+    return FakeHomeAssistant(
+        {
+            "sensor.main": ("1.5", {"unit_of_measurement": "kW"}),
+            "sensor.ev": ("250", {"unit_of_measurement": "W", "friendly_name": "EV"}),
+            "sensor.unrelated": ("1", {}),
+        }
+    )
+
+
+def test_breakdown_matches_integration_semantics() -> None:
+    breakdown = Breakdown("sensor.main", ["sensor.ev", "sensor.main"], ["sensor.pv"])
+
+    assert breakdown.update("sensor.main", "1.5", {"unit_of_measurement": "kW"}) == [breakdown.other]
+    assert breakdown.other.value == 1500.0
+    assert breakdown.other.unit == "W"
+
+    changed = breakdown.update("sensor.ev", "2000", {"unit_of_measurement": "W", "friendly_name": "EV"})
+    ev = breakdown.mirrors["sensor.ev"]
+    assert changed == [ev, breakdown.other]
+    assert ev.entity_id == "sensor.powermix_ev"
+    assert ev.friendly_name == "Powermix EV"
+    # Producers are configured, so Other may go negative.
+    assert breakdown.other.value == -500.0
+
+    assert breakdown.update("sensor.pv", "300", {"unit_of_measurement": "W"}) == [
+        breakdown.mirrors["sensor.pv"]
+    ]
+    assert breakdown.update("sensor.ev", None, None) == [ev, breakdown.other]
+    assert (ev.value, ev.unit) == (None, "W")
+    assert breakdown.update("sensor.ev", None, None) == []
+
+
+@pytest.mark.asyncio
+async def test_engine_batches_line_protocol_and_reconnects(socket_enabled: None) -> None:
+    fake = _fake()
+    sink = io.StringIO()
+    async with TestServer(fake.app) as server:
+        engine = PowermixEngine(
+            EngineConfig(
+                url=str(server.make_url("/api/websocket")),
+                token="secret",
+                breakdown=Breakdown("sensor.main", ["sensor.ev"]),
+                output=OUTPUT_LINE,
+                line_sink=sink,
+                batch_interval=0.02,
+                reconnect_delay=0.01,
+            ),
+            clock=lambda: 1.0,
+        )
+        task = asyncio.create_task(engine.run())
+        await _wait_for(lambda: "sensor.powermix_other_usage" in sink.getvalue())
+        assert sink.getvalue().splitlines() == [
+            "powermix,entity_id=sensor.powermix_other_usage,prefix=Powermix,role=other "
+            "value=1250.0 1000000000",
+            "powermix,entity_id=sensor.powermix_ev,prefix=Powermix,role=consumer "
+            "value=250.0 1000000000",
+        ]
+
+        # A burst of changes is coalesced into the latest value per output.
+        sink.truncate(0)
+        sink.seek(0)
+        for value in ("300", "400", "500"):
+            await fake.push("sensor.ev", value, {"unit_of_measurement": "W"})
+        await fake.push("sensor.unrelated", "2", {})
+        await _wait_for(lambda: engine.stats.events == 3)
+        await _wait_for(lambda: "value=1000.0" in sink.getvalue())
+        assert len(sink.getvalue().splitlines()) == 2
+
+        await fake.sockets[0].close()
+        await _wait_for(lambda: engine.stats.connections == 2)
+
+        engine.stop()
+        await task
+
+
+@pytest.mark.asyncio
+async def test_engine_publishes_states_over_rest(socket_enabled: None) -> None:
+    fake = _fake()
+    async with TestServer(fake.app) as server:
+        engine = PowermixEngine(
+            EngineConfig(
+                url=str(server.make_url("/api/websocket")),
+                token="secret",
+                breakdown=Breakdown("sensor.main", ["sensor.ev"], prefix="Garage"),
+                batch_interval=0.02,
+            )
+        )
+        task = asyncio.create_task(engine.run())
+        await _wait_for(lambda: len(fake.posted) == 2)
+        engine.stop()
+        await task
+
+    posted = dict(fake.posted)
+    assert posted["sensor.garage_other_usage"]["state"] == 1250.0
+    assert posted["sensor.garage_ev"]["attributes"] == {
+        "friendly_name": "Garage EV",
+        "device_class": "power",
+        "state_class": "measurement",
+        "sensor_role": "consumer",
+        "unit_of_measurement": "W",
+    }
+
+
+@pytest.mark.asyncio
+async def test_engine_stops_on_rejected_token(socket_enabled: None) -> None:
+    async with TestServer(_fake().app) as server:
+        engine = PowermixEngine(
+            EngineConfig(
+                url=str(server.make_url("/api/websocket")),
+                token="wrong",
+                breakdown=Breakdown("sensor.main", []),
+            )
+        )
+        with pytest.raises(AuthenticationError):
+            await engine.run()
+
+
+@pytest.mark.asyncio
+async def test_engine_retries_timed_out_posts_and_keeps_publishing(socket_enabled: None) -> None:
+    fake = _fake()
+    fake.stall.add("sensor.garage_ev")
+    async with TestServer(fake.app) as server:
+        engine = PowermixEngine(
+            EngineConfig(
+                url=str(server.make_url("/api/websocket")),
+                token="secret",
+                breakdown=Breakdown("sensor.main", ["sensor.ev"], prefix="Garage"),
+                batch_interval=0.02,
+                request_timeout=0.1,
+            )
+        )
+        task = asyncio.create_task(engine.run())
+        await _wait_for(lambda: engine.stats.published == 2)
+        assert "TimeoutError" in (engine.stats.last_error or "")
+        await fake.push("sensor.main", "2", {"unit_of_measurement": "kW"})
+        await _wait_for(lambda: engine.stats.published == 3)
+        engine.stop()
+        await task
+
+    assert [entity_id for entity_id, _ in fake.posted] == [
+        "sensor.garage_other_usage",
+        "sensor.garage_ev",
+        "sensor.garage_other_usage",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_engine_stops_on_rejected_subscription(socket_enabled: None) -> None:
+    fake = _fake()
+    fake.reject_subscribe = True
+    async with TestServer(fake.app) as server:
+        engine = PowermixEngine(
+            EngineConfig(
+                url=str(server.make_url("/api/websocket")),
+                token="secret",
+                breakdown=Breakdown("sensor.main", []),
+            )
+        )
+        with pytest.raises(SubscriptionError, match="Unauthorized"):
+            await engine.run()
+
+
+@pytest.mark.asyncio
+async def test_engine_reconnects_after_broken_handshakes(socket_enabled: None) -> None:
+    fake = _fake()
+    fake.handshake_faults = ["close", "garbage"]
+    async with TestServer(fake.app) as server:
+        engine = PowermixEngine(
+            EngineConfig(
+                url=str(server.make_url("/api/websocket")),
+                token="secret",
+                breakdown=Breakdown("sensor.main", []),
+                reconnect_delay=0.01,
+            )
+        )
+        task = asyncio.create_task(engine.run())
+        await _wait_for(lambda: engine.stats.connections == 1)
+        assert not fake.handshake_faults
+        assert "JSONDecodeError" in (engine.stats.last_error or "")
+        engine.stop()
+        await task
+
+
+def test_cli_requires_a_token(monkeypatch: pytest.MonkeyPatch, capsys) -> None:
+    monkeypatch.delenv("POWERMIX_HA_TOKEN", raising=False)
+    with pytest.raises(SystemExit) as exit_info:
+        main(["serve", "--main", "sensor.main"])
+    assert exit_info.value.code == 2
+    assert "access token is required" in capsys.readouterr().err
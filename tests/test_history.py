@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.powermix.const import (
+    CONF_HISTORY_RETENTION,
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    DOMAIN,
+)
+from custom_components.powermix.history import SeriesBuffer
+
+POWER = {"device_class": "power", "unit_of_measurement": "W"}
+
+
+def test_buffer_keeps_the_retention_and_compacts() -> None:
+    buffer = SeriesBuffer(100.0)
+    for second in range(2000):
+        buffer.append(float(second), float(second % 7) if second % 50 else None)
+
+    # The value current at the horizon is kept, anything older is dropped.
+    assert len(buffer) == 101
+    assert buffer.points(1800.0, 1999.0)[0] == (1899.0, float(1899 % 7))
+    points = buffer.points(1900.5, 1999.0)
+    assert points[0] == (1900.5, None)
+    assert points[1] == (1901.0, float(1901 % 7))
+    assert points[-1] == (1999.0, float(1999 % 7))
+    assert len(buffer._times) < 2 * 101 + 256  # type: ignore[attr-defined]
+
+    buffer.append(1999.0, 3.5)  # same instant replaces the last value
+    assert buffer.points(1998.5, 1999.0)[-1] == (1999.0, 3.5)
+
+
+def test_downsampling_is_time_weighted() -> None:
+    buffer = SeriesBuffer(3600.0)
+    buffer.append(0.0, 100.0)
+    buffer.append(45.0, 400.0)
+    buffer.append(90.0, None)
+    buffer.append(150.0, 200.0)
+
+    assert buffer.points(0.0, 240.0, 60.0) == [
+        (0.0, 175.0),  # 45 s at 100 W, 15 s at 400 W
+        (60.0, 400.0),  # 30 s at 400 W, then unknown
+        (120.0, 200.0),
+        (180.0, 200.0),
+    ]
+    assert buffer.points(91.0, 149.0, 60.0) == [(91.0, None)]
+
+
+@pytest.mark.asyncio
+async def test_history_websocket_returns_the_whole_entry(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    hass_ws_client,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    hass.states.async_set("sensor.main", "500", POWER)
+    hass.states.async_set("sensor.ev", "100", POWER)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MAIN_SENSOR: "sensor.main", CONF_INCLUDED_SENSORS: ["sensor.ev"]},
+        options={CONF_HISTORY_RETENTION: 10},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=30))
+    hass.states.async_set("sensor.ev", "300", POWER)
+    await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=30))
+
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id({"type": "powermix/history", "entry_id": entry.entry_id})
+    response = await client.receive_json()
+    assert response["success"]
+    result = response["result"]
+    assert result["end"] - result["start"] == 600
+    other = result["series"]["sensor.powermix_other_usage"]
+    assert [value for _, value in other] == [400.0, 200.0]
+    assert other[1][0] - other[0][0] == pytest.approx(30)
+    assert [value for _, value in result["series"]["sensor.powermix_sensor_ev"]] == [100, 300]
+    assert "sensor.powermix_baseload" in result["series"]
+
+    await client.send_json_auto_id(
+        {
+            "type": "powermix/history",
+            "entry_id": entry.entry_id,
+            "duration": 60,
+            "resolution": 60,
+        }
+    )
+    response = await client.receive_json()
+    assert response["result"]["series"]["sensor.powermix_other_usage"] == [
+        [pytest.approx(response["result"]["start"]), 300.0]
+    ]
+
+    await client.send_json_auto_id({"type": "powermix/history", "entry_id": "missing"})
+    response = await client.receive_json()
+    assert response["error"]["code"] == "not_found"
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from homeassistant.auth.models import User
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, Unauthorized
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.powermix.const import (
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_PRODUCER_SENSORS,
+    CONF_SENSOR_PREFIX,
+    CONF_STALE_TIMEOUT,
+    DOMAIN,
+    SERVICE_IMPORT_BREAKDOWNS,
+)
+from custom_components.powermix.importer import (
+    BreakdownImportError,
+    load_breakdowns,
+    validate_breakdowns,
+)
+
+POWER = {"device_class": "power", "unit_of_measurement": "W"}
+
+
+@pytest.fixture
+def sources(hass: HomeAssistant) -> None:
+    for entity_id in (
+        "sensor.site_total",
+        "sensor.subpanel",
+        "sensor.heat_pump",
+        "sensor.ev",
+        "sensor.pv",
+    ):
+        hass.states.async_set(entity_id, "100", POWER)
+    hass.states.async_set("sensor.voltage", "230", {"device_class": "voltage"})
+
+
+@pytest.mark.asyncio
+async def test_validation_reports_every_problem_at_once(
+    hass: HomeAssistant, sources: None
+) -> None:
+    with pytest.raises(BreakdownImportError) as excinfo:
+        validate_breakdowns(
+            hass,
+            [
+                {
+                    CONF_MAIN_SENSOR: "sensor.site_total",
+                    CONF_INCLUDED_SENSORS: ["sensor.subpanel", "sensor.ev", "sensor.ev"],
+                    CONF_PRODUCER_SENSORS: ["sensor.missing"],
+                },
+                {
+                    CONF_MAIN_SENSOR: "sensor.subpanel",
+                    CONF_INCLUDED_SENSORS: ["sensor.voltage", "sensor.site_total"],
+                },
+                {CONF_MAIN_SENSOR: "sensor.subpanel"},
+                {CONF_INCLUDED_SENSORS: ["sensor.ev"]},
+            ],
+        )
+
+    errors = excinfo.value.errors
+    assert "breakdowns[0] (sensor.site_total): sensor.ev is listed more than once" in errors
+    assert "breakdowns[0] (sensor.site_total): sensor.missing does not exist" in errors
+    assert "breakdowns[1] (sensor.subpanel): sensor.voltage is not a power sensor" in errors
+    assert any(error.startswith("breakdowns[3]: required key not provided") for error in errors)
+    assert (
+        "sensor.subpanel is the main sensor of more than one breakdown (#1 and #2)" in errors
+    )
+    assert (
+        "Main sensors form a cycle: sensor.site_total -> sensor.subpanel -> sensor.site_total"
+        in errors
+    )
+
+
+@pytest.mark.asyncio
+async def test_cycles_through_existing_entries_are_rejected(
+    hass: HomeAssistant, sources: None
+) -> None:
+    MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_MAIN_SENSOR: "sensor.subpanel",
+            CONF_INCLUDED_SENSORS: ["sensor.site_total"],
+        },
+    ).add_to_hass(hass)
+    definition = {
+        CONF_MAIN_SENSOR: "sensor.site_total",
+        CONF_INCLUDED_SENSORS: ["sensor.subpanel"],
+    }
+
+    with pytest.raises(BreakdownImportError, match="cycle"):
+        validate_breakdowns(hass, [definition])
+
+    # Importing a new definition for the existing entry breaks the cycle.
+    validate_breakdowns(
+        hass,
+        [
+            definition,
+            {CONF_MAIN_SENSOR: "sensor.subpanel", CONF_INCLUDED_SENSORS: ["sensor.ev"]},
+        ],
+    )
+
+
+def test_breakdowns_load_from_yaml_and_json(tmp_path: Path) -> None:
+    yaml_file = tmp_path / "breakdowns.yaml"
+    yaml_file.write_text("breakdowns:\n  - main_sensor: sensor.site_total\n")
+    json_file = tmp_path / "breakdowns.json"
+    json_file.write_text('[{"main_sensor": "sensor.subpanel"}]')
+
+    assert load_breakdowns(yaml_file) == [{CONF_MAIN_SENSOR: "sensor.site_total"}]
+    assert load_breakdowns(json_file) == [{CONF_MAIN_SENSOR: "sensor.subpanel"}]
+
+
+@pytest.mark.asyncio
+async def test_import_service_creates_and_updates_entries(
+    hass: HomeAssistant, enable_custom_integrations: None, sources: None
+) -> None:
+    existing = MockConfigEntry(
+        domain=DOMAIN,
+        title="Old",
+        data={CONF_MAIN_SENSOR: "sensor.subpanel", CONF_INCLUDED_SENSORS: []},
+        options={
+            CONF_SENSOR_PREFIX: "Old",
+            CONF_STALE_TIMEOUT: 10,
+            CONF_INCLUDED_SENSORS: ["sensor.ev"],
+        },
+    )
+    existing.add_to_hass(hass)
+    breakdowns = [
+        {
+            CONF_MAIN_SENSOR: "sensor.site_total",
+            "name": "Site",
+            CONF_INCLUDED_SENSORS: ["sensor.subpanel"],
+            CONF_PRODUCER_SENSORS: ["sensor.pv"],
+        },
+        {CONF_MAIN_SENSOR: "sensor.subpanel", CONF_INCLUDED_SENSORS: ["sensor.heat_pump"]},
+    ]
+
+    with patch(
+        "custom_components.powermix.async_setup_entry", return_value=True
+    ) as setup_entry:
+        assert await async_setup_component(hass, DOMAIN, {})
+        dry_run = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_IMPORT_BREAKDOWNS,
+            {"breakdowns": breakdowns, "dry_run": True},
+            blocking=True,
+            return_response=True,
+        )
+        assert dry_run == {"valid": ["sensor.site_total", "sensor.subpanel"]}
+        assert len(hass.config_entries.async_entries(DOMAIN)) == 1
+
+        result = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_IMPORT_BREAKDOWNS,
+            {"breakdowns": breakdowns, "stagger": 0},
+            blocking=True,
+            return_response=True,
+        )
+        await hass.async_block_till_done()
+
+    assert result == {
+        "created": ["sensor.site_total"],
+        "updated": ["sensor.subpanel"],
+        "unchanged": [],
+        "failed": [],
+    }
+    entries = {
+        entry.data[CONF_MAIN_SENSOR]: entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    assert entries["sensor.site_total"].title == "Site"
+    assert entries["sensor.site_total"].data[CONF_PRODUCER_SENSORS] == ["sensor.pv"]
+    assert entries["sensor.subpanel"] is existing
+    assert existing.data[CONF_INCLUDED_SENSORS] == ["sensor.heat_pump"]
+    # UI options survive; the one the definition sets now comes from its data.
+    assert existing.options == {CONF_SENSOR_PREFIX: "Old", CONF_STALE_TIMEOUT: 10}
+    assert setup_entry.call_count >= 1
+
+    with pytest.raises(BreakdownImportError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_IMPORT_BREAKDOWNS,
+            {"breakdowns": [{CONF_MAIN_SENSOR: "sensor.voltage"}]},
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_import_lists_unexpected_flow_outcomes_as_failed(
+    hass: HomeAssistant, enable_custom_integrations: None, sources: None
+) -> None:
+    breakdowns = [
+        {CONF_MAIN_SENSOR: "sensor.site_total", CONF_INCLUDED_SENSORS: ["sensor.ev"]},
+        {CONF_MAIN_SENSOR: "sensor.subpanel", CONF_INCLUDED_SENSORS: ["sensor.heat_pump"]},
+    ]
+    flow_init = hass.config_entries.flow.async_init
+
+    async def _busy_first(handler, *, context=None, data=None):
+        if data[CONF_MAIN_SENSOR] == "sensor.site_total":
+            return {"type": "abort", "reason": "already_in_progress"}
+        return await flow_init(handler, context=context, data=data)
+
+    with patch(
+        "custom_components.powermix.async_setup_entry", return_value=True
+    ), patch.object(hass.config_entries.flow, "async_init", side_effect=_busy_first):
+        assert await async_setup_component(hass, DOMAIN, {})
+        result = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_IMPORT_BREAKDOWNS,
+            {"breakdowns": breakdowns, "stagger": 0},
+            blocking=True,
+            return_response=True,
+        )
+        await hass.async_block_till_done()
+
+    assert result == {
+        "created": ["sensor.subpanel"],
+        "updated": [],
+        "unchanged": [],
+        "failed": [{CONF_MAIN_SENSOR: "sensor.site_total", "reason": "already_in_progress"}],
+    }
+
+
+async def test_import_service_is_admin_only_and_reads_allowed_files(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    sources: None,
+    hass_read_only_user: User,
+    tmp_path: Path,
+) -> None:
+    hass.config.config_dir = str(tmp_path / "config")
+    (tmp_path / "config").mkdir()
+    hass.config.allowlist_external_dirs = {str(tmp_path / "config")}
+    (tmp_path / "config" / "breakdowns.yaml").write_text(
+        "- main_sensor: sensor.site_total\n"
+    )
+    (tmp_path / "outside.yaml").write_text("- main_sensor: sensor.subpanel\n")
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    async def call(filename: str, context: Context | None = None):
+        return await hass.services.async_call(
+            DOMAIN,
+            SERVICE_IMPORT_BREAKDOWNS,
+            {"filename": filename, "dry_run": True},
+            blocking=True,
+            return_response=True,
+            context=context,
+        )
+
+    with pytest.raises(Unauthorized):
+        await call("breakdowns.yaml", Context(user_id=hass_read_only_user.id))
+    for filename in (str(tmp_path / "outside.yaml"), "../outside.yaml"):
+        with pytest.raises(HomeAssistantError, match="allowlist_external_dirs"):
+            await call(filename)
+    assert await call("breakdowns.yaml") == {"valid": ["sensor.site_total"]}
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    label_registry as lr,
+)
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.powermix.const import (
+    CONF_CONSUMER_AREAS,
+    CONF_CONSUMER_PATTERNS,
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_PRODUCER_LABELS,
+    CONF_SENSOR_PREFIX,
+    DOMAIN,
+)
+from custom_components.powermix.membership import MembershipRule, MembershipTracker
+from custom_components.powermix.sensor import (
+    PowermixMirrorSensor,
+    PowermixOtherSensor,
+    async_setup_entry,
+)
+
+
+def _power_sensor(
+    registry: er.EntityRegistry, object_id: str, **kwargs: Any
+) -> er.RegistryEntry:
+    kwargs.setdefault("original_device_class", "power")
+    area_id = kwargs.pop("area_id", None)
+    entry = registry.async_get_or_create(
+        "sensor", "test", object_id, suggested_object_id=object_id, **kwargs
+    )
+    if area_id is not None:
+        entry = registry.async_update_entity(entry.entity_id, area_id=area_id)
+    return entry
+
+
+@pytest.fixture
+def device_entry(hass: HomeAssistant) -> dr.DeviceEntry:
+    config_entry = MockConfigEntry(domain="test")
+    config_entry.add_to_hass(hass)
+    return dr.async_get(hass).async_get_or_create(
+        config_entry_id=config_entry.entry_id, identifiers={("test", "inverter")}
+    )
+
+
+@pytest.mark.asyncio
+async def test_rules_resolve_through_registry_indexes(
+    hass: HomeAssistant, device_entry: dr.DeviceEntry
+) -> None:
+    entities = er.async_get(hass)
+    garage = ar.async_get(hass).async_create("Garage")
+    solar = lr.async_get(hass).async_create("Solar")
+    dr.async_get(hass).async_update_device(
+        device_entry.id, area_id=garage.id, labels={solar.label_id}
+    )
+
+    _power_sensor(entities, "charger", area_id=garage.id)
+    _power_sensor(
+        entities, "garage_voltage", area_id=garage.id, original_device_class="voltage"
+    )
+    _power_sensor(entities, "inverter", device_id=device_entry.id)
+    _power_sensor(entities, "boiler_power")
+    _power_sensor(entities, "listed_power")
+    disabled = _power_sensor(entities, "spare_power")
+    entities.async_update_entity(disabled.entity_id, disabled_by=er.RegistryEntryDisabler.USER)
+
+    tracker = MembershipTracker(
+        hass,
+        {
+            "consumer": MembershipRule(
+                areas=frozenset({garage.id}), patterns=("sensor.*_power",)
+            ),
+            "producer": MembershipRule(labels=frozenset({solar.label_id})),
+        },
+        exclude=["sensor.listed_power"],
+        on_change=lambda: None,
+    )
+    tracker.async_start()
+
+    # The inverter inherits the garage area from its device but the producer
+    # label wins; the voltage sensor, the disabled and the listed one are ignored.
+    assert tracker.members == {
+        "sensor.boiler_power": "consumer",
+        "sensor.charger": "consumer",
+        "sensor.inverter": "producer",
+    }
+    tracker.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_registry_events_update_members_incrementally(
+    hass: HomeAssistant, device_entry: dr.DeviceEntry
+) -> None:
+    entities = er.async_get(hass)
+    garage = ar.async_get(hass).async_create("Garage")
+    changes: list[dict[str, str]] = []
+    tracker = MembershipTracker(
+        hass,
+        {"consumer": MembershipRule(areas=frozenset({garage.id}))},
+        exclude=[],
+        on_change=lambda: changes.append(dict(tracker.members)),
+    )
+    tracker.async_start()
+    assert tracker.members == {}
+
+    charger = _power_sensor(entities, "charger", area_id=garage.id)
+    await hass.async_block_till_done()
+    assert changes == [{"sensor.charger": "consumer"}]
+
+    entities.async_update_entity(charger.entity_id, new_entity_id="sensor.ev_charger")
+    await hass.async_block_till_done()
+    assert changes[-1] == {"sensor.ev_charger": "consumer"}
+
+    _power_sensor(entities, "inverter", device_id=device_entry.id)
+    await hass.async_block_till_done()
+    assert len(changes) == 2  # not in the garage (yet)
+
+    dr.async_get(hass).async_update_device(device_entry.id, area_id=garage.id)
+    await hass.async_block_till_done()
+    assert changes[-1] == {"sensor.ev_charger": "consumer", "sensor.inverter": "consumer"}
+
+    entities.async_remove("sensor.ev_charger")
+    await hass.async_block_till_done()
+    assert changes[-1] == {"sensor.inverter": "consumer"}
+
+    tracker.async_stop()
+    _power_sensor(entities, "heater", area_id=garage.id)
+    await hass.async_block_till_done()
+    assert len(changes) == 4
+
+
+@pytest.mark.asyncio
+async def test_running_entry_attaches_and_detaches_rule_members(hass: HomeAssistant) -> None:
+    entities = er.async_get(hass)
+    garage = ar.async_get(hass).async_create("Garage")
+    _power_sensor(entities, "charger", area_id=garage.id)
+    hass.states.async_set("sensor.main", "1000", {"unit_of_measurement": "W"})
+    hass.states.async_set("sensor.charger", "300", {"unit_of_measurement": "W"})
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "config": {
+            CONF_MAIN_SENSOR: "sensor.main",
+            CONF_INCLUDED_SENSORS: [],
+            CONF_CONSUMER_AREAS: [garage.id],
+            CONF_CONSUMER_PATTERNS: [],
+            CONF_PRODUCER_LABELS: [],
+            CONF_SENSOR_PREFIX: "Powermix",
+        }
+    }
+    added: list[Any] = []
+
+    with patch(
+        "custom_components.powermix.sensor.SensorEntity.async_write_ha_state", autospec=True
+    ):
+        await async_setup_entry(
+            hass, entry, lambda new, update_before_add=False: added.extend(new)
+        )
+        other = added[0]
+        assert isinstance(other, PowermixOtherSensor)
+        assert [
+            entity.unique_id for entity in added if isinstance(entity, PowermixMirrorSensor)
+        ] == [
+            f"{entry.entry_id}_mirror_sensor_charger"
+        ]
+        other.hass = hass
+        await other.async_added_to_hass()
+        assert other.native_value == 700.0
+
+        _power_sensor(entities, "heater", area_id=garage.id)
+        hass.states.async_set("sensor.heater", "200", {"unit_of_measurement": "W"})
+        await hass.async_block_till_done()
+        assert other.extra_state_attributes["included_sensors"] == [
+            "sensor.charger",
+            "sensor.heater",
+        ]
+        assert other.native_value == 500.0
+        assert isinstance(added[-1], PowermixMirrorSensor)
+        assert added[-1].unique_id == f"{entry.entry_id}_mirror_sensor_heater"
+
+        entities.async_update_entity("sensor.charger", area_id=None)
+        await hass.async_block_till_done()
+        assert other.extra_state_attributes["included_sensors"] == ["sensor.heater"]
+        assert other.native_value == 800.0
+
+        # The rebuilt subscription follows the new members.
+        hass.states.async_set("sensor.heater", "50", {"unit_of_measurement": "W"})
+        await hass.async_block_till_done()
+        assert other.native_value == 950.0
+
+        await other.async_will_remove_from_hass()
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.asyncio
+async def test_running_entry_moves_and_removes_rule_mirrors_in_the_registry(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> None:
+    entities = er.async_get(hass)
+    garage = ar.async_get(hass).async_create("Garage")
+    solar = lr.async_get(hass).async_create("Solar")
+    _power_sensor(entities, "charger", area_id=garage.id)
+    hass.states.async_set("sensor.main", "1000", {"unit_of_measurement": "W"})
+    hass.states.async_set("sensor.charger", "300", {"unit_of_measurement": "W"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MAIN_SENSOR: "sensor.main", CONF_INCLUDED_SENSORS: []},
+        options={CONF_CONSUMER_AREAS: [garage.id], CONF_PRODUCER_LABELS: [solar.label_id]},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    unique_id = f"{entry.entry_id}_mirror_sensor_charger"
+
+    def mirror_state() -> Any:
+        entity_id = entities.async_get_entity_id("sensor", DOMAIN, unique_id)
+        return entity_id and hass.states.get(entity_id)
+
+    assert mirror_state().attributes["sensor_role"] == "consumer"
+
+    # Matched by both rules, the charger moves to the producers under the same unique id.
+    entities.async_update_entity("sensor.charger", labels={solar.label_id})
+    await hass.async_block_till_done()
+    assert mirror_state().attributes["sensor_role"] == "producer"
+    other = hass.states.get("sensor.powermix_other_usage")
+    assert other.attributes["included_sensors"] == []
+    assert other.attributes["producer_sensors"] == ["sensor.charger"]
+
+    # Matched by neither rule, the mirror leaves the entity registry for good.
+    mirror_entity_id = entities.async_get_entity_id("sensor", DOMAIN, unique_id)
+    entities.async_update_entity("sensor.charger", area_id=None, labels=set())
+    await hass.async_block_till_done()
+    assert er.async_get(hass).async_get(mirror_entity_id) is None
+    assert hass.states.get(mirror_entity_id) is None
+    assert hass.states.get("sensor.powermix_other_usage").attributes["producer_sensors"] == []
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,53 @@
+from custom_components.powermix.cache import LastKnownValueCache
+from custom_components.powermix.metrics import PowermixMetrics, render_exposition
+
+
+def test_render_exposition_groups_families_across_entries() -> None:
+    cache = LastKnownValueCache(30)
+    cache.resolve("sensor.ev", 100.0, "W", 0.0)
+    cache.resolve("sensor.ev", None, None, 1.0)
+
+    first = PowermixMetrics("entry1", "Powermix", cache)
+    first.set_power("entry1_other", "other", "sensor.main", 250.5)
+    first.set_power("entry1_mirror_sensor_ev", "consumer", "sensor.ev", 100.0)
+    first.counters["updates"] = 3
+    first.set_energy("entry1_other_energy_daily", "other", "sensor.main", "daily", 1.25)
+    second = PowermixMetrics("entry2", 'Garage "B"')
+    second.set_power("entry2_mirror_sensor_pv", "producer", "sensor.pv", 1200.0)
+
+    text = render_exposition([first, second])
+    lines = text.splitlines()
+
+    assert lines[:2] == [
+        "# HELP powermix_power_watts Current Powermix power values in Watts.",
+        "# TYPE powermix_power_watts gauge",
+    ]
+    assert lines[2:5] == [
+        'powermix_power_watts{entry="entry1",prefix="Powermix",role="other",'
+        'source="sensor.main"} 250.5',
+        'powermix_power_watts{entry="entry1",prefix="Powermix",role="consumer",'
+        'source="sensor.ev"} 100',
+        'powermix_power_watts{entry="entry2",prefix="Garage \\"B\\"",role="producer",'
+        'source="sensor.pv"} 1200',
+    ]
+    assert lines[5:8] == [
+        "# HELP powermix_energy_kwh Powermix energy in the current cycle in kWh.",
+        "# TYPE powermix_energy_kwh gauge",
+        'powermix_energy_kwh{entry="entry1",prefix="Powermix",role="other",'
+        'source="sensor.main",cycle="daily"} 1.25',
+    ]
+    assert 'powermix_updates_total{entry="entry1",prefix="Powermix"} 3' in lines
+    assert 'powermix_stale_holds_total{entry="entry1",prefix="Powermix"} 1' in lines
+    assert 'powermix_stale_holds_total{entry="entry2",prefix="Garage \\"B\\""} 0' in lines
+    assert text.endswith("\n")
+
+
+def test_power_block_is_only_rebuilt_after_changes() -> None:
+    metrics = PowermixMetrics("entry1", "Powermix")
+    metrics.set_power("entry1_other", "other", "sensor.main", 10.0)
+    block = metrics.power_block()
+    metrics.set_power("entry1_other", "other", "sensor.main", 10.0)
+    assert metrics.power_block() is block
+
+    metrics.set_power("entry1_other", "other", "sensor.main", None)
+    assert metrics.power_block() == ""
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.auth.models import User
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, Unauthorized
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.powermix.capture import (
+    CapturedEvent,
+    StateChangeRecorder,
+    read_capture,
+    write_capture,
+)
+from custom_components.powermix.const import (
+    CONF_ENERGY_CYCLES,
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_PRODUCER_SENSORS,
+    CONF_SENSOR_PREFIX,
+    CONF_STALE_TIMEOUT,
+    CONF_STEP_THRESHOLD,
+    DOMAIN,
+    EVENT_LOAD_STEP,
+    SERVICE_RECORD_EVENTS,
+)
+from tests.helpers import DummyHass
+from tests.replay import async_replay, main
+
+CONFIG = {
+    CONF_MAIN_SENSOR: "sensor.main",
+    CONF_INCLUDED_SENSORS: ["sensor.ev"],
+    CONF_PRODUCER_SENSORS: [],
+    CONF_SENSOR_PREFIX: "Powermix",
+    CONF_STALE_TIMEOUT: 30,
+}
+
+
+def _write_sample(path: Path) -> None:
+    write_capture(
+        path,
+        {"entry_id": "entry123", "config": CONFIG},
+        [
+            CapturedEvent(0.0, "sensor.main", "500", "W"),
+            CapturedEvent(0.0, "sensor.ev", "100", "W", "EV"),
+            CapturedEvent(1.0, "sensor.ev", "unavailable", "W", "EV"),
+            CapturedEvent(2.0, "sensor.ev", "150", "W", "EV"),
+            CapturedEvent(3.0, "sensor.ev", "unavailable", "W", "EV"),
+            CapturedEvent(4.0, "sensor.main", "600", "W"),
+        ],
+    )
+
+
+def test_capture_round_trip_is_compact(tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl"
+    _write_sample(path)
+
+    lines = path.read_text().splitlines()
+    assert json.loads(lines[0])["entry_id"] == "entry123"
+    assert lines[1] == '[0.0,"sensor.main","500","W"]'
+
+    header, events = read_capture(path)
+    assert header["config"] == CONFIG
+    assert [event.offset for event in events] == [0.0, 0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+@pytest.mark.asyncio
+async def test_replay_is_deterministic_and_fires_hold_expirations(tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl"
+    _write_sample(path)
+
+    first = await async_replay(path)
+    second = await async_replay(path)
+
+    assert first.events == 4
+    assert first.digest() == second.digest()
+    other = [(offset, value) for offset, key, value, _ in first.outputs if key == "entry123_other"]
+    # The flap at 1s is held without a write; the outage at 3s expires at 33s.
+    assert other == [(0.0, 400.0), (2.0, 350.0), (4.0, 450.0), (33.0, 600.0)]
+
+
+@pytest.mark.asyncio
+async def test_replay_writes_energy_counters_on_virtual_time(tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl"
+    write_capture(
+        path,
+        {"entry_id": "entry123", "config": {**CONFIG, CONF_ENERGY_CYCLES: ["daily"]}},
+        [
+            CapturedEvent(0.0, "sensor.main", "1000", "W"),
+            CapturedEvent(0.0, "sensor.ev", "400", "W"),
+            CapturedEvent(90.0, "sensor.main", "1600", "W"),
+            CapturedEvent(150.0, "sensor.main", "1600", "W"),
+        ],
+    )
+
+    first = await async_replay(path)
+    second = await async_replay(path)
+
+    assert first.digest() == second.digest()
+    daily = [
+        (offset, value)
+        for offset, key, value, _ in first.outputs
+        if key == "entry123_other_energy_daily"
+    ]
+    # 600 W for 90 s, then 1200 W; written every minute until the last event.
+    assert daily == [(0.0, 0.0), (60.0, 0.01), (120.0, 0.025)]
+
+
+def _write_kettle(path: Path) -> None:
+    events = [
+        CapturedEvent(0.0, "sensor.main", "500", "W"),
+        CapturedEvent(0.0, "sensor.ev", "100", "W"),
+    ]
+    # A kettle: Other Usage steps from 400 W to 2400 W and stays there.
+    for second in range(1, 90):
+        main = 500 + (2000 if second >= 30 else 0) + second % 2
+        events.append(CapturedEvent(float(second), "sensor.main", str(main), "W"))
+    write_capture(
+        path,
+        {"entry_id": "entry123", "config": {**CONFIG, CONF_STEP_THRESHOLD: 500}},
+        events,
+    )
+
+
+@pytest.mark.asyncio
+async def test_replay_records_load_step_events(tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl"
+    _write_kettle(path)
+
+    first = await async_replay(path)
+    second = await async_replay(path)
+
+    assert first.digest() == second.digest()
+    assert [(event_type, data["entry_id"]) for _, event_type, data in first.fired] == [
+        (EVENT_LOAD_STEP, "entry123")
+    ]
+    offset, _, data = first.fired[0]
+    assert 30.0 <= offset < 40.0
+    assert data["magnitude"] == pytest.approx(2000, abs=5)
+
+
+def test_replay_cli_compares_against_saved_outputs(tmp_path: Path, capsys) -> None:
+    path = tmp_path / "capture.jsonl"
+    outputs = tmp_path / "outputs.json"
+    _write_sample(path)
+
+    assert main([str(path), "--runs", "2", "--save", str(outputs)]) == 0
+    assert main([str(path), "--runs", "1", "--compare", str(outputs)]) == 0
+    assert "outputs and fired events match" in capsys.readouterr().out
+
+
+def test_replay_cli_compares_fired_events(tmp_path: Path, capsys) -> None:
+    path = tmp_path / "capture.jsonl"
+    saved = tmp_path / "outputs.json"
+    _write_kettle(path)
+    assert main([str(path), "--runs", "1", "--save", str(saved)]) == 0
+
+    # Same state writes, but the earlier build fired a different step.
+    baseline = json.loads(saved.read_text())
+    baseline["fired"][0][2]["magnitude"] += 100
+    saved.write_text(json.dumps(baseline))
+    capsys.readouterr()
+
+    assert main([str(path), "--runs", "1", "--compare", str(saved)]) == 1
+    out = capsys.readouterr().out
+    assert "at fired event #0" in out
+    assert "at write" not in out
+
+
+@pytest.mark.asyncio
+async def test_recorder_snapshots_sources_then_buffers_changes() -> None:
+    hass = DummyHass()
+    hass.states.set("sensor.main", "500", {"unit_of_measurement": "W"})
+    tracked: dict[str, Any] = {}
+
+    def fake_track(hass_obj: DummyHass, entities: list[str], action: Callable[[Any], None]):
+        tracked["entities"] = entities
+        tracked["action"] = action
+        return lambda: tracked.update({"unsubscribed": True})
+
+    recorder = StateChangeRecorder(hass, ["sensor.main", "sensor.ev"])
+    with patch(
+        "custom_components.powermix.capture.async_track_state_change_event",
+        side_effect=fake_track,
+    ):
+        recorder.async_start()
+
+    hass.states.set("sensor.ev", "100", {"unit_of_measurement": "W", "friendly_name": "EV"})
+    tracked["action"](
+        type("Event", (), {"data": {"entity_id": "sensor.ev", "new_state": hass.states.get("sensor.ev")}})
+    )
+    events = recorder.async_stop()
+
+    assert tracked["entities"] == ["sensor.main", "sensor.ev"]
+    assert tracked["unsubscribed"] is True
+    assert [event.as_row()[1:] for event in events] == [
+        ["sensor.main", "500", "W"],
+        ["sensor.ev", None],
+        ["sensor.ev", "100", "W", "EV"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recording_is_written_early_on_stop_and_unload(
+    hass: HomeAssistant, enable_custom_integrations: None, tmp_path: Path
+) -> None:
+    hass.config.config_dir = str(tmp_path)
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    hass.states.async_set("sensor.main", "500", {"unit_of_measurement": "W"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MAIN_SENSOR: "sensor.main", CONF_INCLUDED_SENSORS: []},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    async def record(filename: str, value: str) -> None:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_RECORD_EVENTS,
+            {"entry_id": entry.entry_id, "duration": 3600, "filename": filename},
+            blocking=True,
+        )
+        hass.states.async_set("sensor.main", value, {"unit_of_measurement": "W"})
+        await hass.async_block_till_done()
+
+    await record("stopped.jsonl", "600")
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    _, events = read_capture(tmp_path / "stopped.jsonl")
+    assert [event.state for event in events] == ["500", "600"]
+
+    await record("unloaded.jsonl", "700")
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    _, events = read_capture(tmp_path / "unloaded.jsonl")
+    assert [event.state for event in events] == ["600", "700"]
+
+
+@pytest.mark.asyncio
+async def test_recording_is_admin_only_and_stays_in_allowed_directories(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    hass_read_only_user: User,
+    tmp_path: Path,
+) -> None:
+    hass.config.config_dir = str(tmp_path / "config")
+    (tmp_path / "config").mkdir()
+    hass.config.allowlist_external_dirs = {str(tmp_path / "config")}
+    hass.states.async_set("sensor.main", "500", {"unit_of_measurement": "W"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MAIN_SENSOR: "sensor.main", CONF_INCLUDED_SENSORS: []},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_RECORD_EVENTS,
+            {"entry_id": entry.entry_id, "duration": 1},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
+    for filename in (str(tmp_path / "escaped.jsonl"), "../escaped.jsonl"):
+        with pytest.raises(HomeAssistantError, match="allowlist_external_dirs"):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_RECORD_EVENTS,
+                {"entry_id": entry.entry_id, "duration": 1, "filename": filename},
+                blocking=True,
+            )
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert not (tmp_path / "escaped.jsonl").exists()
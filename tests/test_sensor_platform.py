@@ -7,6 +7,7 @@ from unittest.mock import patch
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.powermix.cache import LastKnownValueCache
 from custom_components.powermix.const import (
     CONF_INCLUDED_SENSORS,
     CONF_MAIN_SENSOR,
@@ -15,7 +16,9 @@ from custom_components.powermix.const import (
     DEFAULT_SENSOR_PREFIX,
     DOMAIN,
 )
+from custom_components.powermix.metrics import PowermixMetrics
 from custom_components.powermix.sensor import (
+    PowermixBaseloadSensor,
     PowermixMirrorSensor,
     PowermixOtherSensor,
     async_setup_entry,
@@ -55,10 +58,12 @@ async def test_async_setup_entry_adds_other_and_mirror_entities(dummy_hass: Dumm
 
     await async_setup_entry(hass, entry, add_entities)
 
-    assert len(added) == 4  # 1 other sensor + 2 consumer mirrors + 1 producer mirror
+    # 1 other sensor + 2 consumer mirrors + 1 producer mirror + the baseload sensor
+    assert len(added) == 5
     assert isinstance(added[0], PowermixOtherSensor)
-    assert all(isinstance(entity, PowermixMirrorSensor) for entity in added[1:])
-    roles = [entity.extra_state_attributes["sensor_role"] for entity in added[1:]]
+    assert all(isinstance(entity, PowermixMirrorSensor) for entity in added[1:4])
+    assert isinstance(added[4], PowermixBaseloadSensor)
+    roles = [entity.extra_state_attributes["sensor_role"] for entity in added[1:4]]
     assert roles.count("consumer") == 2
     assert roles.count("producer") == 1
 
@@ -246,3 +251,69 @@ async def test_sensor_values_are_rounded_to_two_decimals(dummy_hass: DummyHass)
     mirror.hass = hass
     mirror._sync_from_source()  # type: ignore[attr-defined]
     assert mirror.native_value == pytest.approx(123.46)
+
+
+@pytest.mark.asyncio
+async def test_other_sensor_holds_flapping_source_without_writing(
+    dummy_hass: DummyHass, suppress_async_write_state
+) -> None:
+    hass = dummy_hass
+    hass.states.set("sensor.main", "500", {"unit_of_measurement": "W"})
+    hass.states.set("sensor.ev", "100", {"unit_of_measurement": "W"})
+    cache = LastKnownValueCache(30)
+    clock = {"now": 0.0}
+    scheduled: list[Any] = []
+
+    def fake_call_later(hass_obj: DummyHass, delay: float, action: Callable[[Any], None]):
+        scheduled.append((delay, action))
+        return lambda: scheduled.remove((delay, action))
+
+    sensor = PowermixOtherSensor(
+        "entry123", "Powermix", "sensor.main", ["sensor.ev"], [], cache=cache
+    )
+    sensor.hass = hass
+
+    with patch(
+        "custom_components.powermix.sensor.time.monotonic", side_effect=lambda: clock["now"]
+    ), patch(
+        "custom_components.powermix.sensor.async_call_later", side_effect=fake_call_later
+    ):
+        sensor._handle_state_change(None)  # type: ignore[attr-defined]
+        assert sensor.native_value == 400.0
+        writes = suppress_async_write_state.call_count
+
+        clock["now"] = 5.0
+        hass.states.set("sensor.ev", "unavailable", {"unit_of_measurement": "W"})
+        sensor._handle_state_change(None)  # type: ignore[attr-defined]
+        assert sensor.native_value == 400.0
+        assert suppress_async_write_state.call_count == writes
+        assert [delay for delay, _ in scheduled] == [30.0]
+
+        clock["now"] = 35.0
+        scheduled[0][1](None)
+        assert sensor.native_value == 500.0
+        assert suppress_async_write_state.call_count == writes + 1
+
+    assert cache.holds == 1
+    assert cache.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_sensor_updates_are_exported_to_metrics(dummy_hass: DummyHass) -> None:
+    hass = dummy_hass
+    hass.states.set("sensor.main", "500", {"unit_of_measurement": "W"})
+    hass.states.set("sensor.ev", "100", {"unit_of_measurement": "W"})
+    metrics = PowermixMetrics("entry123", "Powermix")
+
+    sensor = PowermixOtherSensor(
+        "entry123", "Powermix", "sensor.main", ["sensor.ev"], [], metrics=metrics
+    )
+    sensor.hass = hass
+    sensor._handle_state_change(None)  # type: ignore[attr-defined]
+    sensor._handle_state_change(None)  # type: ignore[attr-defined]
+
+    assert metrics.counters == {"updates": 2, "writes": 1, "skipped_writes": 1}
+    assert metrics.power_block() == (
+        'powermix_power_watts{entry="entry123",prefix="Powermix",role="other",'
+        'source="sensor.main"} 400\n'
+    )
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.powermix.metrics import PowermixMetrics
+from custom_components.powermix.sensor import PowermixOtherSensor
+from tests.helpers import DummyHass
+
+ROOT = Path(__file__).resolve().parents[1]
+
+LAZY_MODULES = (
+    "baseload",
+    "cache",
+    "capture",
+    "config_flow",
+    "energy",
+    "history",
+    "importer",
+    "membership",
+    "statistics",
+    "steps",
+    "view",
+    "websocket_api",
+)
+
+
+def test_importing_the_platform_skips_flow_service_and_opt_in_modules() -> None:
+    probe = (
+        "import sys\n"
+        "import custom_components.powermix, custom_components.powermix.sensor\n"
+        f"print(*[name for name in {LAZY_MODULES!r} "
+        "if f'custom_components.powermix.{name}' in sys.modules])\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip() == ""
+
+
+@pytest.mark.asyncio
+async def test_first_state_is_left_to_the_platform() -> None:
+    hass = DummyHass()
+    hass.states.set("sensor.main", "500", {"unit_of_measurement": "W"})
+    hass.states.set("sensor.ev", "100", {"unit_of_measurement": "W"})
+    metrics = PowermixMetrics("entry123", "Powermix", None)
+    other = PowermixOtherSensor(
+        "entry123", "Powermix", "sensor.main", ["sensor.ev"], [], metrics=metrics
+    )
+    other.hass = hass
+
+    with patch(
+        "custom_components.powermix.sensor.async_track_state_change_event"
+    ), patch(
+        "custom_components.powermix.sensor.SensorEntity.async_write_ha_state"
+    ) as write:
+        await other.async_added_to_hass()
+
+    write.assert_not_called()
+    assert other.native_value == 400
+    assert metrics.counters["writes"] == 1
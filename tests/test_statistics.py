@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from homeassistant.components.recorder import Recorder
+from homeassistant.core import HomeAssistant, State
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+    statistics_during_period,
+)
+
+from custom_components.powermix.const import (
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_STALE_TIMEOUT,
+    DOMAIN,
+    SERVICE_REBUILD_STATISTICS,
+)
+from custom_components.powermix.statistics import (
+    HourlyAccumulator,
+    OtherUsageSeries,
+    iter_other_values,
+)
+
+T0 = datetime(2024, 6, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def test_accumulator_emits_time_weighted_hours() -> None:
+    accumulator = HourlyAccumulator(T0)
+    assert accumulator.add(T0, 100.0) == []
+    assert accumulator.add(T0 + timedelta(minutes=15), 300.0) == []
+    # A gap contributes neither to the mean nor to min/max.
+    assert accumulator.add(T0 + timedelta(minutes=30), None) == []
+
+    rows = accumulator.add(T0 + timedelta(hours=2, minutes=30), 50.0)
+    rows += accumulator.advance(T0 + timedelta(hours=4))
+
+    # 11:00 is entirely a gap; 12:00 is covered from 12:30 only.
+    assert rows == [
+        {"start": T0, "mean": 200.0, "min": 100.0, "max": 300.0},
+        {"start": T0 + timedelta(hours=2), "mean": 50.0, "min": 50.0, "max": 50.0},
+        {"start": T0 + timedelta(hours=3), "mean": 50.0, "min": 50.0, "max": 50.0},
+    ]
+    assert accumulator.advance(T0 + timedelta(hours=4)) == []
+
+
+def test_accumulator_spreads_long_values_over_hours() -> None:
+    accumulator = HourlyAccumulator(T0)
+    accumulator.add(T0 + timedelta(minutes=30), 10.0)
+    rows = accumulator.advance(T0 + timedelta(hours=2))
+    assert [row["start"] for row in rows] == [T0, T0 + timedelta(hours=1)]
+    assert all(row["mean"] == 10.0 for row in rows)
+
+
+def test_accumulator_rounds_mean_min_and_max_alike() -> None:
+    accumulator = HourlyAccumulator(T0)
+    accumulator.add(T0, 100.004)
+    accumulator.add(T0 + timedelta(minutes=30), 200.016)
+    assert accumulator.advance(T0 + timedelta(hours=1)) == [
+        {"start": T0, "mean": 150.01, "min": 100.0, "max": 200.02}
+    ]
+
+
+def _state(entity_id: str, value: str, minutes: int, unit: str = "W") -> State:
+    when = T0 + timedelta(minutes=minutes)
+    return State(
+        entity_id,
+        value,
+        {"unit_of_measurement": unit},
+        last_changed=when,
+        last_updated=when,
+    )
+
+
+def test_iter_other_values_matches_live_semantics() -> None:
+    history = {
+        "sensor.main": [_state("sensor.main", "1.5", 0, "kW"), _state("sensor.main", "2", 20, "kW")],
+        "sensor.ev": [_state("sensor.ev", "250", 0), _state("sensor.ev", "unavailable", 10)],
+    }
+
+    values = list(iter_other_values(history, "sensor.main", ["sensor.ev"], allow_negative=False))
+
+    assert [(when - T0, other) for when, other, _ in values] == [
+        (timedelta(0), 1500.0),
+        (timedelta(0), 1250.0),
+        (timedelta(minutes=10), 1500.0),
+        (timedelta(minutes=20), 2000.0),
+    ]
+    assert values[-1][2] == "W"
+
+
+def test_iter_other_values_clamps_without_producers() -> None:
+    history = {
+        "sensor.main": [_state("sensor.main", "100", 0)],
+        "sensor.ev": [_state("sensor.ev", "150", 1)],
+    }
+    clamped = list(iter_other_values(history, "sensor.main", ["sensor.ev"], allow_negative=False))
+    negative = list(iter_other_values(history, "sensor.main", ["sensor.ev"], allow_negative=True))
+    assert clamped[-1][1] == 0.0
+    assert negative[-1][1] == pytest.approx(-50.0)
+
+
+def test_other_usage_series_holds_stale_sources_like_the_sensor() -> None:
+    history = {
+        "sensor.main": [_state("sensor.main", "1000", 0), _state("sensor.main", "1100", 20)],
+        "sensor.ev": [_state("sensor.ev", "200", 0), _state("sensor.ev", "unavailable", 10)],
+    }
+    values = list(
+        iter_other_values(
+            history, "sensor.main", ["sensor.ev"], allow_negative=False, stale_timeout=300
+        )
+    )
+    assert [(when - T0, other) for when, other, _ in values] == [
+        (timedelta(0), 1000.0),
+        (timedelta(0), 800.0),
+        (timedelta(minutes=10), 800.0),
+        (timedelta(minutes=15), 1000.0),
+        (timedelta(minutes=20), 1100.0),
+    ]
+
+    # A hold that outlasts a history chunk expires when the stream moves past it.
+    series = OtherUsageSeries(
+        "sensor.main", ["sensor.ev"], allow_negative=False, stale_timeout=1800
+    )
+    assert [other for _, other, _ in series.feed(history)] == [1000.0, 800.0, 800.0, 900.0]
+    assert list(series.advance(T0 + timedelta(minutes=30))) == []
+    assert [(when - T0, other) for when, other, _ in series.advance(T0 + timedelta(hours=1))] == [
+        (timedelta(minutes=40), 1100.0)
+    ]
+
+
+async def test_rebuild_statistics_service_applies_the_stale_hold(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+    freezer.move_to(start - timedelta(minutes=5))
+    power = {"unit_of_measurement": "W"}
+    hass.states.async_set("sensor.main", "1000", power)
+    hass.states.async_set("sensor.ev", "200", power)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MAIN_SENSOR: "sensor.main", CONF_INCLUDED_SENSORS: ["sensor.ev"]},
+        options={CONF_STALE_TIMEOUT: 600},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    freezer.move_to(start + timedelta(minutes=30))
+    hass.states.async_set("sensor.ev", "unavailable", power)
+    await hass.async_block_till_done()
+    await async_wait_recording_done(hass)
+
+    freezer.move_to(start + timedelta(hours=2))
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_REBUILD_STATISTICS,
+        {"entry_id": entry.entry_id, "start": start, "end": start + timedelta(hours=1)},
+        blocking=True,
+    )
+    await async_wait_recording_done(hass)
+
+    rows = await hass.async_add_executor_job(
+        statistics_during_period, hass, start, None, {"sensor.powermix_other_usage"}, "hour"
+    )
+    # 800 W until the hold on the EV charger runs out at :40, then 1000 W.
+    assert [row["mean"] for row in rows["sensor.powermix_other_usage"]] == [
+        pytest.approx((40 * 800 + 20 * 1000) / 60, abs=0.01)
+    ]
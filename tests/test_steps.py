@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_capture_events
+
+from custom_components.powermix.const import (
+    CONF_INCLUDED_SENSORS,
+    CONF_MAIN_SENSOR,
+    CONF_STEP_THRESHOLD,
+    DOMAIN,
+    EVENT_LOAD_STEP,
+)
+from custom_components.powermix.steps import LoadStep, StepDetector
+
+POWER = {"device_class": "power", "unit_of_measurement": "W"}
+
+
+def test_steps_are_reported_once_with_level_and_duration() -> None:
+    rng = random.Random(4)
+    detector = StepDetector(200)
+    steps: list[LoadStep] = []
+    now = 0.0
+    for level, samples in ((300, 60), (2300, 40), (300, 50)):
+        for _ in range(samples):
+            now += 10
+            if step := detector.update(now, level + rng.uniform(-60, 60)):
+                steps.append(step)
+
+    assert [round(step.at) for step in steps] == [610, 1010]
+    assert steps[0].magnitude == pytest.approx(2000, abs=60)
+    assert steps[0].duration == pytest.approx(600)
+    assert steps[1].before == pytest.approx(2300, abs=20)
+    assert steps[1].after == pytest.approx(300, abs=60)
+    assert steps[1].duration == pytest.approx(400)
+
+
+def test_small_shifts_and_gaps_are_not_reported() -> None:
+    detector = StepDetector(200)
+    values = [500.0] * 5 + [620.0] * 20 + [None, 1500.0, 1500.0]
+    assert not any(
+        detector.update(float(index), value) for index, value in enumerate(values)
+    )
+    # The 120 W shift moved the reference level, so going back is no step either.
+    detector = StepDetector(200)
+    values = [500.0] * 5 + [620.0] * 20 + [500.0] * 5
+    assert not any(
+        detector.update(float(index), value) for index, value in enumerate(values)
+    )
+
+
+@pytest.mark.asyncio
+async def test_other_sensor_fires_load_step_events(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> None:
+    hass.states.async_set("sensor.main", "400", POWER)
+    hass.states.async_set("sensor.ev", "100", POWER)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MAIN_SENSOR: "sensor.main", CONF_INCLUDED_SENSORS: ["sensor.ev"]},
+        options={CONF_STEP_THRESHOLD: 500},
+    )
+    entry.add_to_hass(hass)
+    events = async_capture_events(hass, EVENT_LOAD_STEP)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("sensor.main", "2400", POWER)
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.main", "2450", POWER)
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    data = events[0].data
+    assert data["entry_id"] == entry.entry_id
+    assert data["entity_id"] == "sensor.powermix_other_usage"
+    assert (data["before"], data["after"], data["magnitude"]) == (300, 2300, 2000)
+    assert data["duration"] >= 0
+    assert data["timestamp"].endswith("+00:00")